@@ -1,9 +1,19 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from werkzeug import Response
+from .cache import init_cache
+from .compression import get_compression_metrics, init_compression
 from .models import db, migrate
-from .views import clients, contacts, reports
+from .reference import init_reference_cache
+from .render import init_renderer
+from .report_templates import init_template_cache
+from .rollups import init_issue_count_rollup
+from .search import init_search_index
+from .commands import import_cli, rebuild_cli
+from .views import (batch, clients, contacts, engagements, issues, jobs,
+                    reports, templates)
 from auth import AuthError
+from auth.auth import requires_auth
 
 # create and configure the app
 
@@ -12,6 +22,15 @@ def create_app(config_object):
     app.config.from_object(config_object)
     db.init_app(app)
     migrate.init_app(app, db)
+    app.cli.add_command(import_cli)
+    app.cli.add_command(rebuild_cli)
+    init_cache(app)
+    init_reference_cache(app)
+    init_search_index(app)
+    init_issue_count_rollup(app)
+    init_renderer(app)
+    init_template_cache(app)
+    init_compression(app)
 
     CORS(app, resources={r'/api/*': {"origins": "*"}})
 
@@ -33,6 +52,17 @@ def create_app(config_object):
             'status': 'healthy'
         })
 
+    '''
+    API Routes - Metrics
+    '''
+    @app.route('/api/metrics',  methods=['GET'])
+    @requires_auth('read:metrics')
+    def metrics():
+        return jsonify({
+            'success': True,
+            'compression': get_compression_metrics()
+        })
+
     '''
     Exception Handler - Bad Request (400)
     '''
@@ -72,12 +102,17 @@ def create_app(config_object):
     '''
     @app.errorhandler(500)
     def server_error(error):
-        return_error(500, 'An error occurred on the server while trying ' +
+        return return_error(500, 'An error occurred on the server while trying ' +
             'to process your request')
 
     app.register_blueprint(clients.blueprint)
     app.register_blueprint(contacts.blueprint)
     app.register_blueprint(reports.blueprint)
+    app.register_blueprint(issues.blueprint)
+    app.register_blueprint(engagements.blueprint)
+    app.register_blueprint(jobs.blueprint)
+    app.register_blueprint(templates.blueprint)
+    app.register_blueprint(batch.blueprint)
 
     def return_error(error_code: int, message: str):
         return jsonify({
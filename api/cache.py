@@ -0,0 +1,266 @@
+import os
+import select
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from threading import Lock, Thread
+from typing import Callable, Iterable, List, Optional, Union
+from urllib.parse import urlencode
+from flask import current_app, g, make_response, request
+from sqlalchemy import DDL, event
+from werkzeug.http import unquote_etag
+from .etags import etag_matches
+from .models import db, on_write
+
+DEFAULT_CACHE_MAX_ENTRIES = 512
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_CACHE_TTL = 60
+
+CACHED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+'''
+Response Cache
+
+An in-process LRU cache of list responses, keyed by route, query string
+and the caller's permissions. Each entry records the write generation of
+the tables it was built from, a write to any of those tables makes the
+entry stale without having to find it.
+
+On Postgres a statement trigger on each cached table sends the table name
+with pg_notify. The notification is delivered when the writing transaction
+commits and takes no lock that other writers wait on. Each process listens
+on a connection of its own, started by the first read of the generations,
+and counts the writes of every server process, the job workers and any
+made directly in the database. A write by another process is seen once
+its notification arrives, shortly after the commit. Notifications sent
+while a process is not listening are lost, so every table is counted as
+written each time the listener connects. Other databases (SQLite in
+development) count the writes notified by this process only, so they
+should be served by a single process.
+'''
+
+CACHED_TABLES = ['Contacts', 'Clients', 'Client_Contacts', 'Reports',
+                 'Report_Items', 'Issue_Counts', 'Report_Templates',
+                 'Report_Template_Items']
+
+TABLE_GENERATION_TRIGGERS = DDL('''
+CREATE OR REPLACE FUNCTION bump_table_generation() RETURNS trigger AS $$
+BEGIN
+    -- writes made by other triggers, such as the issue count rollup, are
+    -- covered by the generation of the table whose write fired them
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+
+    -- sent on commit, repeats within a transaction are sent once
+    PERFORM pg_notify('table_writes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+''' + ''.join(f'''
+DROP TRIGGER IF EXISTS table_generation ON "{table}";
+CREATE TRIGGER table_generation
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "{table}"
+    FOR EACH STATEMENT EXECUTE PROCEDURE bump_table_generation();
+''' for table in CACHED_TABLES))
+
+# tables created with create_all get the triggers too, existing databases
+# get them from the migration
+event.listen(db.Model.metadata, 'after_create',
+             TABLE_GENERATION_TRIGGERS.execute_if(dialect='postgresql'))
+
+TABLE_WRITES_CHANNEL = 'table_writes'
+LISTEN_TIMEOUT = 5
+LISTEN_RETRY_DELAY = 5
+
+table_generations = defaultdict(int)
+generations_lock = Lock()
+
+# the write listener thread of this process for each database
+write_listeners = {}
+write_listeners_lock = Lock()
+
+
+@on_write
+def invalidate_table(table_name: str) -> None:
+    with generations_lock:
+        table_generations[table_name] += 1
+
+
+def invalidate_tables() -> None:
+    with generations_lock:
+        for table_name in CACHED_TABLES:
+            table_generations[table_name] += 1
+
+
+def receive_writes(engine) -> None:
+    while True:
+        try:
+            # a connection of its own, outside the pool and the sessions
+            connection = engine.raw_connection()
+            connection.detach()
+            try:
+                dbapi_connection = connection.connection
+                dbapi_connection.autocommit = True
+                dbapi_connection.cursor().execute(
+                    f'LISTEN {TABLE_WRITES_CHANNEL}')
+
+                # writes committed before the LISTEN were not notified
+                invalidate_tables()
+
+                while True:
+                    if select.select([dbapi_connection], [], [],
+                                     LISTEN_TIMEOUT) == ([], [], []):
+                        continue
+
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        invalidate_table(
+                            dbapi_connection.notifies.pop(0).payload)
+            finally:
+                connection.close()
+        except Exception as error:
+            print(error)
+            time.sleep(LISTEN_RETRY_DELAY)
+
+
+def listen_for_writes(engine) -> None:
+    # threads do not survive a fork, so a forked worker starts its own
+    key = (os.getpid(), str(engine.url))
+    with write_listeners_lock:
+        if key in write_listeners:
+            return
+
+        listener = Thread(target=receive_writes, args=(engine,),
+                          name='table-writes', daemon=True)
+        write_listeners[key] = listener
+        listener.start()
+
+
+def get_generations(tables: Iterable[str]) -> tuple:
+    if db.engine.dialect.name == 'postgresql':
+        listen_for_writes(db.engine)
+
+    with generations_lock:
+        return tuple((table, table_generations[table]) for table in tables)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 ttl: int = DEFAULT_CACHE_TTL) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+
+    def get(self, key: tuple, generations: tuple) -> Optional[dict]:
+        # generations are those of the tables of the request, read by the
+        # caller outside the lock as they may come from the database
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            if (entry['expires'] < time.monotonic() or
+                    entry['generations'] != generations):
+                self.remove(key)
+                return None
+
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: tuple, tables: List[str], generations: tuple,
+            body: bytes, headers: dict, ttl: Optional[int] = None) -> None:
+        # bodies larger than a quarter of the cache are not worth keeping
+        if len(body) > self.max_bytes // 4:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+
+            self.entries[key] = {
+                'expires': time.monotonic() + (ttl or self.ttl),
+                'tables': tables,
+                'generations': generations,
+                'body': body,
+                'headers': headers
+            }
+            self.size += len(body)
+
+            while (len(self.entries) > self.max_entries or
+                   self.size > self.max_bytes):
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key: tuple) -> None:
+        entry = self.entries.pop(key)
+        self.size -= len(entry['body'])
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+def init_cache(app) -> None:
+    app.extensions['response_cache'] = ResponseCache(
+        app.config.get('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_CACHE_MAX_ENTRIES),
+        app.config.get('RESPONSE_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES),
+        app.config.get('RESPONSE_CACHE_TTL', DEFAULT_CACHE_TTL))
+
+
+def get_cache_key() -> tuple:
+    # requires_auth has already verified the token for this request
+    payload = g.verified_jwt[1]
+    permissions = tuple(sorted(payload.get('permissions', [])))
+    query_string = urlencode(sorted(
+        (key, value) for key, value in request.args.items(multi=True)
+        if value != ''))
+    return request.path, query_string, permissions
+
+
+def cached_response(tables: Union[List[str], Callable[[], List[str]]],
+                    ttl: Optional[int] = None):
+    # tables lists the tables the response is built from, or is a function
+    # returning them for responses that depend on the request parameters,
+    # ttl replaces the cache TTL for responses that need to be fresher
+    def cached_response_decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            # reads inside an atomic batch may see uncommitted writes
+            cache: ResponseCache = current_app.extensions.get('response_cache')
+            if (cache is None or cache.ttl <= 0 or
+                    db.session().in_nested_transaction()):
+                return f(*args, **kwargs)
+
+            # read the generations before the query so a write that lands
+            # while the response is built leaves the entry stale
+            response_tables = tables() if callable(tables) else tables
+            generations = get_generations(response_tables)
+
+            key = get_cache_key()
+            entry = cache.get(key, generations)
+            if entry is not None:
+                etag = entry['headers'].get('ETag')
+                if etag and etag_matches(unquote_etag(etag)[0]):
+                    return current_app.response_class(status=304, headers={
+                        name: value for name, value in entry['headers'].items()
+                        if name != 'Content-Type'})
+
+                return current_app.response_class(
+                    entry['body'], headers=entry['headers'])
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                headers = {name: response.headers[name]
+                           for name in CACHED_HEADERS
+                           if name in response.headers}
+                cache.set(key, response_tables, generations,
+                          response.get_data(), headers, ttl)
+
+            return response
+        return wrapper
+    return cached_response_decorator
@@ -0,0 +1,83 @@
+from functools import partial
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from .models import Client, ClientContact, Contact
+from .imports import DEFAULT_IMPORT_CHUNK_SIZE, import_csv
+from .rollups import rebuild_issue_counts
+from .views.clients import client_contact_from_csv_row
+from .views.contacts import contact_from_csv_row
+
+'''
+CLI Commands - Data Import
+
+$ flask import contacts contacts.csv --chunk-size 1000
+$ flask import client-contacts 12 client_contacts.csv
+'''
+import_cli = AppGroup('import', help='Import contacts from CSV files.')
+
+
+def echo_import_progress(chunk_results) -> None:
+    imported = 0
+    failed = 0
+    for result in chunk_results:
+        imported += result.get('imported')
+        failed += result.get('rows') - result.get('imported')
+        click.echo(
+            f"Chunk {result.get('chunk')}: {result.get('imported')} of "
+            f"{result.get('rows')} rows imported")
+        for error in result.get('errors'):
+            click.echo(f"  line {error.get('line')}: {error.get('message')}",
+                       err=True)
+
+    click.echo(f"Import complete: {imported} rows imported, {failed} failed")
+
+
+def get_chunk_size(chunk_size: int) -> int:
+    if chunk_size is None:
+        return current_app.config.get(
+            'IMPORT_CHUNK_SIZE', DEFAULT_IMPORT_CHUNK_SIZE)
+    return chunk_size
+
+
+@import_cli.command('contacts')
+@click.argument('csv_file', type=click.File('rb'))
+@click.option('--chunk-size', type=click.IntRange(min=1), default=None,
+              help='Number of rows committed per chunk.')
+def import_contacts_command(csv_file, chunk_size):
+    """Import internal contacts from a CSV file."""
+    echo_import_progress(import_csv(
+        csv_file, Contact.__table__, contact_from_csv_row,
+        get_chunk_size(chunk_size)))
+
+
+@import_cli.command('client-contacts')
+@click.argument('client_id', type=int)
+@click.argument('csv_file', type=click.File('rb'))
+@click.option('--chunk-size', type=click.IntRange(min=1), default=None,
+              help='Number of rows committed per chunk.')
+def import_client_contacts_command(client_id, csv_file, chunk_size):
+    """Import the contacts of a client from a CSV file."""
+    if not Client.query.get(client_id):
+        raise click.BadParameter('The client does not exist',
+                                 param_hint='CLIENT_ID')
+
+    echo_import_progress(import_csv(
+        csv_file, ClientContact.__table__,
+        partial(client_contact_from_csv_row, client_id),
+        get_chunk_size(chunk_size)))
+
+
+'''
+CLI Commands - Rollup Tables
+
+$ flask rebuild issue-counts
+'''
+rebuild_cli = AppGroup('rebuild', help='Rebuild the rollup tables.')
+
+
+@rebuild_cli.command('issue-counts')
+def rebuild_issue_counts_command():
+    """Recompute the issue counts per client, consultant and status."""
+    rows = rebuild_issue_counts()
+    click.echo(f"Issue counts rebuilt: {rows} rows")
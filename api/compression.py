@@ -0,0 +1,184 @@
+import time
+import zlib
+from threading import Lock
+from typing import Iterable, Iterator, Optional
+from flask import Flask, current_app, request
+from werkzeug import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CONTENT_ENCODINGS = ['zstd', 'br', 'gzip']
+
+DEFAULT_COMPRESSION_MIN_SIZE = 1024
+DEFAULT_COMPRESSION_LEVELS = {'zstd': 3, 'br': 5, 'gzip': 6}
+
+COMPRESSIBLE_TYPES = ['application/json', 'application/x-ndjson',
+                      'application/xml', 'text/csv', 'text/html',
+                      'text/plain']
+
+'''
+Response Compression
+
+Responses are compressed with the best encoding both the client and the
+server support, preferring zstd, then brotli, then gzip. brotli and zstd
+are used when the brotli and zstandard packages are installed. The CPU
+time spent compressing is recorded in compression_metrics.
+'''
+
+compression_metrics = {}
+metrics_lock = Lock()
+
+
+def record_compression(encoding: str, bytes_in: int, bytes_out: int,
+                       cpu_seconds: float, responses: int = 0) -> None:
+    with metrics_lock:
+        metrics = compression_metrics.setdefault(encoding, {
+            'responses': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'cpu_seconds': 0.0
+        })
+        metrics['responses'] += responses
+        metrics['bytes_in'] += bytes_in
+        metrics['bytes_out'] += bytes_out
+        metrics['cpu_seconds'] += cpu_seconds
+
+
+def get_compression_metrics() -> dict:
+    with metrics_lock:
+        return {encoding: dict(metrics)
+                for encoding, metrics in compression_metrics.items()}
+
+
+class Compressor:
+    # compress() flushes after each chunk so streamed data is not held back
+    def __init__(self, encoding: str, level: int) -> None:
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self.engine = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == 'br':
+            self.engine = brotli.Compressor(quality=level)
+        else:
+            self.engine = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'gzip':
+            return self.engine.compress(data) + self.engine.flush(
+                zlib.Z_SYNC_FLUSH)
+        if self.encoding == 'br':
+            return self.engine.process(data) + self.engine.flush()
+        return self.engine.compress(data) + self.engine.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'gzip':
+            return self.engine.flush(zlib.Z_FINISH)
+        if self.encoding == 'br':
+            return self.engine.finish()
+        return self.engine.flush()
+
+
+def available_encodings() -> list:
+    encodings = []
+    if zstandard is not None:
+        encodings.append('zstd')
+    if brotli is not None:
+        encodings.append('br')
+    encodings.append('gzip')
+    return encodings
+
+
+def select_encoding() -> Optional[str]:
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def get_level(encoding: str) -> int:
+    levels = current_app.config.get(
+        'COMPRESSION_LEVELS', DEFAULT_COMPRESSION_LEVELS)
+    return levels.get(encoding, DEFAULT_COMPRESSION_LEVELS[encoding])
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str,
+                    level: int) -> Iterator[bytes]:
+    compressor = Compressor(encoding, level)
+    for chunk in chunks:
+        started = time.thread_time()
+        compressed = compressor.compress(chunk)
+        record_compression(encoding, len(chunk), len(compressed),
+                           time.thread_time() - started)
+        if compressed:
+            yield compressed
+
+    started = time.thread_time()
+    compressed = compressor.finish()
+    record_compression(encoding, 0, len(compressed),
+                       time.thread_time() - started, responses=1)
+    yield compressed
+
+
+def is_compressible(response: Response) -> bool:
+    return (response.status_code == 200 and
+            not response.direct_passthrough and
+            'Content-Encoding' not in response.headers and
+            response.mimetype in COMPRESSIBLE_TYPES)
+
+
+def encode_etag(response: Response, encoding: str) -> None:
+    # the compressed body is a different representation with its own tag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+
+
+def compress_response(response: Response) -> Response:
+    response.vary.add('Accept-Encoding')
+
+    encoding = select_encoding()
+    if encoding is None:
+        return response
+
+    # a 304 repeats the tag of the representation the client holds
+    if response.status_code == 304:
+        etag, weak = response.get_etag()
+        if etag and request.if_none_match.contains(f'{etag}-{encoding}'):
+            encode_etag(response, encoding)
+        return response
+
+    if not is_compressible(response):
+        return response
+
+    level = get_level(encoding)
+
+    if response.is_streamed:
+        response.response = compress_stream(
+            response.iter_encoded(), encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        min_size = current_app.config.get(
+            'COMPRESSION_MIN_SIZE', DEFAULT_COMPRESSION_MIN_SIZE)
+        if len(data) < min_size:
+            return response
+
+        started = time.thread_time()
+        compressor = Compressor(encoding, level)
+        compressed = compressor.compress(data) + compressor.finish()
+        record_compression(encoding, len(data), len(compressed),
+                           time.thread_time() - started, responses=1)
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+    encode_etag(response, encoding)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    app.after_request(compress_response)
@@ -0,0 +1,114 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Iterable, List, Optional, Tuple
+from flask import current_app, g, make_response, request
+from flask_sqlalchemy import BaseQuery
+from sqlalchemy import inspect
+from .compression import CONTENT_ENCODINGS
+from .models import DEFAULT_PAGE_SIZE
+
+'''
+Conditional GET
+
+A request with If-None-Match is first checked against a strong ETag built
+from the version columns of the rows it would return, read by a query that
+only selects their keys and versions, and a match is answered with 304 Not
+Modified. Responses to those requests carry the version ETag so the next
+poll can be answered the same way. Requests without If-None-Match skip the
+version query and are tagged with a hash of the response body, their
+Last-Modified is the newest updated_at of the rows the view loaded.
+'''
+
+Validators = Tuple[str, Optional[datetime]]
+
+
+def version_columns(model) -> list:
+    return list(inspect(model).primary_key) + [model.version, model.updated_at]
+
+
+def version_rows(query: BaseQuery, model) -> list:
+    return query.with_entities(*version_columns(model)).all()
+
+
+def page_version_rows(query: BaseQuery, model) -> Tuple[list, int]:
+    # the same page as the list endpoint, plus the total as it sets "pages"
+    page_size = request.args.get(
+        'page_size', default=DEFAULT_PAGE_SIZE, type=int)
+    page = request.args.get('page', default=1, type=int)
+    versions_page = query.with_entities(*version_columns(model)).paginate(
+        page, page_size, False)
+    return versions_page.items, versions_page.total
+
+
+def make_validators(rows: List[tuple], *extra) -> Optional[Validators]:
+    # the full path is part of the tag as parameters such as fields change
+    # the representation of the same rows
+    if not rows:
+        return None
+
+    row_tokens = repr([tuple(row) for row in rows])
+    token = f'{request.full_path}|{extra!r}|{row_tokens}'
+    etag = hashlib.sha1(token.encode()).hexdigest()
+    last_modified = max(row[-1] for row in rows)
+    return etag, last_modified
+
+
+def set_last_modified(rows: Iterable, updated_at: Callable = None) -> None:
+    # rows selected without updated_at, as with ?fields=, leave it unset
+    updated_at = updated_at or (lambda row: getattr(row, 'updated_at', None))
+    values = [value for value in map(updated_at, rows) if value is not None]
+    if values:
+        g.last_modified = max(values)
+
+
+def etag_matches(etag: str) -> bool:
+    # compressed responses carry the tag with the encoding appended
+    if_none_match = request.if_none_match
+    return if_none_match.contains(etag) or any(
+        if_none_match.contains(f'{etag}-{encoding}')
+        for encoding in CONTENT_ENCODINGS)
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
+
+
+def conditional_get(get_validators: Callable[..., Optional[Validators]]):
+    # get_validators receives the view arguments and is only called when
+    # the request has If-None-Match, when it is not called or returns None
+    # the ETag is computed from the response body instead and Last-Modified
+    # is the value the view gave set_last_modified
+    def conditional_get_decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            # the sub-requests of a batch share g
+            g.pop('last_modified', None)
+            validators = None
+            if request.if_none_match:
+                validators = get_validators(*args, **kwargs)
+                if validators and etag_matches(validators[0]):
+                    return not_modified(*validators)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            if validators:
+                response.set_etag(validators[0])
+                response.last_modified = validators[1]
+                return response
+
+            last_modified = g.pop('last_modified', None)
+            etag = hashlib.sha1(response.get_data()).hexdigest()
+            if etag_matches(etag):
+                return not_modified(etag, last_modified)
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            return response
+        return wrapper
+    return conditional_get_decorator
@@ -0,0 +1,86 @@
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+from flask import abort, request
+from flask_sqlalchemy import BaseQuery
+from sqlalchemy import inspect
+from .models import db
+
+'''
+Sparse Fieldsets
+
+?fields=id,name limits the columns selected by the query, the rows are
+then formatted straight from the result tuples rather than loading the
+full model. Columns an endpoint needs to build the response are selected
+as well and dropped before the response is returned
+'''
+
+
+def get_requested_fields(model, required: Iterable[str] = ()) -> Optional[List[str]]:
+    fields_arg = request.args.get('fields')
+    if not fields_arg:
+        return None
+
+    column_names = inspect(model).column_attrs.keys()
+    fields = []
+    for name in fields_arg.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in column_names:
+            abort(400)
+        if name not in fields:
+            fields.append(name)
+
+    if not fields:
+        abort(400)
+
+    # add any columns the endpoint needs to build the response
+    for name in required:
+        if name not in fields:
+            fields.append(name)
+
+    return fields
+
+
+def select_fields(query: BaseQuery, model,
+                  required: Iterable[str] = ()) -> BaseQuery:
+    fields = get_requested_fields(model, required)
+    if fields is None:
+        return query
+
+    return query.with_entities(*[getattr(model, name) for name in fields])
+
+
+def drop_unrequested_fields(results: List[dict],
+                            required: Iterable[str]) -> None:
+    '''
+    Remove the required columns the caller did not ask for once the
+    response has been built from them
+    '''
+    fields_arg = request.args.get('fields')
+    if not fields_arg:
+        return
+
+    requested = {name.strip() for name in fields_arg.split(',')}
+    unrequested = [name for name in required if name not in requested]
+    for result in results:
+        for name in unrequested:
+            result.pop(name, None)
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+def format_result(result) -> dict:
+    # model instances use their own format(), projected rows are
+    # formatted column by column
+    if isinstance(result, db.Model):
+        return result.format()
+
+    return {key: format_value(value)
+            for key, value in result._asdict().items()}
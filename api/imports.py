@@ -0,0 +1,181 @@
+import csv
+import io
+import json
+from typing import Callable, IO, Iterator, List, Optional, Tuple
+from flask import abort, current_app, jsonify, request, stream_with_context
+from sqlalchemy import Table
+from sqlalchemy.exc import DatabaseError
+from .models import db, notify_write
+
+DEFAULT_IMPORT_CHUNK_SIZE = 500
+
+'''
+CSV Import Helpers
+
+Uploaded files are read as a stream and committed in chunks so large
+imports never need the whole file in memory. With ?progress=1 the result
+of each chunk is sent as a line of newline delimited JSON as soon as the
+chunk is committed, followed by a line with the totals.
+'''
+
+
+def get_import_stream() -> IO[bytes]:
+    # accept either a multipart upload named "file" or a raw text/csv body
+    upload = request.files.get('file')
+    if upload:
+        return upload.stream
+
+    if request.mimetype == 'text/csv':
+        return request.stream
+
+    abort(400)
+
+
+def get_import_chunk_size() -> int:
+    default_size = current_app.config.get(
+        'IMPORT_CHUNK_SIZE', DEFAULT_IMPORT_CHUNK_SIZE)
+    chunk_size = request.args.get('chunk_size', default=default_size, type=int)
+
+    if chunk_size < 1:
+        abort(400)
+
+    return chunk_size
+
+
+def read_csv_chunks(stream: IO[bytes],
+                    chunk_size: int) -> Iterator[List[Tuple[int, dict]]]:
+    # yield lists of (line number, row) pairs, empty values become None so
+    # the rows can be checked with the same rules as the JSON request bodies
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text_stream)
+
+    chunk = []
+    for row in reader:
+        values = {key: (value if value != '' else None)
+                  for key, value in row.items() if key is not None}
+        chunk.append((reader.line_num, values))
+
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def import_csv(stream: IO[bytes], table: Table,
+               build_row: Callable[[dict], Optional[dict]],
+               chunk_size: int) -> Iterator[dict]:
+    # validate, bulk insert and commit each chunk, yielding a progress
+    # record for every chunk processed
+    chunk_nbr = 0
+    chunks = read_csv_chunks(stream, chunk_size)
+
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        except (csv.Error, UnicodeDecodeError) as read_error:
+            print(read_error)
+            yield {
+                'chunk': chunk_nbr + 1,
+                'rows': 0,
+                'imported': 0,
+                'errors': [{
+                    'line': None,
+                    'message': 'The file could not be read as CSV'
+                }]
+            }
+            return
+
+        chunk_nbr += 1
+        rows = []
+        errors = []
+        for line_nbr, values in chunk:
+            row = build_row(values)
+            if row is None:
+                errors.append({
+                    'line': line_nbr,
+                    'message': 'The row failed validation'
+                })
+            else:
+                rows.append(row)
+
+        imported = 0
+        if rows:
+            try:
+                db.session.execute(table.insert(), rows)
+                db.session.commit()
+                notify_write(table.name)
+                imported = len(rows)
+
+            except DatabaseError as db_error:
+                print(db_error)
+                db.session.rollback()
+                errors.append({
+                    'line': None,
+                    'message': 'The chunk could not be saved to the database'
+                })
+
+        yield {
+            'chunk': chunk_nbr,
+            'first_line': chunk[0][0],
+            'last_line': chunk[-1][0],
+            'rows': len(chunk),
+            'imported': imported,
+            'errors': errors
+        }
+
+
+def import_summary(chunk_results: Iterator[dict]) -> dict:
+    # only the per chunk progress records are kept, never the rows
+    chunks = []
+    imported = 0
+    failed = 0
+    for result in chunk_results:
+        chunks.append(result)
+        imported += result.get('imported')
+        failed += result.get('rows') - result.get('imported')
+
+    return {
+        'imported': imported,
+        'failed': failed,
+        'chunks': chunks
+    }
+
+
+def import_progress_lines(chunk_results: Iterator[dict],
+                          message: str) -> Iterator[str]:
+    imported = 0
+    failed = 0
+    for result in chunk_results:
+        imported += result.get('imported')
+        failed += result.get('rows') - result.get('imported')
+        yield json.dumps(result) + '\n'
+
+    yield json.dumps({
+        'success': True,
+        'message': message,
+        'imported': imported,
+        'failed': failed
+    }) + '\n'
+
+
+def import_response(chunk_results: Iterator[dict], message: str):
+    progress = request.args.get('progress', default=0, type=int)
+    if progress not in [0, 1]:
+        abort(400)
+
+    # the chunks are read, saved and reported while the response is sent
+    if progress == 1:
+        return current_app.response_class(
+            stream_with_context(import_progress_lines(chunk_results,
+                                                      message)),
+            mimetype='application/x-ndjson')
+
+    return jsonify({
+        'success': True,
+        'message': message,
+        **import_summary(chunk_results)
+    }), 200
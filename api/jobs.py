@@ -0,0 +1,261 @@
+import multiprocessing
+import time
+from datetime import datetime, timedelta
+from threading import Event, Thread
+from typing import Callable, Dict, List, Optional
+from flask import Flask, current_app
+from sqlalchemy import func, update
+from .models import Job, db, notify_write
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_POLL_INTERVAL = 1.0
+DEFAULT_JOB_HEARTBEAT_INTERVAL = 10
+DEFAULT_JOB_STALE_AFTER = 60
+DEFAULT_JOB_MAX_ATTEMPTS = 3
+
+'''
+Background Jobs
+
+Work that is too slow for a request is queued in the Jobs table and the
+request returns 202 Accepted with the job id. Worker processes started by
+worker.py claim queued jobs oldest first and run them, so at most
+JOB_WORKERS jobs run at once. A job handler reports its progress with
+set_job_progress and returns a JSON serialisable result that is stored on
+the job. On Postgres the queued jobs are claimed with SELECT ... FOR UPDATE
+SKIP LOCKED so workers never wait on each other.
+
+While a job runs its worker writes heartbeat_at every JOB_HEARTBEAT_INTERVAL
+seconds. A running job without a heartbeat for JOB_STALE_AFTER seconds
+belongs to a worker that died, it is queued again, or failed once it has
+been claimed JOB_MAX_ATTEMPTS times. Every claim counts an attempt and a
+worker only finishes the attempt it claimed, so a late finish from a worker
+that was given up on is ignored. run_workers starts a new worker process in
+place of any that exits.
+'''
+
+job_handlers: Dict[str, Callable[[Job], Optional[dict]]] = {}
+
+
+def job_handler(job_type: str):
+    def job_handler_decorator(handler):
+        job_handlers[job_type] = handler
+        return handler
+    return job_handler_decorator
+
+
+def enqueue_job(job_type: str, permission: str, params: dict) -> Job:
+    job = Job(job_type=job_type, permission=permission, params=params,
+              status='queued')
+    db.session.add(job)
+    db.session.commit()
+    notify_write(Job.__tablename__)
+    return job
+
+
+def set_job_progress(job_id: int, progress: int,
+                     total: Optional[int] = None) -> None:
+    # progress is also a heartbeat
+    values = {'progress': progress, 'heartbeat_at': datetime.utcnow()}
+    if total is not None:
+        values['total'] = total
+    db.session.execute(update(Job).where(
+        Job.id == job_id, Job.status == 'running').values(**values))
+    db.session.commit()
+
+
+def claim_job() -> Optional[Job]:
+    job = Job.query.filter(Job.status == 'queued').order_by(Job.id).limit(
+        1).with_for_update(skip_locked=True).first()
+    if job is None:
+        db.session.rollback()
+        return None
+
+    # the status check stops two workers claiming the same job on databases
+    # without row locks
+    now = datetime.utcnow()
+    claimed = db.session.execute(update(Job).where(
+        Job.id == job.id, Job.status == 'queued').values(
+        status='running', started_at=now, heartbeat_at=now,
+        attempts=Job.attempts + 1))
+    db.session.commit()
+    if claimed.rowcount == 0:
+        return None
+
+    db.session.refresh(job)
+    return job
+
+
+def finish_job(job_id: int, attempt: int, status: str,
+               result: Optional[dict] = None,
+               error: Optional[str] = None) -> None:
+    # a job that was given up on and claimed again is left to the new claim
+    db.session.execute(update(Job).where(
+        Job.id == job_id, Job.status == 'running',
+        Job.attempts == attempt).values(
+        status=status, result=result, error=error,
+        finished_at=datetime.utcnow()))
+    db.session.commit()
+    notify_write(Job.__tablename__)
+
+
+def beat(job_id: int, attempt: int) -> None:
+    db.session.execute(update(Job).where(
+        Job.id == job_id, Job.status == 'running',
+        Job.attempts == attempt).values(heartbeat_at=datetime.utcnow()))
+    db.session.commit()
+
+
+def start_heartbeat(app: Flask, job_id: int, attempt: int) -> Event:
+    '''
+    Write the heartbeat of a job from a thread, with its own session, until
+    the returned event is set
+    '''
+    stopped = Event()
+    interval = app.config.get(
+        'JOB_HEARTBEAT_INTERVAL', DEFAULT_JOB_HEARTBEAT_INTERVAL)
+
+    def run_heartbeat():
+        with app.app_context():
+            while not stopped.wait(interval):
+                try:
+                    beat(job_id, attempt)
+                except Exception as error:
+                    print(error)
+                    db.session.rollback()
+            db.session.remove()
+
+    Thread(target=run_heartbeat, daemon=True).start()
+    return stopped
+
+
+def recover_stale_jobs(stale_after: int, max_attempts: int) -> int:
+    '''
+    Queue again the running jobs without a heartbeat for stale_after
+    seconds, or fail them once they have had max_attempts, and return the
+    number of jobs recovered
+    '''
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale = [Job.status == 'running',
+             func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff]
+
+    # coalesce can not be evaluated against the session's jobs
+    options = {'synchronize_session': False}
+
+    requeued = db.session.execute(update(Job).where(
+        *stale, Job.attempts < max_attempts).values(
+        status='queued', started_at=None, heartbeat_at=None),
+        execution_options=options)
+    failed = db.session.execute(update(Job).where(
+        *stale, Job.attempts >= max_attempts).values(
+        status='failed', finished_at=datetime.utcnow(),
+        error=f'The job stopped without finishing {max_attempts} times'),
+        execution_options=options)
+    db.session.commit()
+
+    recovered = requeued.rowcount + failed.rowcount
+    if recovered:
+        print(f'Recovered {recovered} stale jobs')
+        notify_write(Job.__tablename__)
+    return recovered
+
+
+def run_job(job: Job) -> None:
+    # read before the handler runs, a rollback expires the job
+    job_id = job.id
+    attempt = job.attempts
+    stopped = start_heartbeat(current_app._get_current_object(),
+                              job_id, attempt)
+
+    try:
+        handler = job_handlers[job.job_type]
+        result = handler(job)
+
+    except Exception as error:
+        print(error)
+        db.session.rollback()
+        finish_job(job_id, attempt, 'failed', error=str(error))
+        return
+
+    finally:
+        stopped.set()
+
+    finish_job(job_id, attempt, 'complete', result=result)
+
+
+def work(app: Flask, max_jobs: Optional[int] = None) -> int:
+    '''
+    Claim and run queued jobs until max_jobs have run, or forever when
+    max_jobs is None, and return the number of jobs run
+    '''
+    poll_interval = app.config.get(
+        'JOB_POLL_INTERVAL', DEFAULT_JOB_POLL_INTERVAL)
+    recovery_interval = app.config.get(
+        'JOB_HEARTBEAT_INTERVAL', DEFAULT_JOB_HEARTBEAT_INTERVAL)
+    stale_after = app.config.get('JOB_STALE_AFTER', DEFAULT_JOB_STALE_AFTER)
+    max_attempts = app.config.get(
+        'JOB_MAX_ATTEMPTS', DEFAULT_JOB_MAX_ATTEMPTS)
+    next_recovery = 0
+    jobs_run = 0
+
+    with app.app_context():
+        # connections inherited from the parent process are not shared
+        db.engine.dispose()
+
+        while max_jobs is None or jobs_run < max_jobs:
+            if time.monotonic() >= next_recovery:
+                recover_stale_jobs(stale_after, max_attempts)
+                next_recovery = time.monotonic() + recovery_interval
+
+            job = claim_job()
+            if job is None:
+                if max_jobs is not None:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            run_job(job)
+            jobs_run += 1
+
+    return jobs_run
+
+
+def restart_workers(workers: List[multiprocessing.Process],
+                    start_worker: Callable[[], multiprocessing.Process]) -> int:
+    '''
+    Replace the workers that have exited with new ones and return the
+    number replaced
+    '''
+    restarted = 0
+    for index, worker in enumerate(workers):
+        if worker.is_alive():
+            continue
+
+        print(f'Worker {worker.pid} exited with {worker.exitcode}, '
+              f'starting a new worker')
+        workers[index] = start_worker()
+        restarted += 1
+
+    return restarted
+
+
+def run_workers(app: Flask) -> None:
+    # each worker is a forked process with its own database connections
+    context = multiprocessing.get_context('fork')
+    poll_interval = app.config.get(
+        'JOB_POLL_INTERVAL', DEFAULT_JOB_POLL_INTERVAL)
+
+    def start_worker() -> multiprocessing.Process:
+        worker = context.Process(target=work, args=(app,), daemon=True)
+        worker.start()
+        return worker
+
+    workers = [start_worker() for _ in range(app.config.get(
+        'JOB_WORKERS', DEFAULT_JOB_WORKERS))]
+
+    try:
+        while True:
+            restart_workers(workers, start_worker)
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
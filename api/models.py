@@ -1,14 +1,77 @@
-from typing import Dict
+from datetime import date, datetime
+from typing import Callable, List, Optional
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from sqlalchemy import Column, String, Integer, Date, Boolean, ForeignKey
+from sqlalchemy import (DDL, CheckConstraint, Column, String,
+                        Integer, Date, DateTime, Boolean, ForeignKey, Index,
+                        JSON, and_, cast, delete, event, false, func, insert,
+                        literal, literal_column, or_, select, true, update)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship, validates
+from sqlalchemy.sql.expression import FunctionElement
 
 DEFAULT_PAGE_SIZE = 20
+DEFAULT_DELETE_BATCH_SIZE = 1000
 
-db = SQLAlchemy()
+CONTACT_TYPES = ['consultant', 'clientmanager', 'other']
+REPORT_STATUSES = ['new', 'in-progess', 'complete', 'reviewed', 'issued']
+ISSUE_STATUSES = ['open', 'on-hold', 'resolved', 'blocked']
+ITEM_TYPES = ['requested_task', 'work_undertaken', 'follow_up_task',
+              'customer_task', 'issue_identified']
+
+# the item types that count towards a consultant's workload until complete
+TASK_ITEM_TYPES = ['requested_task', 'follow_up_task']
+
+ISSUE_ITEM_TYPE = 'issue_identified'
+# the issue statuses that still need action
+OPEN_ISSUE_STATUSES = ['open', 'blocked']
+# an issue saved without a status is open
+DEFAULT_ISSUE_STATUS = 'open'
+
+# the items copied into the next report of an engagement while incomplete,
+# issues are copied until they are resolved
+CARRY_FORWARD_TASK_TYPES = ['follow_up_task', 'customer_task']
+RESOLVED_ISSUE_STATUS = 'resolved'
+
+JOB_STATUSES = ['queued', 'running', 'complete', 'failed']
+
+# objects keep their values after a commit, the row just written is not
+# selected again when the response is formatted
+db = SQLAlchemy(session_options={'expire_on_commit': False})
 migrate = Migrate()
 
+# listeners called with a table name once a write to it has been committed
+write_listeners = []
+
+
+def on_write(listener):
+    write_listeners.append(listener)
+    return listener
+
+
+def notify_write(*table_names: str) -> None:
+    for table_name in table_names:
+        for listener in write_listeners:
+            listener(table_name)
+
+
+class utcnow(FunctionElement):
+    # the database clock in UTC, used for every updated_at so the values of
+    # ORM writes, bulk updates and INSERT ... SELECT come from one clock
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, 'postgresql')
+def utcnow_postgresql(element, compiler, **kw):
+    return "timezone('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow)
+def utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is in UTC
+    return 'CURRENT_TIMESTAMP'
+
 '''
 Contact
 '''
@@ -23,6 +86,12 @@ class Contact(db.Model):
     position_title = Column(String(50), nullable=False)
     contact_type = (Column(String(20), nullable=False))
     status = (Column(String(1), nullable=False, default='A'))
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, nullable=False, default=utcnow(),
+                        onupdate=utcnow(), server_default=utcnow())
+
+    # the ORM increments version on every update
+    __mapper_args__ = {'version_id_col': version}
 
     def from_dict(self, data: dict) -> None:
         for key in data.keys():
@@ -31,7 +100,7 @@ class Contact(db.Model):
 
     @validates('contact_type')
     def validate_contact_type(self, key, contact_type: str):
-        assert contact_type in ['consultant', 'clientmanager', 'other']
+        assert contact_type in CONTACT_TYPES
         return contact_type
 
     def __init__(self, name, position_title, email_address, mobile_phone, contact_type) -> None:
@@ -42,26 +111,21 @@ class Contact(db.Model):
         self.contact_type = contact_type
 
     def format(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'position_title': self.position_title,
-            'email_address': self.email_address,
-            'mobile_phone': self.mobile_phone,
-            'contact_type': self.contact_type,
-            'status': self.status
-        }
+        return format_contact(self)
 
     def insert(self):
         db.session.add(self)
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def update(self):
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def delete(self):
         db.session.delete(self)
         db.session.commit()
+        notify_write(self.__tablename__)
 
 
 class Client(db.Model):
@@ -70,11 +134,16 @@ class Client(db.Model):
     name = Column(String, nullable=False)
     bus_reg_nbr = Column(String(20), nullable=False)
     abbreviation = Column(String(10), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, nullable=False, default=utcnow(),
+                        onupdate=utcnow(), server_default=utcnow())
+
+    __mapper_args__ = {'version_id_col': version}
+    # dependent rows are removed with set based deletes, see delete_client_rows
     contacts = relationship(
         'ClientContact',
         backref='client',
-        lazy='noload',
-        cascade="all, delete, delete-orphan")
+        lazy='noload')
     reports = relationship(
         'Report', 
         backref='client',
@@ -91,23 +160,21 @@ class Client(db.Model):
                 setattr(self, key, data.get(key))
 
     def format(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'abbreviation': self.abbreviation,
-            'bus_reg_nbr': self.bus_reg_nbr
-        }
+        return format_client(self)
 
     def insert(self):
         db.session.add(self)
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def update(self):
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def delete(self):
-        db.session.delete(self)
+        delete_client_rows(self.id)
         db.session.commit()
+        notify_write(*CLIENT_TABLES)
 
 
 class ClientContact(db.Model):
@@ -124,22 +191,14 @@ class ClientContact(db.Model):
     city = Column(String(50), nullable=True)
     state = Column(String(50), nullable=True)
     post_code = Column(String(10), nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, nullable=False, default=utcnow(),
+                        onupdate=utcnow(), server_default=utcnow())
+
+    __mapper_args__ = {'version_id_col': version}
 
     def format(self):
-        return {
-            'id': self.id,
-            'client_id': self.client_id,
-            'name': self.name,
-            'email_address': self.email_address,
-            'phone': self.phone,
-            'position_title': self.position_title,
-            'address_1': self.address_1,
-            'address_2': self.address_2,
-            'address_3': self.address_3,
-            'city': self.city,
-            'state': self.state,
-            'post_code': self.post_code
-        }
+        return format_client_contact(self)
 
     def __init__(self, name: str = None) -> None:
         self.name = name
@@ -152,13 +211,16 @@ class ClientContact(db.Model):
     def insert(self):
         db.session.add(self)
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def update(self):
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def delete(self):
         db.session.delete(self)
         db.session.commit()
+        notify_write(self.__tablename__)
 
 
 class Report(db.Model):
@@ -175,9 +237,26 @@ class Report(db.Model):
     report_to_date = Column(Date, nullable=True)
     engagement_reference = Column(String(20), nullable=False)
     report_status = Column(String(10), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, nullable=False, default=utcnow(),
+                        onupdate=utcnow(), server_default=utcnow())
+
+    __mapper_args__ = {'version_id_col': version}
+    __table_args__ = (
+        Index('ix_reports_report_date', report_date, id),
+        Index('ix_reports_engagement_date', engagement_reference,
+              report_date),
+        Index('ix_reports_client_date', client_id, report_date.desc(),
+              id.desc()),
+        # a period that ends before it starts is not a valid date range
+        CheckConstraint('report_to_date IS NULL OR '
+                        'report_to_date >= report_from_date',
+                        name='ck_reports_period'),
+    )
+    # report items are removed with set based deletes, see delete_report_rows
     report_items = relationship(
         "ReportItem", backref="report", lazy="select",
-        cascade="all, delete, delete-orphan")
+        passive_deletes='all')
 
     def from_dict(self, data: dict):
 
@@ -187,23 +266,11 @@ class Report(db.Model):
 
     @validates('report_status')
     def validate_report_status(self, key, status):
-        assert status in ['new', 'in-progess',
-                          'complete', 'reviewed', 'issued']
+        assert status in REPORT_STATUSES
         return status
 
     def format(self):
-        return {
-            'id': self.id,
-            'client_id': self.client_id,
-            'client_contact_id': self.client_contact_id,
-            'consulant_id': self.consulant_id,
-            'client_manager_id': self.client_manager_id,
-            'report_date': self.report_date.strftime('%Y-%m-%d'),
-            'report_from_date': self.report_from_date.strftime('%Y-%m-%d'),
-            'report_to_date': self.format_report_date(self.report_to_date),
-            'engagement_reference': self.engagement_reference,
-            'report_status': self.report_status
-        }
+        return format_report(self)
 
     def format_detailed(self):
         report_items = [format_report_item(i) for i in self.report_items]
@@ -212,21 +279,46 @@ class Report(db.Model):
         return report
 
     def format_report_date(self, date):
-        if date is None:
-            return None
-        else:
-            return date.strftime('%Y-%m-%d')
+        return format_date(date)
 
     def insert(self):
         db.session.add(self)
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def update(self):
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def delete(self):
-        db.session.delete(self)
+        delete_report_rows(self.id)
         db.session.commit()
+        notify_write(*REPORT_TABLES)
+
+
+# the period a report covers as an inclusive daterange, a NULL
+# report_to_date leaves the range open ended. Postgres indexes the range
+# with GiST for overlap queries, SQLite indexes the two dates
+REPORT_PERIOD_INDEX = DDL('''
+CREATE INDEX IF NOT EXISTS ix_reports_period ON "Reports"
+    USING gist (daterange(report_from_date, report_to_date, '[]'))
+''')
+REPORT_PERIOD_DATES_INDEX = DDL('''
+CREATE INDEX IF NOT EXISTS ix_reports_period ON "Reports"
+    (report_from_date, report_to_date)
+''')
+
+event.listen(Report.__table__, 'after_create',
+             REPORT_PERIOD_INDEX.execute_if(dialect='postgresql'))
+event.listen(Report.__table__, 'after_create',
+             REPORT_PERIOD_DATES_INDEX.execute_if(dialect='sqlite'))
+
+
+def issue_status_in(issue_status, issue_statuses: List[str]):
+    # a NULL status is the default status, see DEFAULT_ISSUE_STATUS
+    if DEFAULT_ISSUE_STATUS in issue_statuses:
+        return or_(issue_status.in_(issue_statuses), issue_status.is_(None))
+    return issue_status.in_(issue_statuses)
 
 
 class ReportItem(db.Model):
@@ -240,6 +332,27 @@ class ReportItem(db.Model):
     request_expected_outcome = Column(String, nullable=True)
     issue_status = Column(String(20), nullable=True)
     issue_action_description = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, nullable=False, default=utcnow(),
+                        onupdate=utcnow(), server_default=utcnow())
+
+    __mapper_args__ = {'version_id_col': version}
+    # only incomplete tasks and open issues are indexed, see
+    # open_task_filter and open_issue_filter
+    __table_args__ = (
+        Index('ix_report_items_open_tasks', report_id,
+              postgresql_where=and_(item_complete == false(),
+                                    item_type.in_(TASK_ITEM_TYPES)),
+              sqlite_where=and_(item_complete == false(),
+                                item_type.in_(TASK_ITEM_TYPES))),
+        Index('ix_report_items_open_issues', report_id, issue_status,
+              postgresql_where=and_(
+                  item_type == ISSUE_ITEM_TYPE,
+                  issue_status_in(issue_status, OPEN_ISSUE_STATUSES)),
+              sqlite_where=and_(
+                  item_type == ISSUE_ITEM_TYPE,
+                  issue_status_in(issue_status, OPEN_ISSUE_STATUSES))),
+    )
 
     def from_dict(self, data: dict) -> None:
         for key in data.keys():
@@ -248,13 +361,12 @@ class ReportItem(db.Model):
 
     @validates('issue_status')
     def validate_issue_status(self, key, issue_status):
-        assert issue_status in ['open', 'on-hold', 'resolved', 'blocked']
+        assert issue_status in ISSUE_STATUSES
         return issue_status
 
     @validates('item_type')
     def validate_item_type(self, key, item_type):
-        assert item_type in ['requested_task', 'work_undertaken',
-                             'follow_up_task', 'customer_task', 'issue_identified']
+        assert item_type in ITEM_TYPES
         return item_type
 
     def format(self):
@@ -263,13 +375,262 @@ class ReportItem(db.Model):
     def insert(self):
         db.session.add(self)
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def update(self):
         db.session.commit()
+        notify_write(self.__tablename__)
 
     def delete(self):
         db.session.delete(self)
         db.session.commit()
+        notify_write(self.__tablename__)
+
+
+class IssueCount(db.Model):
+    # a rollup of the issue_identified report items per client, consultant
+    # and status, derived from Report_Items so it has no foreign keys,
+    # see api/rollups.py
+    __tablename__ = "Issue_Counts"
+    client_id = Column(Integer, primary_key=True)
+    consultant_id = Column(Integer, primary_key=True)
+    issue_status = Column(String(20), primary_key=True)
+    issue_count = Column(Integer, nullable=False, default=0)
+
+    def format(self):
+        return {
+            'client_id': self.client_id,
+            'consultant_id': self.consultant_id,
+            'issue_status': self.issue_status,
+            'issue_count': self.issue_count
+        }
+
+'''
+Report Template
+'''
+
+
+class ReportTemplate(db.Model):
+    # a standard set of items a report can be started from, see
+    # api/report_templates.py
+    __tablename__ = "Report_Templates"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    description = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, nullable=False, default=utcnow(),
+                        onupdate=utcnow(), server_default=utcnow())
+
+    __mapper_args__ = {'version_id_col': version}
+    template_items = relationship(
+        "ReportTemplateItem", backref="template", lazy="select",
+        order_by="ReportTemplateItem.item_nbr", passive_deletes='all')
+
+    def format(self):
+        return format_report_template(self)
+
+
+class ReportTemplateItem(db.Model):
+    __tablename__ = "Report_Template_Items"
+    template_id = Column(Integer, ForeignKey('Report_Templates.id'),
+                         primary_key=True)
+    item_nbr = Column(Integer, nullable=False, primary_key=True)
+    item_type = Column(String(20), nullable=False)
+    item_sequence_nbr = Column(Integer, nullable=False)
+    item_description = Column(String, nullable=False)
+    request_expected_outcome = Column(String, nullable=True)
+
+    @validates('item_type')
+    def validate_item_type(self, key, item_type):
+        assert item_type in ITEM_TYPES
+        return item_type
+
+    def format(self):
+        return format_report_template_item(self)
+
+
+'''
+Job
+'''
+
+
+class Job(db.Model):
+    # work queued by a request and run by a worker process, see api/jobs.py
+    __tablename__ = "Jobs"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_type = Column(String(50), nullable=False)
+    # the permission a caller needs to see the job
+    permission = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default='queued')
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # written by the worker while the job runs, see recover_stale_jobs
+    heartbeat_at = Column(DateTime)
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        Index('ix_jobs_queued', id,
+              postgresql_where=(status == 'queued'),
+              sqlite_where=(status == 'queued')),
+        Index('ix_jobs_running', heartbeat_at,
+              postgresql_where=(status == 'running'),
+              sqlite_where=(status == 'running')),
+    )
+
+    @validates('status')
+    def validate_status(self, key, status: str):
+        assert status in JOB_STATUSES
+        return status
+
+    def format(self):
+        return format_job(self)
+
+
+def open_task_filter():
+    # matches the predicate of ix_report_items_open_tasks so the partial
+    # index can be used
+    return and_(ReportItem.item_complete == false(),
+                ReportItem.item_type.in_(TASK_ITEM_TYPES))
+
+
+def issue_status_filter(issue_statuses: List[str]):
+    return issue_status_in(ReportItem.issue_status, issue_statuses)
+
+
+def open_issue_filter(issue_statuses=OPEN_ISSUE_STATUSES):
+    # issue_statuses is a subset of OPEN_ISSUE_STATUSES so the predicate
+    # still implies the one of ix_report_items_open_issues
+    return and_(ReportItem.item_type == ISSUE_ITEM_TYPE,
+                issue_status_filter(issue_statuses))
+
+
+def date_range(from_date, to_date):
+    # the expression must match ix_reports_period for the index to be used
+    return func.daterange(from_date, to_date, literal_column("'[]'"))
+
+
+def period_overlap_filter(from_date: Optional[date],
+                          to_date: Optional[date]):
+    '''
+    Reports whose period shares at least one day with from_date to
+    to_date, either of which can be None for an open ended period
+    '''
+    if db.engine.dialect.name == 'postgresql':
+        return date_range(Report.report_from_date,
+                          Report.report_to_date).op('&&')(date_range(
+                              cast(from_date, Date), cast(to_date, Date)))
+
+    conditions = []
+    if to_date is not None:
+        conditions.append(Report.report_from_date <= to_date)
+    if from_date is not None:
+        conditions.append(or_(Report.report_to_date.is_(None),
+                              Report.report_to_date >= from_date))
+    return and_(true(), *conditions)
+
+# the format functions accept a model instance or a result row, so rows
+# returned by RETURNING statements share the model's representation
+def format_date(date):
+    if date is None:
+        return None
+    else:
+        return date.strftime('%Y-%m-%d')
+
+
+def format_contact(contact: Contact):
+    return {
+        'id': contact.id,
+        'name': contact.name,
+        'position_title': contact.position_title,
+        'email_address': contact.email_address,
+        'mobile_phone': contact.mobile_phone,
+        'contact_type': contact.contact_type,
+        'status': contact.status
+    }
+
+
+def format_client(client: Client):
+    return {
+        'id': client.id,
+        'name': client.name,
+        'abbreviation': client.abbreviation,
+        'bus_reg_nbr': client.bus_reg_nbr
+    }
+
+
+def format_client_contact(client_contact: ClientContact):
+    return {
+        'id': client_contact.id,
+        'client_id': client_contact.client_id,
+        'name': client_contact.name,
+        'email_address': client_contact.email_address,
+        'phone': client_contact.phone,
+        'position_title': client_contact.position_title,
+        'address_1': client_contact.address_1,
+        'address_2': client_contact.address_2,
+        'address_3': client_contact.address_3,
+        'city': client_contact.city,
+        'state': client_contact.state,
+        'post_code': client_contact.post_code
+    }
+
+
+def format_report(report: Report):
+    return {
+        'id': report.id,
+        'client_id': report.client_id,
+        'client_contact_id': report.client_contact_id,
+        'consulant_id': report.consulant_id,
+        'client_manager_id': report.client_manager_id,
+        'report_date': report.report_date.strftime('%Y-%m-%d'),
+        'report_from_date': report.report_from_date.strftime('%Y-%m-%d'),
+        'report_to_date': format_date(report.report_to_date),
+        'engagement_reference': report.engagement_reference,
+        'report_status': report.report_status
+    }
+
+
+def format_report_template(template: ReportTemplate):
+    return {
+        'id': template.id,
+        'name': template.name,
+        'description': template.description
+    }
+
+
+def format_report_template_item(item: ReportTemplateItem):
+    return {
+        'item_nbr': item.item_nbr,
+        'item_type': item.item_type,
+        'item_sequence_nbr': item.item_sequence_nbr,
+        'item_description': item.item_description,
+        'request_expected_outcome': item.request_expected_outcome
+    }
+
+
+def format_datetime(value: Optional[datetime]):
+    return value.isoformat() if value else None
+
+
+def format_job(job: Job):
+    return {
+        'id': job.id,
+        'job_type': job.job_type,
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'attempts': job.attempts,
+        'error': job.error,
+        'created_at': format_datetime(job.created_at),
+        'started_at': format_datetime(job.started_at),
+        'finished_at': format_datetime(job.finished_at)
+    }
 
 
 def format_report_item(item: ReportItem):
@@ -284,3 +645,193 @@ def format_report_item(item: ReportItem):
         'issue_status': item.issue_status,
         'issue_action_description': item.issue_action_description,
     }
+
+
+# columns a request body can never set directly
+SYSTEM_COLUMNS = ['version', 'updated_at']
+
+
+def updatable_values(model, data: dict) -> dict:
+    # the request values that name a column of the model, less the keys
+    table = model.__table__
+    return {key: value for key, value in data.items()
+            if key in table.c and key not in SYSTEM_COLUMNS and
+            not table.c[key].primary_key}
+
+
+def update_returning(model, key: dict, values: dict):
+    '''
+    Update the row identified by key in a single UPDATE ... RETURNING
+    statement, incrementing its version, and return the updated row or
+    None when no row matches. Databases without RETURNING read the row
+    back after the update instead.
+    '''
+    table = model.__table__
+    key_filter = [table.c[name] == value for name, value in key.items()]
+    statement = update(table).where(*key_filter).values(
+        version=table.c.version + 1, **values)
+
+    if db.engine.dialect.full_returning:
+        row = db.session.execute(statement.returning(*table.columns)).first()
+    else:
+        row = None
+        if db.session.execute(statement).rowcount:
+            row = db.session.execute(
+                select(*table.columns).where(*key_filter)).first()
+
+    db.session.commit()
+    if row is not None:
+        notify_write(table.name)
+
+    return row
+
+
+def delete_returning(model, key: dict):
+    '''
+    Delete the row identified by key with a single DELETE ... RETURNING
+    statement and return its primary key, or None when no row matches.
+    Dependent rows must be deleted first, the caller commits.
+    '''
+    table = model.__table__
+    key_filter = [table.c[name] == value for name, value in key.items()]
+    statement = delete(table).where(*key_filter)
+
+    if db.engine.dialect.full_returning:
+        return db.session.execute(
+            statement.returning(*table.primary_key)).first()
+
+    if db.session.execute(statement).rowcount:
+        return tuple(key.values())
+
+    return None
+
+
+def commit_delete(deleted, *table_names: str):
+    # commit a delete_returning result, notifying the tables when a row went
+    db.session.commit()
+    if deleted is not None:
+        notify_write(*table_names)
+
+    return deleted
+
+
+# the tables written by a report delete, in foreign key order
+REPORT_TABLES = ['Report_Items', 'Reports']
+
+
+def delete_report_rows(report_id: int):
+    # delete the report items and then the report, the caller commits
+    db.session.query(ReportItem).filter(
+        ReportItem.report_id == report_id).delete(synchronize_session=False)
+
+    return delete_returning(Report, {'id': report_id})
+
+
+def carry_forward_filter():
+    # the same open task and issue predicates as the workload and the
+    # issues feed, a task without item_complete is not open and an issue
+    # without a status is
+    unresolved_statuses = [issue_status for issue_status in ISSUE_STATUSES
+                           if issue_status != RESOLVED_ISSUE_STATUS]
+    return or_(
+        and_(ReportItem.item_type.in_(CARRY_FORWARD_TASK_TYPES),
+             ReportItem.item_complete == false()),
+        and_(ReportItem.item_type == ISSUE_ITEM_TYPE,
+             issue_status_filter(unresolved_statuses)))
+
+
+def carry_forward_items(from_report_id: int, to_report_id: int) -> int:
+    '''
+    Copy the incomplete tasks and unresolved issues of one report into
+    another with a single INSERT ... SELECT, numbering the copies from 1 in
+    their original order, and return the number of items copied. The
+    caller commits.
+    '''
+    item_columns = ['report_id', 'report_item_nbr', 'item_type',
+                    'item_sequence_nbr', 'item_description', 'item_complete',
+                    'request_expected_outcome', 'issue_status',
+                    'issue_action_description']
+    items = select(
+        literal(to_report_id),
+        func.row_number().over(order_by=ReportItem.report_item_nbr),
+        ReportItem.item_type, ReportItem.item_sequence_nbr,
+        ReportItem.item_description, ReportItem.item_complete,
+        ReportItem.request_expected_outcome, ReportItem.issue_status,
+        ReportItem.issue_action_description).where(
+        ReportItem.report_id == from_report_id, carry_forward_filter())
+
+    return db.session.execute(insert(ReportItem.__table__).from_select(
+        item_columns, items)).rowcount
+
+
+# the tables written by a client delete, in foreign key order
+CLIENT_TABLES = ['Report_Items', 'Reports', 'Client_Contacts', 'Clients']
+
+
+def delete_client_rows(client_id: int):
+    '''
+    Delete a client and its dependent rows with set based statements in
+    foreign key order: report items, reports, client contacts and then the
+    client. Returns the deleted client key, or None when there is no such
+    client, the caller commits.
+    '''
+    client_reports = select(Report.id).where(Report.client_id == client_id)
+
+    db.session.query(ReportItem).filter(
+        ReportItem.report_id.in_(client_reports)).delete(
+        synchronize_session=False)
+    db.session.query(Report).filter(
+        Report.client_id == client_id).delete(synchronize_session=False)
+    db.session.query(ClientContact).filter(
+        ClientContact.client_id == client_id).delete(
+        synchronize_session=False)
+
+    return delete_returning(Client, {'id': client_id})
+
+
+def purge_client_rows(client_id: int,
+                      batch_size: int = DEFAULT_DELETE_BATCH_SIZE,
+                      progress: Optional[Callable[[int], None]] = None) -> int:
+    '''
+    Delete a client in batches, committing after each batch so a client
+    with a large history never holds long running locks. progress is
+    called with the number of reports or client contacts in each batch
+    '''
+    while True:
+        report_ids = [report_id for report_id, in db.session.query(
+            Report.id).filter(Report.client_id == client_id).limit(
+            batch_size)]
+        if not report_ids:
+            break
+
+        db.session.query(ReportItem).filter(
+            ReportItem.report_id.in_(report_ids)).delete(
+            synchronize_session=False)
+        db.session.query(Report).filter(
+            Report.id.in_(report_ids)).delete(synchronize_session=False)
+        db.session.commit()
+        notify_write('Report_Items', 'Reports')
+        if progress:
+            progress(len(report_ids))
+
+    while True:
+        client_contact_ids = [client_contact_id for client_contact_id, in
+                              db.session.query(ClientContact.id).filter(
+                                  ClientContact.client_id == client_id).limit(
+                                  batch_size)]
+        if not client_contact_ids:
+            break
+
+        db.session.query(ClientContact).filter(
+            ClientContact.id.in_(client_contact_ids)).delete(
+            synchronize_session=False)
+        db.session.commit()
+        notify_write('Client_Contacts')
+        if progress:
+            progress(len(client_contact_ids))
+
+    deleted = db.session.query(Client).filter(
+        Client.id == client_id).delete(synchronize_session=False)
+    db.session.commit()
+    notify_write('Clients')
+    return deleted
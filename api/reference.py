@@ -0,0 +1,108 @@
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+from flask import current_app
+from .cache import get_generations
+from .fields import format_value
+from .models import CONTACT_TYPES, Contact, db
+
+DEFAULT_REFERENCE_CACHE_TTL = 300
+
+CONTACT_FIELDS = ['id', 'name', 'position_title', 'email_address',
+                  'mobile_phone', 'contact_type', 'status']
+
+'''
+Reference Data Cache
+
+The Contacts table is small and rarely changes, so the whole table is held
+in memory as tuples, indexed by id and grouped by contact type in the list
+order. A write to Contacts, seen through the table generations of the
+response cache, marks the data stale and it is reloaded on the next read.
+Each load builds a new snapshot, so a reader never sees half a reload. A
+request takes the snapshot once, with get_contact_snapshot, and reads all
+its contacts from it.
+'''
+
+
+class ContactSnapshot:
+    def __init__(self, columns: Dict[str, int], rows: List[tuple],
+                 generations: Optional[dict], expires: float) -> None:
+        # never changed once built, a reload builds a new snapshot
+        type_index = columns['contact_type']
+        self.columns = columns
+        self.rows = rows
+        self.by_id = {row[columns['id']]: row for row in rows}
+        self.by_type = {contact_type: [row for row in rows
+                                       if row[type_index] == contact_type]
+                        for contact_type in CONTACT_TYPES}
+        self.generations = generations
+        self.expires = expires
+
+    def get(self, contact_id: int) -> Optional[tuple]:
+        return self.by_id.get(contact_id)
+
+    def find(self, contact_type: str = None, search: str = None) -> List[tuple]:
+        rows = self.by_type.get(contact_type, self.rows)
+
+        if search:
+            # lower() as the ILIKE the search used before the cache
+            search_term = search.lower()
+            name_index = self.columns['name']
+            rows = [row for row in rows
+                    if search_term in (row[name_index] or '').lower()]
+
+        return rows
+
+    def value(self, row: tuple, name: str):
+        return row[self.columns[name]]
+
+    def format(self, row: tuple, fields: List[str] = None) -> dict:
+        return {name: format_value(row[self.columns[name]])
+                for name in fields or CONTACT_FIELDS}
+
+
+class ContactCache:
+    def __init__(self, ttl: int = DEFAULT_REFERENCE_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self.lock = Lock()
+        self.snapshot: Optional[ContactSnapshot] = None
+
+    def is_stale(self, snapshot: Optional[ContactSnapshot]) -> bool:
+        return (snapshot is None or snapshot.expires < time.monotonic() or
+                snapshot.generations != get_generations(['Contacts']))
+
+    def load(self) -> ContactSnapshot:
+        # read the generation first so a write during the load is not lost
+        generations = get_generations(['Contacts'])
+        columns = list(Contact.__table__.columns)
+        rows = [tuple(row) for row in db.session.query(*columns).order_by(
+            Contact.name.desc())]
+
+        return ContactSnapshot(
+            {column.key: index for index, column in enumerate(columns)},
+            rows, generations, time.monotonic() + self.ttl)
+
+    def refresh(self) -> ContactSnapshot:
+        # readers keep the snapshot they started with, a reload replaces
+        # it with a single assignment
+        snapshot = self.snapshot
+        if self.is_stale(snapshot):
+            with self.lock:
+                snapshot = self.snapshot
+                if self.is_stale(snapshot):
+                    snapshot = self.load()
+                    self.snapshot = snapshot
+        return snapshot
+
+
+def init_reference_cache(app) -> None:
+    app.extensions['contact_cache'] = ContactCache(app.config.get(
+        'REFERENCE_CACHE_TTL', DEFAULT_REFERENCE_CACHE_TTL))
+
+
+def get_contact_cache() -> ContactCache:
+    return current_app.extensions['contact_cache']
+
+
+def get_contact_snapshot() -> ContactSnapshot:
+    return get_contact_cache().refresh()
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+import tempfile
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import List, Optional, Tuple
+from flask import Flask, current_app
+from jinja2 import Environment, PackageLoader, select_autoescape
+from .models import ITEM_TYPES, Client, Report
+from .reference import get_contact_snapshot
+
+DEFAULT_RENDER_WORKERS = 2
+DEFAULT_RENDER_TIMEOUT = 60
+DEFAULT_RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+RENDER_FORMATS = {'html': 'text/html', 'pdf': 'application/pdf'}
+# reports that no longer change are kept in the render cache
+CACHED_STATUSES = ['issued']
+# part of the content hash, change it when the layout changes so cached
+# documents are rendered again
+RENDER_VERSION = 1
+
+ITEM_TYPE_TITLES = {
+    'requested_task': 'Requested Tasks',
+    'work_undertaken': 'Work Undertaken',
+    'follow_up_task': 'Follow Up Tasks',
+    'customer_task': 'Customer Tasks',
+    'issue_identified': 'Issues Identified'
+}
+
+'''
+Report Rendering
+
+A report and its items (Report.format_detailed) are turned into a document
+of plain values, which is rendered to HTML with a Jinja template or to PDF
+with the small PDF writer below, so no extra packages are needed. Renders
+run on a process pool so a large report does not hold the request thread's
+CPU. Issued reports are cached on disk under RENDER_CACHE_DIR in files named
+by the content hash of the document, a changed report or item gives a new
+hash and is rendered again. Once the cache holds more than
+RENDER_CACHE_MAX_BYTES the least recently used files are removed.
+'''
+
+templates = Environment(loader=PackageLoader('api', 'templates'),
+                        autoescape=select_autoescape(['html']))
+
+
+def contact_name(contact_id: int) -> Optional[str]:
+    contact_snapshot = get_contact_snapshot()
+    contact = contact_snapshot.get(contact_id)
+    return contact_snapshot.value(contact, 'name') if contact else None
+
+
+def report_document(report: Report) -> dict:
+    detailed = report.format_detailed()
+    client = Client.query.with_entities(Client.name).filter(
+        Client.id == report.client_id).first()
+
+    sections = []
+    for item_type in ITEM_TYPES:
+        items = sorted((item for item in detailed['report_items']
+                        if item['item_type'] == item_type),
+                       key=lambda item: (item['item_sequence_nbr'] or 0,
+                                         item['report_item_nbr']))
+        if not items:
+            continue
+
+        sections.append({
+            'title': ITEM_TYPE_TITLES[item_type],
+            'items': [{'description': item['item_description'],
+                       'notes': item_notes(item)} for item in items]
+        })
+
+    return {
+        'title': f"Report {detailed['engagement_reference']} "
+                 f"{detailed['report_date']}",
+        'details': [
+            ['Client', client.name if client else None],
+            ['Engagement', detailed['engagement_reference']],
+            ['Consultant', contact_name(detailed['consulant_id'])],
+            ['Client Manager', contact_name(detailed['client_manager_id'])],
+            ['Report Date', detailed['report_date']],
+            ['Period', ' to '.join(
+                date for date in [detailed['report_from_date'],
+                                  detailed['report_to_date']] if date)],
+            ['Status', detailed['report_status']]
+        ],
+        'sections': sections
+    }
+
+
+def item_notes(item: dict) -> List[str]:
+    notes = []
+    if item['request_expected_outcome']:
+        notes.append(f"Expected outcome: {item['request_expected_outcome']}")
+    if item['issue_status']:
+        notes.append(f"Issue status: {item['issue_status']}")
+    if item['issue_action_description']:
+        notes.append(f"Action: {item['issue_action_description']}")
+    if item['item_complete']:
+        notes.append('Complete')
+    return notes
+
+
+def content_hash(document: dict, render_format: str) -> str:
+    content = json.dumps([RENDER_VERSION, render_format, document],
+                         sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def render_html(document: dict) -> bytes:
+    return templates.get_template('report.html').render(
+        report=document).encode()
+
+
+'''
+PDF Writer
+
+Lays the document out as wrapped lines of text on A4 pages using the
+standard Helvetica fonts, which every PDF reader provides.
+'''
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+PAGE_MARGIN = 56
+# font name, size and the space before the line for each kind of line
+LINE_STYLES = {
+    'title': ('F2', 16, 0),
+    'heading': ('F2', 12, 14),
+    'text': ('F1', 10, 2),
+    'note': ('F1', 9, 0)
+}
+
+
+def document_lines(document: dict) -> List[Tuple[str, str]]:
+    lines = [('title', document['title'])]
+    lines += [('text', f'{label}: {value or ""}')
+              for label, value in document['details']]
+    for section in document['sections']:
+        lines.append(('heading', section['title']))
+        for number, item in enumerate(section['items'], start=1):
+            lines.append(('text', f"{number}. {item['description'] or ''}"))
+            lines += [('note', f'    {note}') for note in item['notes']]
+    return lines
+
+
+def pdf_string(text: str) -> bytes:
+    encoded = text.encode('cp1252', errors='replace')
+    return b'(' + encoded.replace(b'\\', b'\\\\').replace(
+        b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def layout_pages(lines: List[Tuple[str, str]]) -> List[bytes]:
+    pages = []
+    commands = []
+    y = PAGE_HEIGHT - PAGE_MARGIN
+    for style, text in lines:
+        font, size, space_before = LINE_STYLES[style]
+        # Helvetica averages about half an em per character
+        width = int((PAGE_WIDTH - 2 * PAGE_MARGIN) / (size * 0.5))
+        indent = len(text) - len(text.lstrip())
+        wrapped = textwrap.wrap(text, width, initial_indent='',
+                                subsequent_indent=' ' * (indent + 4)) or ['']
+
+        y -= space_before
+        for line in wrapped:
+            if y - size < PAGE_MARGIN:
+                pages.append(b'\n'.join(commands))
+                commands = []
+                y = PAGE_HEIGHT - PAGE_MARGIN
+            y -= size * 1.3
+            commands.append(b'BT /%s %d Tf %d %.1f Td %s Tj ET' % (
+                font.encode(), size, PAGE_MARGIN, y, pdf_string(line)))
+
+    pages.append(b'\n'.join(commands))
+    return pages
+
+
+def render_pdf(document: dict) -> bytes:
+    pages = layout_pages(document_lines(document))
+
+    # objects 1 and 2 are the catalog and page tree, 3 and 4 the fonts,
+    # then a page object and its content stream for each page
+    page_ids = [5 + index * 2 for index in range(len(pages))]
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % page_id for page_id in page_ids),
+            len(pages)),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+        b'/Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold '
+        b'/Encoding /WinAnsiEncoding >>'
+    ]
+    for page_id, content in zip(page_ids, pages):
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> '
+            b'/Contents %d 0 R >>' % (PAGE_WIDTH, PAGE_HEIGHT, page_id + 1))
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (
+            len(content) + 1, content))
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, xref)
+    return pdf
+
+
+RENDERERS = {'html': render_html, 'pdf': render_pdf}
+
+
+def prepare_report(report: Report,
+                   render_format: str) -> Tuple[dict, str]:
+    '''
+    Return the document of a report and its content hash, which is also
+    used as the ETag of the response
+    '''
+    document = report_document(report)
+    return document, content_hash(document, render_format)
+
+
+class ReportRenderer:
+    def __init__(self, cache_dir: str, workers: int = DEFAULT_RENDER_WORKERS,
+                 timeout: int = DEFAULT_RENDER_TIMEOUT,
+                 max_bytes: int = DEFAULT_RENDER_CACHE_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.pool = None
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        # started on first use so each server process has its own pool
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self.pool
+
+    def cache_path(self, digest: str, render_format: str) -> str:
+        return os.path.join(self.cache_dir, f'{digest}.{render_format}')
+
+    def read_cache(self, path: str) -> Optional[bytes]:
+        # a read touches the file, the modified time orders the eviction
+        try:
+            with open(path, 'rb') as cached:
+                content = cached.read()
+            os.utime(path)
+            return content
+        except FileNotFoundError:
+            return None
+
+    def write_cache(self, path: str, content: bytes) -> None:
+        # written to a temporary file first so readers never see half a file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir,
+                                                 prefix='.')
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+        self.prune_cache()
+
+    def prune_cache(self) -> None:
+        # remove the least recently used files until the cache fits, the
+        # temporary files of writes in progress are skipped
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        cache_bytes = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if cache_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            cache_bytes -= size
+
+    def render(self, report: Report, document: dict, digest: str,
+               render_format: str) -> bytes:
+        cacheable = report.report_status in CACHED_STATUSES
+        path = self.cache_path(digest, render_format)
+
+        if cacheable:
+            content = self.read_cache(path)
+            if content is not None:
+                return content
+
+        content = self.get_pool().submit(
+            RENDERERS[render_format], document).result(self.timeout)
+
+        if cacheable:
+            self.write_cache(path, content)
+
+        return content
+
+
+def init_renderer(app: Flask) -> None:
+    app.extensions['report_renderer'] = ReportRenderer(
+        app.config.get('RENDER_CACHE_DIR') or os.path.join(
+            app.instance_path, 'render_cache'),
+        app.config.get('RENDER_WORKERS', DEFAULT_RENDER_WORKERS),
+        app.config.get('RENDER_TIMEOUT', DEFAULT_RENDER_TIMEOUT),
+        app.config.get('RENDER_CACHE_MAX_BYTES',
+                       DEFAULT_RENDER_CACHE_MAX_BYTES))
+
+
+def get_renderer() -> ReportRenderer:
+    return current_app.extensions['report_renderer']
@@ -0,0 +1,149 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import insert
+from .cache import get_generations
+from .models import (REPORT_TABLES, Report, ReportItem, ReportTemplate,
+                     ReportTemplateItem, db, delete_returning,
+                     format_report_template, format_report_template_item,
+                     notify_write)
+
+DEFAULT_TEMPLATE_CACHE_ENTRIES = 256
+DEFAULT_TEMPLATE_CACHE_TTL = 300
+
+TEMPLATE_TABLES = ['Report_Template_Items', 'Report_Templates']
+
+'''
+Report Templates
+
+A template holds an ordered set of report items. Starting a report from a
+template inserts the report and then all of the template's items in one
+bulk insert. The templates used to start reports are held in memory by
+each server process. A write to the template tables, seen through the
+table generations of the response cache, empties the cache, and it is
+emptied at least every TEMPLATE_CACHE_TTL seconds.
+'''
+
+
+def load_template(template_id: int) -> Optional[dict]:
+    template = ReportTemplate.query.filter(
+        ReportTemplate.id == template_id).first()
+    if template is None:
+        return None
+
+    template_data = format_report_template(template)
+    template_data['items'] = [format_report_template_item(item)
+                              for item in template.template_items]
+    return template_data
+
+
+class TemplateCache:
+    def __init__(self, max_entries: int = DEFAULT_TEMPLATE_CACHE_ENTRIES,
+                 ttl: int = DEFAULT_TEMPLATE_CACHE_TTL) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = Lock()
+        self.generations = None
+        self.expires = 0
+        self.templates = OrderedDict()
+
+    def get(self, template_id: int) -> Optional[dict]:
+        # read the generations first so a write during the load is not lost
+        generations = get_generations(TEMPLATE_TABLES)
+        with self.lock:
+            if (self.generations != generations or
+                    self.expires < time.monotonic()):
+                self.templates.clear()
+                self.generations = generations
+                self.expires = time.monotonic() + self.ttl
+
+            template = self.templates.get(template_id)
+            if template is not None:
+                self.templates.move_to_end(template_id)
+                return template
+
+        template = load_template(template_id)
+        if template is None:
+            return None
+
+        with self.lock:
+            if self.generations == generations:
+                self.templates[template_id] = template
+                while len(self.templates) > self.max_entries:
+                    self.templates.popitem(last=False)
+
+        return template
+
+
+def init_template_cache(app) -> None:
+    app.extensions['template_cache'] = TemplateCache(
+        app.config.get('TEMPLATE_CACHE_MAX_ENTRIES',
+                       DEFAULT_TEMPLATE_CACHE_ENTRIES),
+        app.config.get('TEMPLATE_CACHE_TTL', DEFAULT_TEMPLATE_CACHE_TTL))
+
+
+def get_template_cache() -> TemplateCache:
+    return current_app.extensions['template_cache']
+
+
+def insert_template(name: str, description: Optional[str],
+                    items: List[dict]) -> ReportTemplate:
+    '''
+    Insert a template and its items, numbered from 1 in the order given,
+    with a single bulk insert of the items
+    '''
+    template = ReportTemplate(name=name, description=description)
+    db.session.add(template)
+    db.session.flush()
+
+    db.session.execute(insert(ReportTemplateItem.__table__), [{
+        'template_id': template.id,
+        'item_nbr': item_nbr,
+        'item_type': item.get('item_type'),
+        'item_sequence_nbr': item.get('item_sequence_nbr') or item_nbr,
+        'item_description': item.get('item_description'),
+        'request_expected_outcome': item.get('request_expected_outcome')
+    } for item_nbr, item in enumerate(items, start=1)])
+
+    db.session.commit()
+    notify_write(*TEMPLATE_TABLES)
+    return template
+
+
+def delete_template_rows(template_id: int):
+    # delete the template items and then the template, the caller commits
+    db.session.query(ReportTemplateItem).filter(
+        ReportTemplateItem.template_id == template_id).delete(
+        synchronize_session=False)
+
+    return delete_returning(ReportTemplate, {'id': template_id})
+
+
+def insert_report_from_template(template: dict,
+                                values: dict) -> Tuple[Report, int]:
+    '''
+    Insert a new report and a copy of every template item in one
+    transaction and return the report and the number of items
+    '''
+    report = Report()
+    report.from_dict(values)
+    report.report_status = "new"
+    db.session.add(report)
+    db.session.flush()
+
+    if template['items']:
+        db.session.execute(insert(ReportItem.__table__), [{
+            'report_id': report.id,
+            'report_item_nbr': item['item_nbr'],
+            'item_type': item['item_type'],
+            'item_sequence_nbr': item['item_sequence_nbr'],
+            'item_description': item['item_description'],
+            'item_complete': False,
+            'request_expected_outcome': item['request_expected_outcome']
+        } for item in template['items']])
+
+    db.session.commit()
+    notify_write(*REPORT_TABLES)
+    return report, len(template['items'])
@@ -0,0 +1,151 @@
+from threading import Lock
+from flask import current_app
+from sqlalchemy import DDL, event, func, insert, select, text
+from .cache import get_generations
+from .models import (DEFAULT_ISSUE_STATUS, ISSUE_ITEM_TYPE, IssueCount,
+                     Report, ReportItem, db, notify_write)
+
+'''
+Issue Count Rollup
+
+Issue_Counts holds the number of issue_identified report items per client,
+consultant and issue status. On Postgres it is kept current by triggers on
+Report_Items and Reports, so every write path (ORM, set based statements,
+imports and batch purges) adjusts the counts in the same transaction. Rows
+whose count falls to zero are removed. rebuild_issue_counts recomputes the
+whole table, "flask rebuild issue-counts" runs it from the command line.
+Other databases (SQLite in development) have no triggers, the table is
+rebuilt by the first read after a write to Report_Items or Reports, seen
+through the table generations of the response cache.
+'''
+
+ISSUE_SOURCE_TABLES = ['Report_Items', 'Reports']
+
+ISSUE_COUNT_TRIGGERS = DDL('''
+CREATE OR REPLACE FUNCTION adjust_issue_count(
+    p_client_id integer, p_consultant_id integer,
+    p_issue_status varchar, p_delta integer) RETURNS void AS $$
+BEGIN
+    INSERT INTO "Issue_Counts"
+        (client_id, consultant_id, issue_status, issue_count)
+    VALUES (p_client_id, p_consultant_id, p_issue_status, p_delta)
+    ON CONFLICT (client_id, consultant_id, issue_status) DO UPDATE
+        SET issue_count = "Issue_Counts".issue_count + EXCLUDED.issue_count;
+
+    DELETE FROM "Issue_Counts"
+    WHERE client_id = p_client_id AND consultant_id = p_consultant_id
+        AND issue_status = p_issue_status AND issue_count = 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION report_items_issue_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE')
+            AND OLD.item_type = 'issue_identified' THEN
+        PERFORM adjust_issue_count(r.client_id, r.consulant_id,
+            COALESCE(OLD.issue_status, 'open'), -1)
+        FROM "Reports" r WHERE r.id = OLD.report_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE')
+            AND NEW.item_type = 'issue_identified' THEN
+        PERFORM adjust_issue_count(r.client_id, r.consulant_id,
+            COALESCE(NEW.issue_status, 'open'), 1)
+        FROM "Reports" r WHERE r.id = NEW.report_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reports_issue_counts() RETURNS trigger AS $$
+BEGIN
+    IF (OLD.client_id, OLD.consulant_id) IS DISTINCT FROM
+            (NEW.client_id, NEW.consulant_id) THEN
+        PERFORM adjust_issue_count(OLD.client_id, OLD.consulant_id,
+                                   issues.issue_status, -issues.issue_count),
+                adjust_issue_count(NEW.client_id, NEW.consulant_id,
+                                   issues.issue_status, issues.issue_count)
+        FROM (SELECT COALESCE(issue_status, 'open') AS issue_status,
+                     count(*)::integer AS issue_count
+              FROM "Report_Items"
+              WHERE report_id = NEW.id AND item_type = 'issue_identified'
+              GROUP BY 1) issues;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS report_items_issue_counts ON "Report_Items";
+CREATE TRIGGER report_items_issue_counts
+    AFTER INSERT OR DELETE OR UPDATE OF report_id, item_type, issue_status
+    ON "Report_Items"
+    FOR EACH ROW EXECUTE PROCEDURE report_items_issue_counts();
+
+DROP TRIGGER IF EXISTS reports_issue_counts ON "Reports";
+CREATE TRIGGER reports_issue_counts
+    AFTER UPDATE OF client_id, consulant_id ON "Reports"
+    FOR EACH ROW EXECUTE PROCEDURE reports_issue_counts();
+''')
+
+# tables created with create_all get the triggers too, existing databases
+# get them from the migration
+event.listen(db.Model.metadata, 'after_create',
+             ISSUE_COUNT_TRIGGERS.execute_if(dialect='postgresql'))
+
+
+def rebuild_issue_counts() -> int:
+    '''
+    Recompute Issue_Counts from Report_Items with a single INSERT ... SELECT
+    and return the number of rollup rows. On Postgres the table is locked
+    so trigger updates from concurrent writes wait for the rebuild.
+    '''
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(
+            text('LOCK TABLE "Issue_Counts" IN EXCLUSIVE MODE'))
+
+    issue_status = func.coalesce(ReportItem.issue_status, DEFAULT_ISSUE_STATUS)
+    issue_counts = select(
+        Report.client_id, Report.consulant_id, issue_status,
+        func.count()).select_from(ReportItem).join(
+        Report, Report.id == ReportItem.report_id).where(
+        ReportItem.item_type == ISSUE_ITEM_TYPE).group_by(
+        Report.client_id, Report.consulant_id, issue_status)
+
+    db.session.query(IssueCount).delete(synchronize_session=False)
+    db.session.execute(insert(IssueCount.__table__).from_select(
+        ['client_id', 'consultant_id', 'issue_status', 'issue_count'],
+        issue_counts))
+    db.session.commit()
+    notify_write(IssueCount.__tablename__)
+
+    return IssueCount.query.count()
+
+
+class IssueCountRollup:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.generations = None
+
+    def refresh(self) -> None:
+        if self.generations == get_generations(ISSUE_SOURCE_TABLES):
+            return
+
+        with self.lock:
+            # read the generations first so a write during the rebuild is
+            # not lost
+            generations = get_generations(ISSUE_SOURCE_TABLES)
+            if self.generations != generations:
+                rebuild_issue_counts()
+                self.generations = generations
+
+
+def init_issue_count_rollup(app) -> None:
+    app.extensions['issue_count_rollup'] = IssueCountRollup()
+
+
+def refresh_issue_counts() -> None:
+    # the triggers keep the table current on Postgres
+    if db.engine.dialect.name != 'postgresql':
+        current_app.extensions['issue_count_rollup'].refresh()
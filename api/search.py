@@ -0,0 +1,220 @@
+import html
+import math
+import re
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Dict, List, Optional
+from flask import current_app
+from sqlalchemy import DDL, event, func, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from .cache import get_generations
+from .models import Report, ReportItem, db
+
+SEARCH_CONFIG = 'english'
+SEARCH_FIELDS = ['item_description', 'request_expected_outcome',
+                 'issue_action_description']
+SEARCH_TABLES = ['Report_Items', 'Reports']
+
+SNIPPET_START = '<mark>'
+SNIPPET_STOP = '</mark>'
+SNIPPET_WORDS = 12
+# the snippets are HTML, '&' goes first so the entities added after it are
+# not escaped again
+HTML_ENTITIES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'),
+                 ('"', '&quot;'), ("'", '&#x27;')]
+
+'''
+Report Item Search
+
+On Postgres the searchable text of each report item is held in a stored
+generated tsvector column with a GIN index, queries are ranked with
+ts_rank_cd and ts_headline builds the snippets. Other databases (SQLite in
+development) use an in-process inverted index of the same fields that is
+rebuilt after any write to the report items or reports.
+'''
+
+SEARCH_VECTOR_DDL = DDL('''
+ALTER TABLE "Report_Items" ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english',
+        coalesce(item_description, '') || ' ' ||
+        coalesce(request_expected_outcome, '') || ' ' ||
+        coalesce(issue_action_description, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_report_items_search_vector
+    ON "Report_Items" USING gin (search_vector);
+''')
+
+# the column is not mapped so the model stays portable to SQLite, tables
+# created with create_all get it here and existing databases from the
+# migration
+event.listen(ReportItem.__table__, 'after_create',
+             SEARCH_VECTOR_DDL.execute_if(dialect='postgresql'))
+
+search_vector = literal_column('"Report_Items".search_vector', TSVECTOR)
+
+SEARCH_COLUMNS = [ReportItem.report_id, ReportItem.report_item_nbr,
+                  ReportItem.item_type, Report.report_date, Report.client_id,
+                  Report.consulant_id.label('consultant_id')]
+
+
+def apply_search_filters(query, filters: dict):
+    if filters.get('client_id'):
+        query = query.filter(Report.client_id == filters['client_id'])
+    if filters.get('item_type'):
+        query = query.filter(ReportItem.item_type == filters['item_type'])
+    if filters.get('from_date'):
+        query = query.filter(Report.report_date >= filters['from_date'])
+    if filters.get('to_date'):
+        query = query.filter(Report.report_date <= filters['to_date'])
+    return query
+
+
+def escape_html(text):
+    # the item text is escaped before ts_headline adds the <mark> tags, the
+    # search parser reads the entities as separate tokens so words still match
+    for character, entity in HTML_ENTITIES:
+        text = func.replace(text, character, entity)
+    return text
+
+
+def search_postgres(search: str, filters: dict, limit: int,
+                    offset: int) -> List[dict]:
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search)
+    rank = func.ts_rank_cd(search_vector, ts_query).label('rank')
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        escape_html(func.concat_ws(' ', *[getattr(ReportItem, name)
+                                          for name in SEARCH_FIELDS])),
+        ts_query,
+        f'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, '
+        f'MaxWords={SNIPPET_WORDS * 2}, MinWords={SNIPPET_WORDS // 2}'
+    ).label('snippet')
+
+    results = db.session.query(*SEARCH_COLUMNS, rank, snippet).join(
+        Report, Report.id == ReportItem.report_id).filter(
+        search_vector.op('@@')(ts_query))
+
+    return [row._asdict() for row in apply_search_filters(
+        results, filters).order_by(
+        rank.desc(), ReportItem.report_id, ReportItem.report_item_nbr).offset(
+        offset).limit(limit)]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return re.findall(r'\w+', text.casefold()) if text else []
+
+
+class ItemSearchIndex:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.generations = None
+        self.items: Dict[tuple, dict] = {}
+        self.postings: Dict[str, Dict[tuple, int]] = {}
+
+    def load(self) -> None:
+        # read the generations first so a write during the load is not lost
+        generations = get_generations(SEARCH_TABLES)
+        rows = db.session.query(
+            *SEARCH_COLUMNS,
+            *[getattr(ReportItem, name) for name in SEARCH_FIELDS]).join(
+            Report, Report.id == ReportItem.report_id).all()
+
+        items = {}
+        postings = defaultdict(dict)
+        for row in rows:
+            item = row._asdict()
+            key = (item['report_id'], item['report_item_nbr'])
+            terms = Counter(term for name in SEARCH_FIELDS
+                            for term in tokenize(item[name]))
+            item['length'] = sum(terms.values())
+            items[key] = item
+            for term, count in terms.items():
+                postings[term][key] = count
+
+        self.items = items
+        self.postings = dict(postings)
+        self.generations = generations
+
+    def refresh(self) -> None:
+        if self.generations != get_generations(SEARCH_TABLES):
+            with self.lock:
+                if self.generations != get_generations(SEARCH_TABLES):
+                    self.load()
+
+    def matches(self, item: dict, filters: dict) -> bool:
+        return not (
+            (filters.get('client_id') and
+             item['client_id'] != filters['client_id']) or
+            (filters.get('item_type') and
+             item['item_type'] != filters['item_type']) or
+            (filters.get('from_date') and
+             item['report_date'] < filters['from_date']) or
+            (filters.get('to_date') and
+             item['report_date'] > filters['to_date']))
+
+    def search(self, search: str, filters: dict, limit: int,
+               offset: int) -> List[dict]:
+        self.refresh()
+        terms = set(tokenize(search))
+        if not terms:
+            return []
+
+        # every term must match, as with websearch_to_tsquery
+        postings = [self.postings.get(term, {}) for term in terms]
+        keys = set.intersection(*[set(posting) for posting in postings])
+
+        ranked = []
+        for key in keys:
+            item = self.items[key]
+            if not self.matches(item, filters):
+                continue
+
+            # tf-idf scaled by the item length
+            rank = sum(
+                posting[key] * math.log(1 + len(self.items) / len(posting))
+                for posting in postings) / (1 + math.log(item['length']))
+            ranked.append((rank, key))
+
+        ranked.sort(key=lambda result: (-result[0], result[1]))
+        return [self.format(self.items[key], rank, terms)
+                for rank, key in ranked[offset:offset + limit]]
+
+    def format(self, item: dict, rank: float, terms: set) -> dict:
+        result = {column.key: item[column.key] for column in SEARCH_COLUMNS}
+        result['rank'] = round(rank, 4)
+        result['snippet'] = make_snippet(
+            [item[name] for name in SEARCH_FIELDS], terms)
+        return result
+
+
+def make_snippet(texts: List[Optional[str]], terms: set) -> str:
+    # the words around the first match, with the matched words marked and
+    # the text escaped as the snippet is HTML
+    words = ' '.join(text for text in texts if text).split()
+    positions = [index for index, word in enumerate(words)
+                 if set(tokenize(word)) & terms]
+    start = max(0, positions[0] - SNIPPET_WORDS // 2) if positions else 0
+    window = words[start:start + SNIPPET_WORDS]
+
+    snippet = ' '.join(
+        f'{SNIPPET_START}{html.escape(word)}{SNIPPET_STOP}'
+        if set(tokenize(word)) & terms else html.escape(word)
+        for word in window)
+    if start > 0:
+        snippet = '... ' + snippet
+    if start + SNIPPET_WORDS < len(words):
+        snippet += ' ...'
+    return snippet
+
+
+def init_search_index(app) -> None:
+    app.extensions['item_search_index'] = ItemSearchIndex()
+
+
+def search_report_items(search: str, filters: dict, limit: int,
+                        offset: int = 0) -> List[dict]:
+    if db.engine.dialect.name == 'postgresql':
+        return search_postgres(search, filters, limit, offset)
+
+    return current_app.extensions['item_search_index'].search(
+        search, filters, limit, offset)
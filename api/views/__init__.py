@@ -1,3 +1,8 @@
+from . import batch
 from . import clients
 from . import contacts
-from . import reports
\ No newline at end of file
+from . import engagements
+from . import issues
+from . import jobs
+from . import reports
+from . import templates
\ No newline at end of file
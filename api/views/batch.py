@@ -0,0 +1,144 @@
+from typing import List
+from urllib.parse import urlsplit
+from flask import Blueprint, current_app, request, abort, jsonify
+from ..models import db
+from auth.auth import get_token_auth_header, get_verified_payload
+
+blueprint = Blueprint('batch', __name__)
+
+BATCH_METHODS = ['GET', 'POST', 'PATCH', 'DELETE']
+DEFAULT_BATCH_MAX_REQUESTS = 50
+
+'''
+Helper Methods
+'''
+
+
+def is_valid_batch(sub_requests: list) -> bool:
+    if not isinstance(sub_requests, list) or len(sub_requests) == 0:
+        return False
+
+    max_requests = current_app.config.get(
+        'BATCH_MAX_REQUESTS', DEFAULT_BATCH_MAX_REQUESTS)
+    if len(sub_requests) > max_requests:
+        return False
+
+    for sub_request in sub_requests:
+        if not isinstance(sub_request, dict):
+            return False
+
+        method = str(sub_request.get('method', '')).upper()
+        path = sub_request.get('path')
+
+        if method not in BATCH_METHODS:
+            return False
+
+        if not isinstance(path, str) or not path.startswith('/api/'):
+            return False
+
+        # batches can not be nested
+        if urlsplit(path).path.rstrip('/') == '/api/batch':
+            return False
+
+    return True
+
+
+def dispatch_sub_request(sub_request: dict, auth_header: str) -> dict:
+    # run the sub-request through the registered blueprints, the request
+    # context shares the batch's application context and so its session
+    # and verified token
+    method = sub_request.get('method').upper()
+    body = sub_request.get('body')
+
+    with current_app.test_request_context(
+            sub_request.get('path'),
+            method=method,
+            json=body if method in ['POST', 'PATCH'] else None,
+            headers={'Authorization': auth_header}):
+        try:
+            response = current_app.full_dispatch_request()
+        except Exception as error:
+            print(error)
+            return {'status': 500, 'body': None}
+
+    return {
+        'status': response.status_code,
+        'body': response.get_json(silent=True)
+    }
+
+
+def run_batch(sub_requests: List[dict], auth_header: str) -> List[dict]:
+    # each sub-request commits on its own, a failure is rolled back without
+    # affecting the other sub-requests
+    results = []
+    for sub_request in sub_requests:
+        result = dispatch_sub_request(sub_request, auth_header)
+        if result.get('status') >= 400:
+            db.session.rollback()
+        results.append(result)
+
+    return results
+
+
+def run_atomic_batch(sub_requests: List[dict], auth_header: str) -> List[dict]:
+    # each sub-request runs in a savepoint so the model commit() calls only
+    # release the savepoint, the batch commits or rolls back once at the end
+    results = []
+    for sub_request in sub_requests:
+        savepoint = db.session.begin_nested()
+        result = dispatch_sub_request(sub_request, auth_header)
+        results.append(result)
+
+        if result.get('status') >= 400:
+            db.session.rollback()
+            return results
+
+        # a sub-request that does not commit (e.g. a GET) leaves its
+        # savepoint open, the batch commit would then only release it
+        if savepoint.is_active:
+            savepoint.commit()
+
+    db.session.commit()
+    return results
+
+
+'''
+Routes - Batch
+'''
+@blueprint.route('/api/batch', methods=['POST'])
+def run_batch_request():
+    # verify the token once, the permissions are checked by each sub-request
+    get_verified_payload(get_token_auth_header())
+    auth_header = request.headers.get('Authorization')
+
+    body_data: dict = request.get_json()
+
+    if not body_data:
+        abort(400)
+
+    sub_requests = body_data.get('requests')
+    if not is_valid_batch(sub_requests):
+        abort(400)
+
+    atomic = body_data.get('atomic', False) is True
+
+    if atomic:
+        results = run_atomic_batch(sub_requests, auth_header)
+    else:
+        results = run_batch(sub_requests, auth_header)
+
+    success = len(results) == len(sub_requests) and all(
+        result.get('status') < 400 for result in results)
+
+    if atomic and not success:
+        return jsonify({
+            "success": False,
+            "message": "The batch has been rolled back",
+            "results": results
+        }), 400
+
+    return jsonify({
+        "success": success,
+        "message": "The batch has been processed",
+        "results": results
+    }), 200
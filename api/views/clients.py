@@ -1,10 +1,31 @@
-from flask import Blueprint, request, abort, jsonify
-from ..models import DEFAULT_PAGE_SIZE, Client, ClientContact, DEFAULT_PAGE_SIZE
+from functools import partial
+from typing import Optional
+from flask import Blueprint, current_app, request, abort, jsonify
+from ..models import (DEFAULT_PAGE_SIZE, DEFAULT_DELETE_BATCH_SIZE,
+                      CLIENT_TABLES, REPORT_STATUSES, Client, ClientContact,
+                      Job, Report, ReportItem, commit_delete, db,
+                      delete_client_rows, delete_returning, format_client,
+                      format_client_contact, format_report, open_issue_filter,
+                      purge_client_rows, update_returning)
+from ..cache import cached_response
+from ..jobs import enqueue_job, job_handler, set_job_progress
+from ..etags import (conditional_get, make_validators, page_version_rows,
+                     set_last_modified, version_rows)
+from ..fields import format_result, select_fields
+from ..imports import (get_import_chunk_size, get_import_stream, import_csv,
+                       import_response)
+from sqlalchemy import and_, func, select
 from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import aliased
 from auth.auth import requires_auth
 
 blueprint = Blueprint('clients', __name__)
 
+# the overview is cached briefly as it reads every table of the client
+CLIENT_OVERVIEW_TABLES = ['Clients', 'Client_Contacts', 'Reports',
+                          'Report_Items']
+CLIENT_OVERVIEW_CACHE_TTL = 15
+
 '''
 Helper Methods
 '''
@@ -21,42 +42,155 @@ def is_valid_client(body_data: dict) -> bool:
     return True
 
 def is_valid_client_contact(body_data: dict) -> bool:
+    # the client is the one in the URL, the foreign key rejects a client that
+    # does not exist when the contact is written
     name = body_data.get('name')
-    client_id = body_data.get('client_id')
 
     if name is None:
         return False
 
-    if not Client.query.get(client_id):
-        return False
-
     return True
 
+CLIENT_CONTACT_FIELDS = ['name', 'email_address', 'phone', 'position_title',
+                         'address_1', 'address_2', 'address_3', 'city',
+                         'state', 'post_code']
+
+def client_contact_from_csv_row(client_id: int, row_data: dict) -> Optional[dict]:
+    row_data['client_id'] = client_id
+    if not is_valid_client_contact(row_data):
+        return None
+
+    client_contact = {key: row_data.get(key) for key in CLIENT_CONTACT_FIELDS}
+    client_contact['client_id'] = client_id
+    return client_contact
+
+def client_list_query():
+    client_query = Client.query
+
+    if request.args.get('search'):
+        search_term = f"%{request.args.get('search')}%"
+        client_query = client_query.filter(Client.name.ilike(search_term))
+
+    return client_query.order_by(Client.name.desc())
+
+def client_contact_list_query(client_id: int):
+    client_contact_query = ClientContact.query.filter(
+        ClientContact.client_id == client_id)
+
+    # Apply search criteria
+    if request.args.get('search'):
+        search_term = f"%{request.args.get('search')}%"
+        client_contact_query = client_contact_query.filter(ClientContact.name.ilike(search_term))
+
+    return client_contact_query.order_by(ClientContact.name.desc())
+
+def client_list_validators():
+    rows, total = page_version_rows(client_list_query(), Client)
+    return make_validators(rows, total)
+
+def client_validators(client_id: int):
+    return make_validators(version_rows(
+        Client.query.filter(Client.id == client_id), Client))
+
+def client_contact_list_validators(client_id: int):
+    rows, total = page_version_rows(
+        client_contact_list_query(client_id), ClientContact)
+    return make_validators(rows, total)
+
+def client_contact_validators(client_id: int, contact_id: int):
+    return make_validators(version_rows(
+        ClientContact.query.filter(ClientContact.id == contact_id),
+        ClientContact))
+
+@job_handler('purge_client')
+def purge_client(job: Job) -> dict:
+    client_id = job.params.get('client_id')
+    total = (Report.query.filter(Report.client_id == client_id).count() +
+             ClientContact.query.filter(
+                 ClientContact.client_id == client_id).count())
+    set_job_progress(job.id, 0, total)
+
+    purged = 0
+
+    def purge_progress(rows: int) -> None:
+        nonlocal purged
+        purged += rows
+        set_job_progress(job.id, purged)
+
+    deleted = purge_client_rows(client_id, current_app.config.get(
+        'DELETE_BATCH_SIZE', DEFAULT_DELETE_BATCH_SIZE), purge_progress)
+
+    return {'client_id': client_id, 'deleted': deleted == 1}
+
+
+def client_overview_query(client_id: int):
+    # the client with its counts and latest report in a single statement,
+    # the subqueries are correlated with the client row
+    contact_count = select(func.count()).where(
+        ClientContact.client_id == Client.id).scalar_subquery()
+
+    open_issue_count = select(func.count()).select_from(ReportItem).join(
+        Report, Report.id == ReportItem.report_id).where(
+        Report.client_id == Client.id, open_issue_filter()).scalar_subquery()
+
+    report_counts = db.session.query(
+        Report.client_id, func.count().label('report_count'),
+        *[func.count().filter(Report.report_status == report_status).label(
+            report_status) for report_status in REPORT_STATUSES]).filter(
+        Report.client_id == client_id).group_by(Report.client_id).subquery()
+
+    latest_report_id = select(Report.id).where(
+        Report.client_id == Client.id).order_by(
+        Report.report_date.desc(), Report.id.desc()).limit(
+        1).scalar_subquery()
+    latest_report = aliased(Report, name='latest_report')
+
+    return db.session.query(
+        Client, contact_count.label('contact_count'),
+        open_issue_count.label('open_issue_count'),
+        report_counts, latest_report).outerjoin(
+        report_counts, report_counts.c.client_id == Client.id).outerjoin(
+        latest_report, and_(latest_report.client_id == Client.id,
+                            latest_report.id == latest_report_id)).filter(
+        Client.id == client_id)
+
+
+def format_client_overview(overview) -> dict:
+    client = format_client(overview.Client)
+    client['contact_count'] = overview.contact_count
+    client['report_count'] = overview.report_count or 0
+    client['report_status_counts'] = {
+        report_status: getattr(overview, report_status) or 0
+        for report_status in REPORT_STATUSES}
+    client['open_issue_count'] = overview.open_issue_count
+    client['latest_report'] = format_report(
+        overview.latest_report) if overview.latest_report else None
+    return client
+
 
 '''
 Routes - Clients
 '''
 @blueprint.route('/api/clients', methods=['GET'])
 @requires_auth('read:clients')
+@cached_response(['Clients'])
+@conditional_get(client_list_validators)
 def get_clients():
 
-    client_query = Client.query
-    
-    if request.args.get('search'):
-        search_term = f"%{request.args.get('search')}%"
-        client_query = client_query.filter(Client.name.ilike(search_term))
+    client_query = select_fields(client_list_query(), Client)
 
     # Set the paging details
     page_size = request.args.get('page_size', default=DEFAULT_PAGE_SIZE, type=int)
     page = request.args.get('page', default=1, type=int)
 
-    clients_page = client_query.order_by(Client.name.desc()).paginate(page, page_size, False)
+    clients_page = client_query.paginate(page, page_size, False)
     clients = clients_page.items
     # check if the query returned any results
     if len(clients) == 0:
         abort(404)
 
-    client_list = [client.format() for client in clients]
+    set_last_modified(clients)
+    client_list = [format_result(client) for client in clients]
     return jsonify({
         'success': True,
         'page': clients_page.page,
@@ -100,11 +234,28 @@ def add_client():
 
 @blueprint.route('/api/clients/<int:client_id>', methods=['GET'])
 @requires_auth('read:clients')
+@conditional_get(client_validators)
 def get_client(client_id):
-    client = Client.query.get_or_404(client_id)
+    client = select_fields(Client.query, Client).filter(
+        Client.id == client_id).first_or_404()
+    set_last_modified([client])
     return jsonify({
         'success': True,
-        'data': client.format()
+        'data': format_result(client)
+    })
+
+
+@blueprint.route('/api/clients/<int:client_id>/overview', methods=['GET'])
+@requires_auth('read:clients')
+@cached_response(CLIENT_OVERVIEW_TABLES, ttl=CLIENT_OVERVIEW_CACHE_TTL)
+def get_client_overview(client_id):
+    overview = client_overview_query(client_id).first()
+    if overview is None:
+        abort(404)
+
+    return jsonify({
+        'success': True,
+        'data': format_client_overview(overview)
     })
 
 
@@ -120,19 +271,12 @@ def update_client(client_id):
     if not is_valid_client(body_data):
         abort(400)
 
-    client = Client.query.get_or_404(client_id)      
-    client.name = body_data.get('name')
-    client.bus_reg_nbr = body_data.get('bus_reg_nbr')
-    client.abbreviation = body_data.get('abbreviation')
-
     try:
-        
-        client.update()
-        return jsonify({
-            "success": True,
-            "message": "The client has been successfully saved",
-            "data": client.format()
-        }), 200
+        client = update_returning(Client, {'id': client_id}, {
+            'name': body_data.get('name'),
+            'bus_reg_nbr': body_data.get('bus_reg_nbr'),
+            'abbreviation': body_data.get('abbreviation')
+        })
 
     except DatabaseError as db_error:
         print(db_error)
@@ -142,20 +286,42 @@ def update_client(client_id):
         print(error)
         abort(500)
 
+    if client is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The client has been successfully saved",
+        "data": format_client(client)
+    }), 200
+
 @blueprint.route('/api/clients/<int:client_id>', methods=['DELETE'])
 @requires_auth('delete:clients')
 def delete_client(client_id):
 
-    client = Client.query.get_or_404(client_id)
+    # large clients are purged in batches by a job worker
+    if request.args.get('async', default=0, type=int) == 1:
+        Client.query.with_entities(Client.id).filter(
+            Client.id == client_id).first_or_404()
 
-    try:
-        client.delete()
+        try:
+            job = enqueue_job('purge_client', 'delete:clients',
+                              {'client_id': client_id})
+
+        except Exception as error:
+            print(error)
+            abort(500)
 
         return jsonify({
             "success": True,
-            "message": "The client has been successfully deleted",
-            "id": client_id
-        }), 200
+            "message": "The client has been queued for deletion",
+            "id": client_id,
+            "job_id": job.id
+        }), 202, {'Location': f'/api/jobs/{job.id}'}
+
+    try:
+        deleted = commit_delete(
+            delete_client_rows(client_id), *CLIENT_TABLES)
 
     except DatabaseError as db_error:
         print(db_error)
@@ -165,25 +331,31 @@ def delete_client(client_id):
         print(error)
         abort(500)
 
+    if deleted is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The client has been successfully deleted",
+        "id": client_id
+    }), 200
+
 '''
 Routes - Client Contacts
 '''
 @blueprint.route('/api/clients/<int:client_id>/contacts', methods=['GET'])
 @requires_auth('read:client-contacts')
+@conditional_get(client_contact_list_validators)
 def get_client_contacts(client_id: int):
 
-    client_contact_query = ClientContact.query.filter(ClientContact.client_id == client_id)
-    
-    # Apply search criteria
-    if request.args.get('search'):
-        search_term = f"%{request.args.get('search')}%"
-        client_contact_query = client_contact_query.filter(ClientContact.name.ilike(search_term))
+    client_contact_query = select_fields(
+        client_contact_list_query(client_id), ClientContact)
 
     # Set the paging details
     page_size = request.args.get('page_size', default=DEFAULT_PAGE_SIZE, type=int)
     page = request.args.get('page', default=1, type=int)
     
-    client_contact_page = client_contact_query.order_by(ClientContact.name.desc()).paginate(page, page_size, False)
+    client_contact_page = client_contact_query.paginate(page, page_size, False)
     client_contacts = client_contact_page.items
     client_contact_page.pages
 
@@ -191,7 +363,8 @@ def get_client_contacts(client_id: int):
     if len(client_contacts) == 0:
         abort(404)
 
-    client_contact_list = [client_contact.format() for client_contact in client_contacts]
+    set_last_modified(client_contacts)
+    client_contact_list = [format_result(client_contact) for client_contact in client_contacts]
     return jsonify({
         'success': True,
         'page': page,
@@ -240,13 +413,29 @@ def add_client_contact(client_id):
         abort(500)
 
 
+@blueprint.route('/api/clients/<int:client_id>/contacts/import', methods=['POST'])
+@requires_auth('create:client-contacts')
+def import_client_contacts(client_id: int):
+    Client.query.get_or_404(client_id)
+    stream = get_import_stream()
+    chunk_size = get_import_chunk_size()
+
+    return import_response(import_csv(
+        stream, ClientContact.__table__,
+        partial(client_contact_from_csv_row, client_id), chunk_size),
+        "The client contact import has been processed")
+
+
 @blueprint.route('/api/clients/<int:client_id>/contacts/<int:contact_id>', methods=['GET'])
 @requires_auth('read:client-contacts')
+@conditional_get(client_contact_validators)
 def get_client_contact(client_id, contact_id):
-    client = ClientContact.query.get_or_404(contact_id)
+    client = select_fields(ClientContact.query, ClientContact).filter(
+        ClientContact.id == contact_id).first_or_404()
+    set_last_modified([client])
     return jsonify({
         'success': True,
-        'data': client.format()
+        'data': format_result(client)
     })
 
 
@@ -262,27 +451,12 @@ def update_client_contact(client_id, contact_id):
     if not is_valid_client_contact(body_data):
         abort(400)
 
-    client_contact = ClientContact.query.get_or_404(contact_id)      
-    client_contact.name = body_data.get('name')
-    client_contact.client_id = client_id
-    client_contact.email_address = body_data.get('email_address')
-    client_contact.phone = body_data.get('phone')
-    client_contact.position_title = body_data.get('position_title')
-    client_contact.address_1 = body_data.get('address_1')
-    client_contact.address_2 = body_data.get('address_2')
-    client_contact.address_3 = body_data.get('address_3')
-    client_contact.city = body_data.get('city')
-    client_contact.state = body_data.get('state')
-    client_contact.post_code = body_data.get('post_code')
+    values = {key: body_data.get(key) for key in CLIENT_CONTACT_FIELDS}
+    values['client_id'] = client_id
 
     try:
-        
-        client_contact.update()
-        return jsonify({
-            "success": True,
-            "message": "The client contact has been successfully saved",
-            "data": client_contact.format()
-        }), 200
+        client_contact = update_returning(
+            ClientContact, {'id': contact_id}, values)
 
     except DatabaseError as db_error:
         print(db_error)
@@ -292,21 +466,24 @@ def update_client_contact(client_id, contact_id):
         print(error)
         abort(500)
 
+    if client_contact is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The client contact has been successfully saved",
+        "data": format_client_contact(client_contact)
+    }), 200
+
 
 @blueprint.route('/api/clients/<int:client_id>/contacts/<int:contact_id>', methods=['DELETE'])
 @requires_auth('delete:client-contacts')
 def delete_client_contact(client_id, contact_id):
 
-    client_contact = ClientContact.query.get_or_404(contact_id)
-
     try:
-        client_contact.delete()
-
-        return jsonify({
-            "success": True,
-            "message": "The client contact has been successfully deleted",
-            "id": contact_id
-        }), 200
+        deleted = commit_delete(
+            delete_returning(ClientContact, {'id': contact_id}),
+            ClientContact.__tablename__)
 
     except DatabaseError as db_error:
         print(db_error)
@@ -316,3 +493,12 @@ def delete_client_contact(client_id, contact_id):
         print(error)
         abort(500)
 
+    if deleted is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The client contact has been successfully deleted",
+        "id": contact_id
+    }), 200
+
@@ -1,5 +1,13 @@
+from typing import Optional
 from flask import Blueprint, request, abort, jsonify
-from ..models import Contact, DEFAULT_PAGE_SIZE
+from ..models import (Contact, DEFAULT_PAGE_SIZE, format_contact,
+                      update_returning)
+from ..etags import conditional_get, make_validators, set_last_modified
+from ..fields import get_requested_fields
+from ..imports import (get_import_chunk_size, get_import_stream, import_csv,
+                       import_response)
+from ..reference import (CONTACT_TYPES, ContactSnapshot,
+                         get_contact_snapshot)
 from sqlalchemy.exc import DatabaseError
 from auth.auth import requires_auth
 
@@ -31,33 +39,76 @@ def get_position_title(contact_type:str) ->str:
     else:
         return 'Other'
 
+def contact_from_csv_row(row_data: dict) -> Optional[dict]:
+    if not is_valid_contact(row_data):
+        return None
+
+    contact_type = row_data.get('contact_type')
+    return {
+        'name': row_data.get('name'),
+        'position_title': row_data.get('position_title') or
+                          get_position_title(contact_type),
+        'email_address': row_data.get('email_address'),
+        'mobile_phone': row_data.get('mobile_phone'),
+        'contact_type': contact_type,
+        'status': row_data.get('status') or 'A'
+    }
+
+def contact_list_page(contact_snapshot: ContactSnapshot):
+    # contacts are served from the in-memory reference data
+    contact_type = request.args.get('contact_type')
+    if contact_type not in CONTACT_TYPES:
+        contact_type = None
+    contacts = contact_snapshot.find(contact_type, request.args.get('search'))
+
+    # Set results paging
+    page=request.args.get('page', default=1, type=int)
+    page_size=request.args.get('page_size', default=DEFAULT_PAGE_SIZE,type=int)
+    if page < 1:
+        page = 1
+    if page_size < 0:
+        page_size = DEFAULT_PAGE_SIZE
+
+    return contacts[(page - 1) * page_size:page * page_size], len(contacts)
+
+def contact_version_rows(contact_snapshot: ContactSnapshot,
+                         contacts: list) -> list:
+    return [(contact_snapshot.value(contact, 'id'),
+             contact_snapshot.value(contact, 'version'),
+             contact_snapshot.value(contact, 'updated_at'))
+            for contact in contacts]
+
+def contact_list_validators():
+    contact_snapshot = get_contact_snapshot()
+    contacts, total = contact_list_page(contact_snapshot)
+    return make_validators(
+        contact_version_rows(contact_snapshot, contacts), total)
+
+def contact_validators(contact_id: int):
+    contact_snapshot = get_contact_snapshot()
+    contact = contact_snapshot.get(contact_id)
+    return make_validators(contact_version_rows(
+        contact_snapshot, [contact] if contact else []))
+
 '''
 API Routes - Contact List
 '''
 @blueprint.route('/api/contacts', methods=['GET'])
 @requires_auth('read:contacts')
+@conditional_get(contact_list_validators)
 def get_contacts():
-    contact_query = Contact.query
-    
-    # update query based on paramters
-    if request.args.get('contact_type') and request.args.get('contact_type') in ['consultant', 'clientmanager', 'other']:
-        contact_query = contact_query.filter(Contact.contact_type==request.args.get('contact_type'))
-  
-    if request.args.get('search'):
-        search_term = f"%{request.args.get('search')}%"
-        contact_query = contact_query.filter(Contact.name.ilike(search_term))
-    
-    # Set results paging
-    page=request.args.get('page', default=1, type=int)
-    page_size=request.args.get('page_size', default=DEFAULT_PAGE_SIZE,type=int)
-
-    contacts = contact_query.order_by(Contact.name.desc()).paginate(page, page_size, False).items
+    fields = get_requested_fields(Contact)
+    contact_snapshot = get_contact_snapshot()
+    contacts, total = contact_list_page(contact_snapshot)
 
     # check if the query returned any results
     if len(contacts) == 0:
         abort(404)
 
-    contact_list = [contact.format() for contact in contacts]
+    set_last_modified(contacts, lambda contact: contact_snapshot.value(
+        contact, 'updated_at'))
+    contact_list = [contact_snapshot.format(contact, fields)
+                    for contact in contacts]
     return jsonify({
         'success': True,
         'data': contact_list
@@ -102,13 +153,33 @@ def add_contact():
         abort(500)
 
 
+@blueprint.route('/api/contacts/import', methods=['POST'])
+@requires_auth('create:contacts')
+def import_contacts():
+    stream = get_import_stream()
+    chunk_size = get_import_chunk_size()
+
+    return import_response(import_csv(
+        stream, Contact.__table__, contact_from_csv_row, chunk_size),
+        "The contact import has been processed")
+
+
 @blueprint.route('/api/contacts/<int:contact_id>', methods=['GET'])
 @requires_auth('read:contacts')
+@conditional_get(contact_validators)
 def get_contact(contact_id):
-    contact = Contact.query.get_or_404(contact_id)
+    fields = get_requested_fields(Contact)
+    contact_snapshot = get_contact_snapshot()
+    contact = contact_snapshot.get(contact_id)
+
+    if not contact:
+        abort(404)
+
+    set_last_modified([contact], lambda contact: contact_snapshot.value(
+        contact, 'updated_at'))
     return jsonify({
         'success': True,
-        'data': contact.format()
+        'data': contact_snapshot.format(contact, fields)
     })
 
 
@@ -124,22 +195,17 @@ def update_contact(contact_id):
     if not is_valid_contact(body_data):
         abort(400)
 
-    contact = Contact.query.get_or_404(contact_id)      
-    contact.contact_type = body_data.get('contact_type')
-    contact.position_title = body_data.get(
-        'position_title', get_position_title(contact.contact_type))
-    contact.name = body_data.get('name')
-    contact.email_address = body_data.get('email_address')
-    contact.mobile_phone = body_data.get('mobile_phone')
+    contact_type = body_data.get('contact_type')
 
     try:
-        
-        contact.update()
-        return jsonify({
-            "success": True,
-            "message": "The contact has been successfully saved",
-            "data": contact.format()
-        }), 200
+        contact = update_returning(Contact, {'id': contact_id}, {
+            'contact_type': contact_type,
+            'position_title': body_data.get(
+                'position_title', get_position_title(contact_type)),
+            'name': body_data.get('name'),
+            'email_address': body_data.get('email_address'),
+            'mobile_phone': body_data.get('mobile_phone')
+        })
 
     except DatabaseError as db_error:
         print(db_error)
@@ -147,4 +213,13 @@ def update_contact(contact_id):
 
     except Exception as error:
         print(error)
-        abort(500)
\ No newline at end of file
+        abort(500)
+
+    if contact is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The contact has been successfully saved",
+        "data": format_contact(contact)
+    }), 200
\ No newline at end of file
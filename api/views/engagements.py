@@ -0,0 +1,147 @@
+from typing import Optional
+from flask import Blueprint, request, abort, jsonify
+from sqlalchemy import case, func
+from ..cache import cached_response
+from ..fields import format_value
+from ..models import (DEFAULT_PAGE_SIZE, ITEM_TYPES, Report, ReportItem, db,
+                      format_report)
+from .reports import apply_report_filters
+from auth.auth import requires_auth
+
+blueprint = Blueprint('engagements', __name__)
+
+ENGAGEMENT_TABLES = ['Reports', 'Report_Items']
+
+'''
+Helper Methods
+'''
+
+
+def item_type_counts(count_column) -> list:
+    # one count column per item type, named after the type
+    return [func.count(count_column).filter(
+        ReportItem.item_type == item_type).label(item_type)
+        for item_type in ITEM_TYPES]
+
+
+def format_item_counts(row) -> dict:
+    return {item_type: getattr(row, item_type) for item_type in ITEM_TYPES}
+
+
+def engagement_report_query(reference: str, client_id: Optional[int] = None):
+    # the reports of an engagement with the item counts of each report, an
+    # engagement reference can be shared by several clients
+    report_columns = [column for column in Report.__table__.columns
+                      if column.key not in ['version', 'updated_at']]
+    reports = db.session.query(
+        *report_columns,
+        *item_type_counts(ReportItem.report_item_nbr)).outerjoin(
+        ReportItem, ReportItem.report_id == Report.id).filter(
+        Report.engagement_reference == reference)
+
+    if client_id is not None:
+        reports = reports.filter(Report.client_id == client_id)
+
+    return reports.group_by(*report_columns).order_by(
+        Report.report_date, Report.id)
+
+
+def engagement_list_query():
+    # each report with its item counts and its recency in the engagement
+    item_counts = db.session.query(
+        ReportItem.report_id,
+        *item_type_counts(ReportItem.report_item_nbr)).group_by(
+        ReportItem.report_id).subquery()
+
+    reports = apply_report_filters(db.session.query(
+        Report.client_id, Report.engagement_reference, Report.report_date,
+        Report.report_status,
+        *[func.coalesce(item_counts.c[item_type], 0).label(item_type)
+          for item_type in ITEM_TYPES],
+        func.row_number().over(
+            partition_by=[Report.client_id, Report.engagement_reference],
+            order_by=[Report.report_date.desc(), Report.id.desc()]).label(
+            'recency')).outerjoin(
+        item_counts, item_counts.c.report_id == Report.id)).subquery()
+
+    return db.session.query(
+        reports.c.client_id, reports.c.engagement_reference,
+        func.count().label('report_count'),
+        func.min(reports.c.report_date).label('first_report_date'),
+        func.max(reports.c.report_date).label('last_report_date'),
+        func.max(case((reports.c.recency == 1, reports.c.report_status))
+                 ).label('latest_status'),
+        *[func.sum(reports.c[item_type]).label(item_type)
+          for item_type in ITEM_TYPES]).group_by(
+        reports.c.client_id, reports.c.engagement_reference).order_by(
+        reports.c.client_id, reports.c.engagement_reference)
+
+
+def format_engagement(row) -> dict:
+    return {
+        'client_id': row.client_id,
+        'engagement_reference': row.engagement_reference,
+        'report_count': row.report_count,
+        'first_report_date': format_value(row.first_report_date),
+        'last_report_date': format_value(row.last_report_date),
+        'latest_status': row.latest_status,
+        'item_counts': format_item_counts(row)
+    }
+
+
+'''
+Routes - Engagements
+'''
+@blueprint.route('/api/engagements', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(ENGAGEMENT_TABLES)
+def get_engagements():
+    page_size = request.args.get(
+        'page_size', default=DEFAULT_PAGE_SIZE, type=int)
+    page = request.args.get('page', default=1, type=int)
+    engagements_page = engagement_list_query().paginate(
+        page, page_size, False)
+
+    if len(engagements_page.items) == 0:
+        abort(404)
+
+    return jsonify({
+        'success': True,
+        'page': engagements_page.page,
+        'pages': engagements_page.pages,
+        'data': [format_engagement(row) for row in engagements_page.items]
+    })
+
+
+@blueprint.route('/api/engagements/<string:reference>', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(ENGAGEMENT_TABLES)
+def get_engagement(reference: str):
+    client_id = request.args.get('client_id', type=int)
+    reports = engagement_report_query(reference, client_id).all()
+
+    if len(reports) == 0:
+        abort(404)
+
+    report_list = []
+    for row in reports:
+        report = format_report(row)
+        report['item_counts'] = format_item_counts(row)
+        report_list.append(report)
+
+    latest_report = reports[-1]
+    return jsonify({
+        'success': True,
+        'data': {
+            'engagement_reference': reference,
+            'client_ids': sorted({row.client_id for row in reports}),
+            'report_count': len(reports),
+            'first_report_date': report_list[0]['report_date'],
+            'last_report_date': report_list[-1]['report_date'],
+            'latest_status': latest_report.report_status,
+            'item_counts': {item_type: sum(report['item_counts'][item_type]
+                                           for report in report_list)
+                            for item_type in ITEM_TYPES},
+            'reports': report_list
+        }
+    })
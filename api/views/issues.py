@@ -0,0 +1,155 @@
+import base64
+import binascii
+import json
+from datetime import date
+from typing import List, Optional
+from flask import Blueprint, request, abort, jsonify
+from sqlalchemy import func, tuple_
+from ..cache import cached_response
+from ..fields import format_result
+from ..models import (DEFAULT_ISSUE_STATUS, DEFAULT_PAGE_SIZE, ISSUE_STATUSES,
+                      OPEN_ISSUE_STATUSES, IssueCount, Report, ReportItem, db,
+                      open_issue_filter)
+from ..rollups import refresh_issue_counts
+from auth.auth import requires_auth
+
+blueprint = Blueprint('issues', __name__)
+
+# the rollup changes with every write to the issue items or their reports
+ISSUE_COUNT_TABLES = ['Issue_Counts', 'Report_Items', 'Reports']
+
+'''
+Helper Methods
+'''
+
+
+def apply_issue_count_filters(issue_counts):
+
+    # Apply Client Id Filter
+    if request.args.get('client_id'):
+        issue_counts = issue_counts.filter(
+            IssueCount.client_id == request.args.get('client_id', type=int))
+
+    # Apply Consultant Id Filter
+    if request.args.get('consultant_id'):
+        issue_counts = issue_counts.filter(
+            IssueCount.consultant_id == request.args.get(
+                'consultant_id', type=int))
+
+    # Apply Issue Status Filter
+    if request.args.get('issue_status'):
+        issue_status = request.args.get('issue_status')
+        if issue_status not in ISSUE_STATUSES:
+            abort(400)
+        issue_counts = issue_counts.filter(
+            IssueCount.issue_status == issue_status)
+
+    return issue_counts
+
+
+def get_issue_statuses() -> List[str]:
+    # ?issue_status=blocked narrows the feed to some of the open statuses
+    status_arg = request.args.get('issue_status')
+    if not status_arg:
+        return OPEN_ISSUE_STATUSES
+
+    issue_statuses = [name.strip() for name in status_arg.split(',')
+                      if name.strip()]
+    for name in issue_statuses:
+        if name not in OPEN_ISSUE_STATUSES:
+            abort(400)
+
+    return issue_statuses
+
+
+def encode_cursor(row) -> str:
+    key = [row.report_date.isoformat(), row.report_id, row.report_item_nbr]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    # the cursor is the sort key of the last issue on the previous page
+    try:
+        report_date, report_id, report_item_nbr = json.loads(
+            base64.urlsafe_b64decode(cursor.encode()))
+        return (date.fromisoformat(report_date), int(report_id),
+                int(report_item_nbr))
+    except (binascii.Error, TypeError, ValueError):
+        abort(400)
+
+
+def open_issue_query(issue_statuses: List[str], cursor: Optional[str]):
+    issues = db.session.query(
+        ReportItem.report_id, ReportItem.report_item_nbr,
+        Report.report_date, Report.client_id,
+        Report.consulant_id.label('consultant_id'),
+        Report.engagement_reference, ReportItem.item_description,
+        func.coalesce(ReportItem.issue_status, DEFAULT_ISSUE_STATUS).label(
+            'issue_status'),
+        ReportItem.issue_action_description).join(
+        Report, Report.id == ReportItem.report_id).filter(
+        open_issue_filter(issue_statuses))
+
+    if request.args.get('client_id'):
+        issues = issues.filter(
+            Report.client_id == request.args.get('client_id', type=int))
+
+    if request.args.get('consultant_id'):
+        issues = issues.filter(
+            Report.consulant_id == request.args.get(
+                'consultant_id', type=int))
+
+    # keyset pagination, the next page starts after the cursor row
+    sort_key = tuple_(Report.report_date, ReportItem.report_id,
+                      ReportItem.report_item_nbr)
+    if cursor:
+        issues = issues.filter(sort_key < tuple_(*decode_cursor(cursor)))
+
+    return issues.order_by(Report.report_date.desc(),
+                           ReportItem.report_id.desc(),
+                           ReportItem.report_item_nbr.desc())
+
+
+'''
+Routes - Issues
+'''
+@blueprint.route('/api/issues', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(['Report_Items', 'Reports'])
+def get_open_issues():
+    page_size = request.args.get(
+        'page_size', default=DEFAULT_PAGE_SIZE, type=int)
+    if page_size < 1:
+        abort(400)
+
+    # read one extra row to know whether there is a next page
+    issues = open_issue_query(
+        get_issue_statuses(), request.args.get('cursor')).limit(
+        page_size + 1).all()
+
+    next_cursor = None
+    if len(issues) > page_size:
+        issues = issues[:page_size]
+        next_cursor = encode_cursor(issues[-1])
+
+    return jsonify({
+        'success': True,
+        'next_cursor': next_cursor,
+        'data': [format_result(issue) for issue in issues]
+    })
+
+
+@blueprint.route('/api/issues/summary', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(ISSUE_COUNT_TABLES)
+def get_issue_summary():
+    refresh_issue_counts()
+    issue_counts = apply_issue_count_filters(IssueCount.query).order_by(
+        IssueCount.client_id, IssueCount.consultant_id,
+        IssueCount.issue_status).all()
+
+    return jsonify({
+        'success': True,
+        'total': sum(issue_count.issue_count for issue_count in issue_counts),
+        'data': [issue_count.format() for issue_count in issue_counts]
+    })
@@ -0,0 +1,52 @@
+from flask import Blueprint, jsonify
+from ..models import Job
+from auth.auth import (check_permissions, get_token_auth_header,
+                       get_verified_payload)
+
+blueprint = Blueprint('jobs', __name__)
+
+'''
+Helper Methods
+'''
+
+
+def get_permitted_job(job_id: int) -> Job:
+    # a job is visible to callers holding the permission it was queued
+    # with, the token is checked before the job is looked up
+    payload = get_verified_payload(get_token_auth_header())
+    job = Job.query.get_or_404(job_id)
+    check_permissions(job.permission, payload)
+    return job
+
+
+'''
+Routes - Jobs
+'''
+@blueprint.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_permitted_job(job_id)
+
+    return jsonify({
+        'success': True,
+        'data': job.format()
+    })
+
+
+@blueprint.route('/api/jobs/<int:job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = get_permitted_job(job_id)
+
+    # until the job has finished the caller is told to keep polling
+    if job.status in ['queued', 'running']:
+        return jsonify({
+            'success': True,
+            'data': job.format()
+        }), 202, {'Location': f'/api/jobs/{job.id}'}
+
+    return jsonify({
+        'success': job.status == 'complete',
+        'id': job.id,
+        'status': job.status,
+        'error': job.error,
+        'result': job.result
+    })
@@ -1,8 +1,24 @@
-from datetime import date, datetime
-from flask import Blueprint, request, abort, jsonify
-from sqlalchemy.sql.sqltypes import DateTime
-from sqlalchemy import func
-from ..models import Report, ReportItem, DEFAULT_PAGE_SIZE
+from datetime import date, timedelta
+from typing import List, Optional
+from flask import Blueprint, current_app, request, abort, jsonify
+from sqlalchemy import Date, cast, distinct, func, select
+from sqlalchemy.orm import aliased
+from ..cache import cached_response
+from ..etags import (conditional_get, etag_matches, make_validators,
+                     not_modified, page_version_rows, set_last_modified,
+                     version_rows)
+from ..fields import (drop_unrequested_fields, format_result, format_value,
+                      select_fields)
+from ..reference import get_contact_snapshot
+from ..render import RENDER_FORMATS, get_renderer, prepare_report
+from ..search import search_report_items
+from ..models import (db, Client, ClientContact, Report, ReportItem,
+                      DEFAULT_PAGE_SIZE, ISSUE_STATUSES, ITEM_TYPES,
+                      REPORT_STATUSES, REPORT_TABLES, carry_forward_items,
+                      commit_delete, delete_report_rows, delete_returning,
+                      format_report, format_report_item, notify_write,
+                      open_task_filter, period_overlap_filter,
+                      update_returning, updatable_values)
 from sqlalchemy.exc import DatabaseError
 from auth.auth import requires_auth
 
@@ -15,15 +31,132 @@ def is_valid_report(header: dict, items: list) -> bool:
     pass
 
 
+REPORT_DATE_FIELDS = ['report_date', 'report_from_date', 'report_to_date']
+# the columns a carried forward report takes from the previous report
+CARRY_FORWARD_COLUMNS = ['client_id', 'client_contact_id', 'consulant_id',
+                         'client_manager_id', 'engagement_reference']
+
+
+def get_report_values(body_data: dict) -> Optional[dict]:
+    # the columns a PATCH sets, None when a value is invalid
+    values = updatable_values(Report, body_data)
+
+    if 'report_status' in values and \
+            values['report_status'] not in REPORT_STATUSES:
+        return None
+
+    for key in REPORT_DATE_FIELDS:
+        if values.get(key) is not None:
+            try:
+                values[key] = date.fromisoformat(values[key])
+            except (TypeError, ValueError):
+                return None
+
+    # a PATCH of one of the dates is checked by the ck_reports_period
+    # constraint
+    if values.get('report_from_date') and values.get('report_to_date') and \
+            values['report_to_date'] < values['report_from_date']:
+        return None
 
-# ---------------------------------------------------
-# Route - Get reports list
-# ----------------------------------------------------
-@blueprint.route('/api/reports', methods=['GET'])
-@requires_auth('read:reports')
-def get_reports():
+    return values
+
+
+def get_report_item_values(body_data: dict) -> Optional[dict]:
+    values = updatable_values(ReportItem, body_data)
+
+    if 'item_type' in values and values['item_type'] not in ITEM_TYPES:
+        return None
+
+    if values.get('issue_status') is not None and \
+            values['issue_status'] not in ISSUE_STATUSES:
+        return None
+
+    return values
+
+
+# the tables each include reads its related rows from
+INCLUDE_TABLES = {
+    'client': 'Clients',
+    'client_contact': 'Client_Contacts',
+    'consultant': 'Contacts',
+    'client_manager': 'Contacts',
+    'items': 'Report_Items'
+}
+
+# the report column each include needs to find its related rows
+REPORT_INCLUDES = {
+    'client': 'client_id',
+    'client_contact': 'client_contact_id',
+    'consultant': 'consulant_id',
+    'client_manager': 'client_manager_id',
+    'items': 'id'
+}
+
+
+def get_report_includes() -> List[str]:
+    # parse the ?include=client,consultant,... request parameter
+    include_arg = request.args.get('include')
+    if not include_arg:
+        return []
+
+    includes = [name.strip() for name in include_arg.split(',')
+                if name.strip()]
+    for name in includes:
+        if name not in REPORT_INCLUDES:
+            abort(400)
 
-    reports = Report.query
+    return includes
+
+
+def load_report_includes(reports: List[dict], includes: List[str]) -> dict:
+    # load the related rows for a page of reports with one query per
+    # relationship, rows shared by several reports are only returned once
+    included = {}
+
+    if 'client' in includes:
+        client_ids = {report['client_id'] for report in reports}
+        clients = Client.query.filter(Client.id.in_(client_ids)).all()
+        included['clients'] = [client.format() for client in clients]
+
+    if 'client_contact' in includes:
+        client_contact_ids = {report['client_contact_id']
+                              for report in reports}
+        client_contacts = ClientContact.query.filter(
+            ClientContact.id.in_(client_contact_ids)).all()
+        included['client_contacts'] = [client_contact.format()
+                                       for client_contact in client_contacts]
+
+    # consultants and client managers are both internal contacts and are
+    # read from the reference data cache
+    contact_ids = set()
+    if 'consultant' in includes:
+        contact_ids.update(report['consulant_id'] for report in reports)
+    if 'client_manager' in includes:
+        contact_ids.update(report['client_manager_id'] for report in reports)
+    if contact_ids:
+        contact_snapshot = get_contact_snapshot()
+        contacts = [contact_snapshot.get(contact_id)
+                    for contact_id in sorted(contact_ids)]
+        included['contacts'] = [contact_snapshot.format(contact)
+                                for contact in contacts if contact]
+
+    if 'items' in includes:
+        report_ids = {report['id'] for report in reports}
+        report_items = ReportItem.query.filter(
+            ReportItem.report_id.in_(report_ids)).order_by(
+            ReportItem.report_id, ReportItem.report_item_nbr).all()
+        included['report_items'] = [report_item.format()
+                                    for report_item in report_items]
+
+    return included
+
+
+def report_list_tables() -> List[str]:
+    return ['Reports'] + [INCLUDE_TABLES[name]
+                          for name in get_report_includes()]
+
+
+def apply_report_filters(reports):
 
     # Apply Client Id Filter
     if request.args.get('client_id'):
@@ -35,33 +168,341 @@ def get_reports():
         reports = reports.filter(
             Report.consulant_id == request.args.get('consultant_id', type=int))
 
+    try:
+        from_date = get_date_arg('from_date')
+        to_date = get_date_arg('to_date')
+        period_from = get_date_arg('period_from')
+        period_to = get_date_arg('period_to')
+    except ValueError:
+        abort(400)
+
     # Apply From Date Range
-    if request.args.get('from_date'):
-        from_date = datetime.fromisoformat(request.args.get('from_date'))
+    if from_date:
         reports = reports.filter(Report.report_date >= from_date)
 
-    # Apply From Date Range
-    if request.args.get('to_date'):
-        to_date = datetime.fromisoformat(request.args.get('to_date'))
+    # Apply To Date Range
+    if to_date:
         reports = reports.filter(Report.report_date <= to_date)
 
+    # Apply Report Period Overlap
+    if period_from or period_to:
+        if period_from and period_to and period_from > period_to:
+            abort(400)
+        reports = reports.filter(period_overlap_filter(period_from, period_to))
+
+    return reports
+
+
+def report_list_query():
+    return apply_report_filters(Report.query).order_by(
+        Report.report_date.desc())
+
+
+# included rows are not versioned with the reports, so responses with
+# includes are tagged from the response body
+def report_list_validators():
+    if request.args.get('include'):
+        return None
+
+    rows, total = page_version_rows(report_list_query(), Report)
+    return make_validators(rows, total)
+
+
+def report_validators(id: int):
+    if request.args.get('include'):
+        return None
+
+    rows = version_rows(Report.query.filter(Report.id == id), Report)
+    if rows and request.args.get('detailed', default=0, type=int) == 1:
+        rows += version_rows(ReportItem.query.filter(
+            ReportItem.report_id == id), ReportItem)
+
+    return make_validators(rows)
+
+
+def report_item_list_validators(report_id: int):
+    return make_validators(version_rows(ReportItem.query.filter(
+        ReportItem.report_id == report_id), ReportItem))
+
+
+def report_item_validators(report_id: int, item_id: int):
+    return make_validators(version_rows(ReportItem.query.filter(
+        ReportItem.report_id == report_id,
+        ReportItem.report_item_nbr == item_id), ReportItem))
+
+
+
+# the columns a report summary can be grouped by
+SUMMARY_GROUPS = {
+    'client': Report.client_id,
+    'consultant': Report.consulant_id
+}
+
+SUMMARY_PERIODS = ['week', 'month']
+
+
+def get_summary_groups() -> List[str]:
+    # parse the ?group_by=client,consultant request parameter
+    group_arg = request.args.get('group_by')
+    if not group_arg:
+        return []
+
+    groups = [name.strip() for name in group_arg.split(',') if name.strip()]
+    for name in groups:
+        if name not in SUMMARY_GROUPS:
+            abort(400)
+
+    return groups
+
+
+def report_period(period: str):
+    # the first day of the week or month of the report date, SQLite has no
+    # date_trunc so the same dates are built with its date functions
+    if db.engine.dialect.name == 'postgresql':
+        return cast(func.date_trunc(period, Report.report_date), Date)
+
+    if period == 'month':
+        return func.date(Report.report_date, 'start of month')
+
+    return func.date(Report.report_date, '-6 days', 'weekday 1')
+
+
+def report_summary_query(groups: List[str], period: Optional[str]):
+    columns = [SUMMARY_GROUPS[name] for name in groups]
+    if period:
+        columns.append(report_period(period).label('period'))
+    columns.append(Report.report_status)
+
+    return apply_report_filters(Report.query).with_entities(
+        *columns, func.count(Report.id).label('report_count')).group_by(
+        *columns[:-1], Report.report_status).order_by(
+        *columns[:-1], Report.report_status)
+
+
+# workload counts change with every item write, and the default window
+# moves with the date, so they are only cached briefly
+WORKLOAD_CACHE_TTL = 15
+DEFAULT_WORKLOAD_DAYS = 90
+
+
+def get_date_arg(name: str) -> Optional[date]:
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else None
+
+
+def consultant_workload_query():
+    reports = Report.query.join(
+        ReportItem, ReportItem.report_id == Report.id).filter(
+        open_task_filter())
+
+    # without a date window only the recent reports are counted
+    if not request.args.get('from_date') and not request.args.get('to_date'):
+        window_days = current_app.config.get(
+            'WORKLOAD_WINDOW_DAYS', DEFAULT_WORKLOAD_DAYS)
+        reports = reports.filter(
+            Report.report_date >= date.today() - timedelta(days=window_days))
+
+    open_tasks = func.count().label('open_tasks')
+    return apply_report_filters(reports).with_entities(
+        Report.consulant_id, open_tasks,
+        func.count(distinct(Report.id)).label('reports')).group_by(
+        Report.consulant_id).order_by(open_tasks.desc(), Report.consulant_id)
+
+
+# the column each latest report is chosen by
+LATEST_GROUPS = {
+    'client': Report.client_id,
+    'engagement': Report.engagement_reference
+}
+
+
+def latest_report_query(group_column):
+    # the most recent report of each group, read in the order of
+    # ix_reports_client_date or ix_reports_engagement_date
+    recent_first = [Report.report_date.desc(), Report.id.desc()]
+
+    if db.engine.dialect.name == 'postgresql':
+        return apply_report_filters(Report.query).distinct(
+            group_column).order_by(group_column, *recent_first)
+
+    # without DISTINCT ON the reports are ranked within each group
+    recency = func.row_number().over(
+        partition_by=group_column, order_by=recent_first).label('recency')
+    ranked = apply_report_filters(
+        db.session.query(Report, recency)).subquery()
+    latest = aliased(Report, ranked)
+    return db.session.query(latest).filter(ranked.c.recency == 1).order_by(
+        ranked.c[group_column.key])
+
+
+# ---------------------------------------------------
+# Route - Get reports list
+# ----------------------------------------------------
+@blueprint.route('/api/reports', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(report_list_tables)
+@conditional_get(report_list_validators)
+def get_reports():
+    includes = get_report_includes()
+    required = [REPORT_INCLUDES[name] for name in includes]
+
+    reports = select_fields(report_list_query(), Report, required=required)
+
     # Set the paging details
     page_size = request.args.get(
         'page_size', default=DEFAULT_PAGE_SIZE, type=int)
     page = request.args.get('page', default=1, type=int)
-    reports_page = reports.order_by(
-        Report.report_date.desc()).paginate(page, page_size, False)
+    reports_page = reports.paginate(page, page_size, False)
     reports = reports_page.items
 
     if len(reports) == 0:
         abort(404)
 
-    report_list = [report.format() for report in reports]
-    return jsonify({
+    set_last_modified(reports)
+    report_list = [format_result(report) for report in reports]
+    response = {
+        'success': True,
+        'page': reports_page.page,
+        'pages': reports_page.pages,
+        'data': report_list
+    }
+
+    if includes:
+        response['included'] = load_report_includes(report_list, includes)
+        drop_unrequested_fields(report_list, required)
+
+    return jsonify(response)
+
+
+# ---------------------------------------------------
+# Route - Get the latest report of each client or engagement
+# ----------------------------------------------------
+@blueprint.route('/api/reports/latest', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(report_list_tables)
+def get_latest_reports():
+    group = request.args.get('group_by', default='client')
+    if group not in LATEST_GROUPS:
+        abort(400)
+
+    includes = get_report_includes()
+
+    # Set the paging details, one report per client or engagement
+    page_size = request.args.get(
+        'page_size', default=DEFAULT_PAGE_SIZE, type=int)
+    page = request.args.get('page', default=1, type=int)
+    reports_page = latest_report_query(LATEST_GROUPS[group]).paginate(
+        page, page_size, False)
+
+    if len(reports_page.items) == 0:
+        abort(404)
+
+    report_list = [report.format() for report in reports_page.items]
+    response = {
         'success': True,
+        'group_by': group,
         'page': reports_page.page,
         'pages': reports_page.pages,
         'data': report_list
+    }
+
+    if includes:
+        response['included'] = load_report_includes(report_list, includes)
+
+    return jsonify(response)
+
+
+# ---------------------------------------------------
+# Route - Get a summary of report counts by status
+# ----------------------------------------------------
+@blueprint.route('/api/reports/summary', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(['Reports'])
+def get_report_summary():
+    groups = get_summary_groups()
+    period = request.args.get('period')
+    if period is not None and period not in SUMMARY_PERIODS:
+        abort(400)
+
+    summary = [format_result(row)
+               for row in report_summary_query(groups, period)]
+
+    return jsonify({
+        'success': True,
+        'group_by': groups,
+        'period': period,
+        'total': sum(row['report_count'] for row in summary),
+        'data': summary
+    })
+
+
+# ---------------------------------------------------
+# Route - Get the open task workload of each consultant
+# ----------------------------------------------------
+@blueprint.route('/api/reports/workload', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(['Reports', 'Report_Items'], ttl=WORKLOAD_CACHE_TTL)
+def get_consultant_workload():
+    contact_snapshot = get_contact_snapshot()
+
+    workload = []
+    for consultant_id, open_tasks, reports in consultant_workload_query():
+        consultant = contact_snapshot.get(consultant_id)
+        workload.append({
+            'consultant_id': consultant_id,
+            'name': contact_snapshot.value(consultant, 'name')
+            if consultant else None,
+            'open_tasks': open_tasks,
+            'reports': reports
+        })
+
+    return jsonify({
+        'success': True,
+        'data': workload
+    })
+
+
+# ---------------------------------------------------
+# Route - Search the report items
+# ----------------------------------------------------
+@blueprint.route('/api/reports/items/search', methods=['GET'])
+@requires_auth('read:report-items')
+@cached_response(['Report_Items', 'Reports'])
+def search_items():
+    search = request.args.get('q', '').strip()
+    if not search:
+        abort(400)
+
+    item_type = request.args.get('item_type')
+    if item_type is not None and item_type not in ITEM_TYPES:
+        abort(400)
+
+    page_size = request.args.get(
+        'page_size', default=DEFAULT_PAGE_SIZE, type=int)
+    page = request.args.get('page', default=1, type=int)
+    if page_size < 1 or page < 1:
+        abort(400)
+
+    try:
+        filters = {
+            'client_id': request.args.get('client_id', type=int),
+            'item_type': item_type,
+            'from_date': get_date_arg('from_date'),
+            'to_date': get_date_arg('to_date')
+        }
+    except ValueError:
+        abort(400)
+
+    # read one extra result to know whether there is a next page
+    results = search_report_items(search, filters, page_size + 1,
+                                  (page - 1) * page_size)
+
+    return jsonify({
+        'success': True,
+        'page': page,
+        'next_page': page + 1 if len(results) > page_size else None,
+        'data': [{key: format_value(value) for key, value in result.items()}
+                 for result in results[:page_size]]
     })
 
 
@@ -70,23 +511,101 @@ def get_reports():
 # ----------------------------------------------------
 @blueprint.route('/api/reports/<int:id>', methods=['GET'])
 @requires_auth('read:reports')
+@conditional_get(report_validators)
 def get_report(id: int):
-    report: Report = Report.query.get_or_404(id)
+    includes = get_report_includes()
     detailed = request.args.get('detailed', default=0, type=int)
+    if detailed not in [0, 1]:
+        abort(400)
+
+    required = [REPORT_INCLUDES[name] for name in includes]
+
+    report = select_fields(Report.query, Report, required=required).filter(
+        Report.id == id).first_or_404()
 
     if detailed == 0:
-        report_data = report.format()
-    elif detailed == 1:
+        set_last_modified([report])
+        report_data = format_result(report)
+    elif isinstance(report, Report):
+        set_last_modified([report, *report.report_items])
         report_data = report.format_detailed()
     else:
-        abort(400)
+        # a projected report header still returns all of its items
+        report_data = format_result(report)
+        report_items = ReportItem.query.filter(
+            ReportItem.report_id == id).all()
+        set_last_modified([report, *report_items])
+        report_data['report_items'] = [report_item.format()
+                                       for report_item in report_items]
+
+    response = {
+        'success': True,
+        'data': report_data
+    }
+
+    if includes:
+        response['included'] = load_report_includes([report_data], includes)
+        drop_unrequested_fields([report_data], required)
+
+    return jsonify(response)
+
+
+# ---------------------------------------------------
+# Route - Get the consultant's Reports overlapping a Report
+# ----------------------------------------------------
+@blueprint.route('/api/reports/<int:id>/overlaps', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(['Reports'])
+def get_report_overlaps(id: int):
+    report = Report.query.with_entities(
+        Report.consulant_id, Report.report_from_date,
+        Report.report_to_date).filter(Report.id == id).first_or_404()
+
+    overlaps = Report.query.filter(
+        period_overlap_filter(report.report_from_date, report.report_to_date),
+        Report.consulant_id == report.consulant_id,
+        Report.id != id).order_by(Report.report_from_date, Report.id).all()
 
     return jsonify({
         'success': True,
-        'data': report_data
+        'data': [overlap.format() for overlap in overlaps]
     })
 
 
+# ---------------------------------------------------
+# Route - Render a Report as a document
+# ----------------------------------------------------
+@blueprint.route('/api/reports/<int:id>/render', methods=['GET'])
+@requires_auth('read:reports')
+def render_report(id: int):
+    render_format = request.args.get('format', default='html')
+    if render_format not in RENDER_FORMATS:
+        abort(400)
+
+    report = Report.query.filter(Report.id == id).first_or_404()
+
+    # the tag is the hash of the report's document, so a matching tag is
+    # answered before anything is rendered
+    document, digest = prepare_report(report, render_format)
+    if etag_matches(digest):
+        return not_modified(digest, None)
+
+    try:
+        content = get_renderer().render(report, document, digest,
+                                        render_format)
+
+    except Exception as error:
+        print(error)
+        abort(500)
+
+    response = current_app.response_class(
+        content, mimetype=RENDER_FORMATS[render_format])
+    response.headers['Content-Disposition'] = \
+        f'inline; filename="report-{id}.{render_format}"'
+    response.set_etag(digest)
+    return response
+
+
 # ---------------------------------------------------
 # Route - Create new Report
 # ----------------------------------------------------
@@ -98,13 +617,14 @@ def add_report():
     if not body_data:
         abort(400)
 
-    
-    # TODO validate the report item data
+    values = get_report_values(body_data)
+    if values is None:
+        abort(400)
 
     try:
         # Create the Report
         report = Report()
-        report.from_dict(body_data)
+        report.from_dict(values)
         report.report_status = "new"
         report.insert()
 
@@ -123,27 +643,77 @@ def add_report():
         abort(500)
 
 
+# ---------------------------------------------------
+# Route - Create the next Report, carrying forward the open items
+# ----------------------------------------------------
+@blueprint.route('/api/reports/<int:id>/carry-forward', methods=['POST'])
+@requires_auth('create:reports')
+def carry_forward_report(id: int):
+    body_data: dict = request.get_json()
+
+    if not body_data:
+        abort(400)
+
+    # only the dates are taken from the body, the client, engagement and
+    # contacts are always those of the previous report
+    values = get_report_values({key: body_data.get(key)
+                                for key in REPORT_DATE_FIELDS})
+    if values is None or not values.get('report_date') or \
+            not values.get('report_from_date'):
+        abort(400)
+
+    previous = Report.query.with_entities(
+        *[getattr(Report, name) for name in CARRY_FORWARD_COLUMNS]).filter(
+        Report.id == id).first_or_404()
+
+    try:
+        report = Report()
+        report.from_dict(previous._asdict())
+        report.from_dict(values)
+        report.report_status = "new"
+
+        # the report and its items are written in one transaction
+        db.session.add(report)
+        db.session.flush()
+        carried_forward = carry_forward_items(id, report.id)
+        db.session.commit()
+        notify_write(*REPORT_TABLES)
+
+    except DatabaseError as db_error:
+        print(db_error)
+        db.session.rollback()
+        abort(400)
+
+    except Exception as error:
+        print(error)
+        db.session.rollback()
+        abort(500)
+
+    return jsonify({
+        "success": True,
+        "message": "The report has been successfully saved",
+        "carried_forward": carried_forward,
+        "data": report.format()
+    }), 200
+
+
 # ---------------------------------------------------
 # Route - Update a Report
 # ----------------------------------------------------
 @blueprint.route('/api/reports/<int:id>', methods=['PATCH'])
 @requires_auth('update:reports')
 def update_report(id: int):
-    report: Report = Report.query.get_or_404(id)
     body_data: dict = request.get_json()
 
     if not body_data:
         abort(400)
 
-    try:
-        report.from_dict(body_data)
-        report.update()
+    values = get_report_values(body_data)
+    if values is None:
+        abort(400)
 
-        return jsonify({
-            "success": True,
-            "message": "The report has been successfully saved",
-            "data": report.format()
-        }), 200
+    try:
+        report = update_returning(Report, {'id': id}, values)
 
     except DatabaseError as db_error:
         print(db_error)
@@ -153,6 +723,15 @@ def update_report(id: int):
         print(error)
         abort(500)
 
+    if report is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The report has been successfully saved",
+        "data": format_report(report)
+    }), 200
+
 
 # ---------------------------------------------------
 # Route - Delete a Report
@@ -160,15 +739,9 @@ def update_report(id: int):
 @blueprint.route('/api/reports/<int:id>', methods=['DELETE'])
 @requires_auth('delete:reports')
 def delete_report(id: int):
-    report: Report = Report.query.get_or_404(id)
 
     try:
-        report.delete()
-
-        return jsonify({
-            "success": True,
-            "message": "The report has been successfully deleted",
-        }), 200
+        deleted = commit_delete(delete_report_rows(id), *REPORT_TABLES)
 
     except DatabaseError as db_error:
         print(db_error)
@@ -178,21 +751,31 @@ def delete_report(id: int):
         print(error)
         abort(500)
 
+    if deleted is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The report has been successfully deleted",
+    }), 200
+
 
 # ---------------------------------------------------
 # Route - Get the specified report report-items
 # ----------------------------------------------------
 @blueprint.route('/api/reports/<int:report_id>/items', methods=['GET'])
 @requires_auth('read:report-items')
+@conditional_get(report_item_list_validators)
 def get_report_items(report_id: int):
 
-    report_items = ReportItem.query.filter(
+    report_items = select_fields(ReportItem.query, ReportItem).filter(
         ReportItem.report_id == report_id).all()
 
     if len(report_items) == 0:
         abort(404)
 
-    report_item_list = [report_item.format() for report_item in report_items]
+    set_last_modified(report_items)
+    report_item_list = [format_result(report_item) for report_item in report_items]
     return jsonify({
         'success': True,
         'data': report_item_list
@@ -203,18 +786,20 @@ def get_report_items(report_id: int):
 # ----------------------------------------------------
 @blueprint.route('/api/reports/<int:report_id>/items/<int:item_id>', methods=['GET'])
 @requires_auth('read:report-items')
+@conditional_get(report_item_validators)
 def get_report_item(report_id: int, item_id:int):
 
-    report_item: ReportItem = ReportItem.query.filter(
+    report_item = select_fields(ReportItem.query, ReportItem).filter(
         ReportItem.report_id == report_id,
         ReportItem.report_item_nbr == item_id).first()
 
     if not report_item:
         abort(404)
 
+    set_last_modified([report_item])
     return jsonify({
         'success': True,
-        'data': report_item.format()
+        'data': format_result(report_item)
     })
 
 # ---------------------------------------------------
@@ -229,17 +814,17 @@ def add_report_item(report_id: int):
     if not body_data:
         abort(400)
 
-    max_report_item = ReportItem.query(func.max(ReportItem.report_item_nbr)).filter(
-        ReportItem.report_id == report_id).scalar()
-
-    if not max_report_item:
-        max_report_item = 0
+    # the next item number is read by the INSERT itself, a report that does
+    # not exist is rejected by the foreign key
+    next_item_nbr = select(
+        func.coalesce(func.max(ReportItem.report_item_nbr), 0) + 1).where(
+        ReportItem.report_id == report_id).scalar_subquery()
 
     try:
         report_item = ReportItem()
-        report_item.report_id = report_id
-        report_item.report_item_nbr = max_report_item + 1
         report_item.from_dict(body_data)
+        report_item.report_id = report_id
+        report_item.report_item_nbr = next_item_nbr
         report_item.insert()
 
         return jsonify({
@@ -262,27 +847,20 @@ def add_report_item(report_id: int):
 @blueprint.route('/api/reports/<int:report_id>/items/<int:item_id>', methods=['PATCH'])
 @requires_auth('update:report-items')
 def update_report_item(report_id: int, item_id: int):
-    report_item: ReportItem = ReportItem.query.filter(
-        ReportItem.report_id == report_id,
-        ReportItem.report_item_nbr == item_id).first()
-
-    if not report_item:
-        abort(404)
-
     body_data: dict = request.get_json()
 
     if not body_data:
         abort(400)
 
-    try:
-        report_item.from_dict(body_data)
-        report_item.update()
+    values = get_report_item_values(body_data)
+    if values is None:
+        abort(400)
 
-        return jsonify({
-            "success": True,
-            "message": "The report item has been successfully updated",
-            "data": report_item.format()
-        }), 200
+    try:
+        report_item = update_returning(ReportItem, {
+            'report_id': report_id,
+            'report_item_nbr': item_id
+        }, values)
 
     except DatabaseError as db_error:
         print(db_error)
@@ -292,26 +870,27 @@ def update_report_item(report_id: int, item_id: int):
         print(error)
         abort(500)
 
+    if report_item is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The report item has been successfully updated",
+        "data": format_report_item(report_item)
+    }), 200
+
 # ---------------------------------------------------
 # Route - Delete a Report Item
 # ----------------------------------------------------
 @blueprint.route('/api/reports/<int:report_id>/items/<int:item_id>', methods=['DELETE'])
 @requires_auth('delete:report-items')
 def delete_report_item(report_id: int, item_id: int):
-    report_item: ReportItem = ReportItem.query.filter(
-        ReportItem.report_id == report_id,
-        ReportItem.report_item_nbr == item_id).first()
-
-    if not report_item:
-        abort(404)
 
     try:
-        report_item.delete()
-
-        return jsonify({
-            "success": True,
-            "message": "The report item has been successfully deleted",
-        }), 200
+        deleted = commit_delete(delete_returning(ReportItem, {
+            'report_id': report_id,
+            'report_item_nbr': item_id
+        }), ReportItem.__tablename__)
 
     except DatabaseError as db_error:
         print(db_error)
@@ -320,3 +899,11 @@ def delete_report_item(report_id: int, item_id: int):
     except Exception as error:
         print(error)
         abort(500)
+
+    if deleted is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The report item has been successfully deleted",
+    }), 200
@@ -0,0 +1,157 @@
+from typing import Optional
+from flask import Blueprint, request, abort, jsonify
+from ..cache import cached_response
+from ..models import ITEM_TYPES, ReportTemplate, commit_delete
+from ..report_templates import (TEMPLATE_TABLES, delete_template_rows,
+                                get_template_cache, insert_report_from_template,
+                                insert_template)
+from .reports import get_report_values
+from sqlalchemy.exc import DatabaseError
+from auth.auth import requires_auth
+
+blueprint = Blueprint('templates', __name__)
+
+'''
+Helper Methods
+'''
+
+
+def is_valid_template(body_data: dict) -> bool:
+    items = body_data.get('items')
+    if not body_data.get('name') or not isinstance(items, list) or not items:
+        return False
+
+    for item in items:
+        if not isinstance(item, dict) or \
+                item.get('item_type') not in ITEM_TYPES or \
+                not item.get('item_description'):
+            return False
+
+    return True
+
+
+def get_template_report_values(body_data: dict) -> Optional[dict]:
+    values = get_report_values(body_data)
+    if values is None or not values.get('report_date') or \
+            not values.get('report_from_date'):
+        return None
+
+    return values
+
+
+'''
+Routes - Report Templates
+'''
+@blueprint.route('/api/templates', methods=['GET'])
+@requires_auth('read:reports')
+@cached_response(TEMPLATE_TABLES)
+def get_templates():
+    templates = ReportTemplate.query.order_by(ReportTemplate.name).all()
+
+    return jsonify({
+        'success': True,
+        'data': [template.format() for template in templates]
+    })
+
+
+@blueprint.route('/api/templates/<int:template_id>', methods=['GET'])
+@requires_auth('read:reports')
+def get_template(template_id: int):
+    template = get_template_cache().get(template_id)
+    if template is None:
+        abort(404)
+
+    return jsonify({
+        'success': True,
+        'data': template
+    })
+
+
+@blueprint.route('/api/templates', methods=['POST'])
+@requires_auth('create:reports')
+def add_template():
+    body_data: dict = request.get_json()
+
+    if not body_data or not is_valid_template(body_data):
+        abort(400)
+
+    try:
+        template = insert_template(body_data.get('name'),
+                                   body_data.get('description'),
+                                   body_data.get('items'))
+
+    except DatabaseError as db_error:
+        print(db_error)
+        abort(400)
+
+    except Exception as error:
+        print(error)
+        abort(500)
+
+    return jsonify({
+        "success": True,
+        "message": "The template has been successfully saved",
+        "data": template.format()
+    }), 200
+
+
+@blueprint.route('/api/templates/<int:template_id>', methods=['DELETE'])
+@requires_auth('delete:reports')
+def delete_template(template_id: int):
+
+    try:
+        deleted = commit_delete(
+            delete_template_rows(template_id), *TEMPLATE_TABLES)
+
+    except DatabaseError as db_error:
+        print(db_error)
+        abort(400)
+
+    except Exception as error:
+        print(error)
+        abort(500)
+
+    if deleted is None:
+        abort(404)
+
+    return jsonify({
+        "success": True,
+        "message": "The template has been successfully deleted",
+        "id": template_id
+    }), 200
+
+
+@blueprint.route('/api/templates/<int:template_id>/reports',
+                 methods=['POST'])
+@requires_auth('create:reports')
+def add_report_from_template(template_id: int):
+    body_data: dict = request.get_json()
+
+    if not body_data:
+        abort(400)
+
+    values = get_template_report_values(body_data)
+    if values is None:
+        abort(400)
+
+    template = get_template_cache().get(template_id)
+    if template is None:
+        abort(404)
+
+    try:
+        report, item_count = insert_report_from_template(template, values)
+
+    except DatabaseError as db_error:
+        print(db_error)
+        abort(400)
+
+    except Exception as error:
+        print(error)
+        abort(500)
+
+    return jsonify({
+        "success": True,
+        "message": "The report has been successfully saved",
+        "item_count": item_count,
+        "data": report.format()
+    }), 200
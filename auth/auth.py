@@ -1,6 +1,6 @@
 import json
 import os
-from flask import request
+from flask import g, request
 from functools import wraps
 from jose import jwt
 from urllib.request import urlopen
@@ -148,13 +148,25 @@ def verify_decode_jwt(token: str):
         }, 400)
 
 
+# helper function to verify the token once per request, batch sub-requests
+# share the application context and so reuse the verified payload
+def get_verified_payload(token: str):
+    verified = g.get('verified_jwt')
+    if verified and verified[0] == token:
+        return verified[1]
+
+    payload = verify_decode_jwt(token)
+    g.verified_jwt = (token, payload)
+    return payload
+
+
 # Authentication and authorisation decorator function
 def requires_auth(permission: str = ''):
     def requires_auth_decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
             token = get_token_auth_header()
-            payload = verify_decode_jwt(token)
+            payload = get_verified_payload(token)
             check_permissions(permission, payload)
             return f(*args, **kwargs)
         return wrapper
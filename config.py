@@ -5,6 +5,26 @@ class Config(object):
     """Base configuration."""
     APP_DIR = os.path.abspath(os.path.dirname(__file__))  # This directory
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    IMPORT_CHUNK_SIZE = 500
+    BATCH_MAX_REQUESTS = 50
+    DELETE_BATCH_SIZE = 1000
+    RESPONSE_CACHE_MAX_ENTRIES = 512
+    RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    RESPONSE_CACHE_TTL = 60
+    REFERENCE_CACHE_TTL = 300
+    COMPRESSION_MIN_SIZE = 1024
+    COMPRESSION_LEVELS = {'zstd': 3, 'br': 5, 'gzip': 6}
+    WORKLOAD_WINDOW_DAYS = 90
+    JOB_WORKERS = 2
+    JOB_POLL_INTERVAL = 1.0
+    JOB_HEARTBEAT_INTERVAL = 10
+    JOB_STALE_AFTER = 60
+    JOB_MAX_ATTEMPTS = 3
+    RENDER_WORKERS = 2
+    RENDER_TIMEOUT = 60
+    RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    TEMPLATE_CACHE_MAX_ENTRIES = 256
+    TEMPLATE_CACHE_TTL = 300
 
 
 class ProdConfig(Config):
@@ -0,0 +1,33 @@
+"""add row version columns
+
+Revision ID: 5c2f8e1a9b34
+Revises: 188eabcbde6c
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2f8e1a9b34'
+down_revision = '188eabcbde6c'
+branch_labels = None
+depends_on = None
+
+TABLES = ['Contacts', 'Clients', 'Client_Contacts', 'Reports', 'Report_Items']
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column(
+            'version', sa.Integer(), server_default='1', nullable=False))
+        op.add_column(table, sa.Column(
+            'updated_at', sa.DateTime(), server_default=sa.text('now()'),
+            nullable=False))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
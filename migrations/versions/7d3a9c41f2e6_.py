@@ -0,0 +1,117 @@
+"""add issue count rollup
+
+Revision ID: 7d3a9c41f2e6
+Revises: 5c2f8e1a9b34
+Create Date: 2026-10-19 14:02:17.530981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3a9c41f2e6'
+down_revision = '5c2f8e1a9b34'
+branch_labels = None
+depends_on = None
+
+ISSUE_COUNT_TRIGGERS = '''
+CREATE OR REPLACE FUNCTION adjust_issue_count(
+    p_client_id integer, p_consultant_id integer,
+    p_issue_status varchar, p_delta integer) RETURNS void AS $$
+BEGIN
+    INSERT INTO "Issue_Counts"
+        (client_id, consultant_id, issue_status, issue_count)
+    VALUES (p_client_id, p_consultant_id, p_issue_status, p_delta)
+    ON CONFLICT (client_id, consultant_id, issue_status) DO UPDATE
+        SET issue_count = "Issue_Counts".issue_count + EXCLUDED.issue_count;
+
+    DELETE FROM "Issue_Counts"
+    WHERE client_id = p_client_id AND consultant_id = p_consultant_id
+        AND issue_status = p_issue_status AND issue_count = 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION report_items_issue_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE')
+            AND OLD.item_type = 'issue_identified' THEN
+        PERFORM adjust_issue_count(r.client_id, r.consulant_id,
+            COALESCE(OLD.issue_status, 'open'), -1)
+        FROM "Reports" r WHERE r.id = OLD.report_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE')
+            AND NEW.item_type = 'issue_identified' THEN
+        PERFORM adjust_issue_count(r.client_id, r.consulant_id,
+            COALESCE(NEW.issue_status, 'open'), 1)
+        FROM "Reports" r WHERE r.id = NEW.report_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reports_issue_counts() RETURNS trigger AS $$
+BEGIN
+    IF (OLD.client_id, OLD.consulant_id) IS DISTINCT FROM
+            (NEW.client_id, NEW.consulant_id) THEN
+        PERFORM adjust_issue_count(OLD.client_id, OLD.consulant_id,
+                                   issues.issue_status, -issues.issue_count),
+                adjust_issue_count(NEW.client_id, NEW.consulant_id,
+                                   issues.issue_status, issues.issue_count)
+        FROM (SELECT COALESCE(issue_status, 'open') AS issue_status,
+                     count(*)::integer AS issue_count
+              FROM "Report_Items"
+              WHERE report_id = NEW.id AND item_type = 'issue_identified'
+              GROUP BY 1) issues;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS report_items_issue_counts ON "Report_Items";
+CREATE TRIGGER report_items_issue_counts
+    AFTER INSERT OR DELETE OR UPDATE OF report_id, item_type, issue_status
+    ON "Report_Items"
+    FOR EACH ROW EXECUTE PROCEDURE report_items_issue_counts();
+
+DROP TRIGGER IF EXISTS reports_issue_counts ON "Reports";
+CREATE TRIGGER reports_issue_counts
+    AFTER UPDATE OF client_id, consulant_id ON "Reports"
+    FOR EACH ROW EXECUTE PROCEDURE reports_issue_counts();
+'''
+
+POPULATE_ISSUE_COUNTS = '''
+INSERT INTO "Issue_Counts"
+    (client_id, consultant_id, issue_status, issue_count)
+SELECT r.client_id, r.consulant_id, COALESCE(i.issue_status, 'open'),
+       count(*)
+FROM "Report_Items" i JOIN "Reports" r ON r.id = i.report_id
+WHERE i.item_type = 'issue_identified'
+GROUP BY 1, 2, 3;
+'''
+
+
+def upgrade():
+    op.create_table('Issue_Counts',
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('consultant_id', sa.Integer(), nullable=False),
+    sa.Column('issue_status', sa.String(length=20), nullable=False),
+    sa.Column('issue_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('client_id', 'consultant_id', 'issue_status')
+    )
+    op.execute(ISSUE_COUNT_TRIGGERS)
+    op.execute(POPULATE_ISSUE_COUNTS)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS reports_issue_counts ON "Reports"')
+    op.execute(
+        'DROP TRIGGER IF EXISTS report_items_issue_counts ON "Report_Items"')
+    op.execute('DROP FUNCTION IF EXISTS reports_issue_counts()')
+    op.execute('DROP FUNCTION IF EXISTS report_items_issue_counts()')
+    op.execute('DROP FUNCTION IF EXISTS '
+               'adjust_issue_count(integer, integer, varchar, integer)')
+    op.drop_table('Issue_Counts')
@@ -0,0 +1,30 @@
+"""add partial index on open report item tasks
+
+Revision ID: 9b1e4f7c2a53
+Revises: 7d3a9c41f2e6
+Create Date: 2026-10-19 15:26:48.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e4f7c2a53'
+down_revision = '7d3a9c41f2e6'
+branch_labels = None
+depends_on = None
+
+OPEN_TASKS = sa.text(
+    "item_complete = false AND "
+    "item_type IN ('requested_task', 'follow_up_task')")
+
+
+def upgrade():
+    op.create_index('ix_report_items_open_tasks', 'Report_Items',
+                    ['report_id'], unique=False,
+                    postgresql_where=OPEN_TASKS)
+
+
+def downgrade():
+    op.drop_index('ix_report_items_open_tasks', table_name='Report_Items')
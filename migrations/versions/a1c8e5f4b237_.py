@@ -0,0 +1,42 @@
+"""add report templates
+
+Revision ID: a1c8e5f4b237
+Revises: f3b6d2a8c915
+Create Date: 2026-10-19 19:35:08.114620
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c8e5f4b237'
+down_revision = 'f3b6d2a8c915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Report_Templates',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('Report_Template_Items',
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('item_nbr', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('item_sequence_nbr', sa.Integer(), nullable=False),
+    sa.Column('item_description', sa.String(), nullable=False),
+    sa.Column('request_expected_outcome', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['Report_Templates.id'], ),
+    sa.PrimaryKeyConstraint('template_id', 'item_nbr')
+    )
+
+
+def downgrade():
+    op.drop_table('Report_Template_Items')
+    op.drop_table('Report_Templates')
@@ -0,0 +1,37 @@
+"""index issues without a status as open
+
+Revision ID: a7c3e9f1d264
+Revises: f6b2d8e4a153
+Create Date: 2026-10-20 12:48:31.207519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f1d264'
+down_revision = 'f6b2d8e4a153'
+branch_labels = None
+depends_on = None
+
+OPEN_ISSUES = sa.text(
+    "item_type = 'issue_identified' AND "
+    "(issue_status IN ('open', 'blocked') OR issue_status IS NULL)")
+OPEN_ISSUES_WITH_STATUS = sa.text(
+    "item_type = 'issue_identified' AND "
+    "issue_status IN ('open', 'blocked')")
+
+
+def upgrade():
+    op.drop_index('ix_report_items_open_issues', table_name='Report_Items')
+    op.create_index('ix_report_items_open_issues', 'Report_Items',
+                    ['report_id', 'issue_status'], unique=False,
+                    postgresql_where=OPEN_ISSUES)
+
+
+def downgrade():
+    op.drop_index('ix_report_items_open_issues', table_name='Report_Items')
+    op.create_index('ix_report_items_open_issues', 'Report_Items',
+                    ['report_id', 'issue_status'], unique=False,
+                    postgresql_where=OPEN_ISSUES_WITH_STATUS)
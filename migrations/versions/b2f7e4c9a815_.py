@@ -0,0 +1,65 @@
+"""notify table writes instead of counting them in Table_Generations
+
+Revision ID: b2f7e4c9a815
+Revises: a7c3e9f1d264
+Create Date: 2026-10-21 09:14:36.582047
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2f7e4c9a815'
+down_revision = 'a7c3e9f1d264'
+branch_labels = None
+depends_on = None
+
+# the triggers added by e1a4c7d2b985 are kept, only their function changes
+NOTIFY_TABLE_WRITE = '''
+CREATE OR REPLACE FUNCTION bump_table_generation() RETURNS trigger AS $$
+BEGIN
+    -- writes made by other triggers, such as the issue count rollup, are
+    -- covered by the generation of the table whose write fired them
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+
+    -- sent on commit, repeats within a transaction are sent once
+    PERFORM pg_notify('table_writes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+COUNT_TABLE_WRITE = '''
+CREATE OR REPLACE FUNCTION bump_table_generation() RETURNS trigger AS $$
+BEGIN
+    -- writes made by other triggers, such as the issue count rollup, are
+    -- covered by the generation of the table whose write fired them
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO "Table_Generations" (table_name, generation)
+    VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE
+        SET generation = "Table_Generations".generation + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+
+def upgrade():
+    op.execute(NOTIFY_TABLE_WRITE)
+    op.drop_table('Table_Generations')
+
+
+def downgrade():
+    op.create_table('Table_Generations',
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.execute(COUNT_TABLE_WRITE)
@@ -0,0 +1,33 @@
+"""add report period index and check
+
+Revision ID: b7d4f1e9a362
+Revises: a1c8e5f4b237
+Create Date: 2026-10-19 20:02:51.740336
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d4f1e9a362'
+down_revision = 'a1c8e5f4b237'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # daterange() rejects a period that ends before it starts, the check
+    # keeps such periods out of the table and so out of the index
+    op.create_check_constraint(
+        'ck_reports_period', 'Reports',
+        'report_to_date IS NULL OR report_to_date >= report_from_date')
+    op.execute('''
+        CREATE INDEX ix_reports_period ON "Reports"
+            USING gist (daterange(report_from_date, report_to_date, '[]'))
+    ''')
+
+
+def downgrade():
+    op.drop_index('ix_reports_period', table_name='Reports')
+    op.drop_constraint('ck_reports_period', 'Reports', type_='check')
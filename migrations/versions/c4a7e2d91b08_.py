@@ -0,0 +1,33 @@
+"""add open issue and report date indexes
+
+Revision ID: c4a7e2d91b08
+Revises: 9b1e4f7c2a53
+Create Date: 2026-10-19 16:41:05.871352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7e2d91b08'
+down_revision = '9b1e4f7c2a53'
+branch_labels = None
+depends_on = None
+
+OPEN_ISSUES = sa.text(
+    "item_type = 'issue_identified' AND "
+    "issue_status IN ('open', 'blocked')")
+
+
+def upgrade():
+    op.create_index('ix_report_items_open_issues', 'Report_Items',
+                    ['report_id', 'issue_status'], unique=False,
+                    postgresql_where=OPEN_ISSUES)
+    op.create_index('ix_reports_report_date', 'Reports',
+                    ['report_date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reports_report_date', table_name='Reports')
+    op.drop_index('ix_report_items_open_issues', table_name='Report_Items')
@@ -0,0 +1,26 @@
+"""add client latest report index
+
+Revision ID: c5e2a7b3d481
+Revises: b7d4f1e9a362
+Create Date: 2026-10-19 20:31:14.208957
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e2a7b3d481'
+down_revision = 'b7d4f1e9a362'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_reports_client_date', 'Reports',
+                    ['client_id', sa.text('report_date DESC'),
+                     sa.text('id DESC')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reports_client_date', table_name='Reports')
@@ -0,0 +1,34 @@
+"""add report item search vector
+
+Revision ID: d82f5b3e6a17
+Revises: c4a7e2d91b08
+Create Date: 2026-10-19 18:07:33.642590
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd82f5b3e6a17'
+down_revision = 'c4a7e2d91b08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('''
+        ALTER TABLE "Report_Items" ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (to_tsvector('english',
+                coalesce(item_description, '') || ' ' ||
+                coalesce(request_expected_outcome, '') || ' ' ||
+                coalesce(issue_action_description, ''))) STORED
+    ''')
+    op.create_index('ix_report_items_search_vector', 'Report_Items',
+                    ['search_vector'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_report_items_search_vector', table_name='Report_Items')
+    op.drop_column('Report_Items', 'search_vector')
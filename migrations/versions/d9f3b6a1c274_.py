@@ -0,0 +1,30 @@
+"""set updated_at defaults to the database clock in UTC
+
+Revision ID: d9f3b6a1c274
+Revises: c5e2a7b3d481
+Create Date: 2026-10-20 09:14:37.502816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f3b6a1c274'
+down_revision = 'c5e2a7b3d481'
+branch_labels = None
+depends_on = None
+
+TABLES = ['Contacts', 'Clients', 'Client_Contacts', 'Reports', 'Report_Items',
+          'Report_Templates']
+
+
+def upgrade():
+    for table in TABLES:
+        op.alter_column(table, 'updated_at', server_default=sa.text(
+            "timezone('utc', CURRENT_TIMESTAMP)"))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.alter_column(table, 'updated_at', server_default=sa.text('now()'))
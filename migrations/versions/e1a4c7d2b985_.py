@@ -0,0 +1,59 @@
+"""add table generations for cross process cache invalidation
+
+Revision ID: e1a4c7d2b985
+Revises: d9f3b6a1c274
+Create Date: 2026-10-20 10:41:08.316742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1a4c7d2b985'
+down_revision = 'd9f3b6a1c274'
+branch_labels = None
+depends_on = None
+
+CACHED_TABLES = ['Contacts', 'Clients', 'Client_Contacts', 'Reports',
+                 'Report_Items', 'Issue_Counts', 'Report_Templates',
+                 'Report_Template_Items']
+
+TABLE_GENERATION_TRIGGERS = '''
+CREATE OR REPLACE FUNCTION bump_table_generation() RETURNS trigger AS $$
+BEGIN
+    -- writes made by other triggers, such as the issue count rollup, are
+    -- covered by the generation of the table whose write fired them
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO "Table_Generations" (table_name, generation)
+    VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE
+        SET generation = "Table_Generations".generation + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+''' + ''.join(f'''
+DROP TRIGGER IF EXISTS table_generation ON "{table}";
+CREATE TRIGGER table_generation
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "{table}"
+    FOR EACH STATEMENT EXECUTE PROCEDURE bump_table_generation();
+''' for table in CACHED_TABLES)
+
+
+def upgrade():
+    op.create_table('Table_Generations',
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.execute(TABLE_GENERATION_TRIGGERS)
+
+
+def downgrade():
+    for table in CACHED_TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS table_generation ON "{table}"')
+    op.execute('DROP FUNCTION IF EXISTS bump_table_generation()')
+    op.drop_table('Table_Generations')
@@ -0,0 +1,25 @@
+"""add engagement reference index
+
+Revision ID: e5a9c3d17f42
+Revises: d82f5b3e6a17
+Create Date: 2026-10-19 18:12:47.306219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3d17f42'
+down_revision = 'd82f5b3e6a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_reports_engagement_date', 'Reports',
+                    ['engagement_reference', 'report_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reports_engagement_date', table_name='Reports')
@@ -0,0 +1,41 @@
+"""add jobs table
+
+Revision ID: f3b6d2a8c915
+Revises: e5a9c3d17f42
+Create Date: 2026-10-19 18:47:22.519804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b6d2a8c915'
+down_revision = 'e5a9c3d17f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Jobs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('job_type', sa.String(length=50), nullable=False),
+    sa.Column('permission', sa.String(length=50), nullable=False),
+    sa.Column('params', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_queued', 'Jobs', ['id'], unique=False,
+                    postgresql_where=sa.text("status = 'queued'"))
+
+
+def downgrade():
+    op.drop_index('ix_jobs_queued', table_name='Jobs')
+    op.drop_table('Jobs')
@@ -0,0 +1,30 @@
+"""add job heartbeats
+
+Revision ID: f6b2d8e4a153
+Revises: e1a4c7d2b985
+Create Date: 2026-10-20 12:05:52.914370
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b2d8e4a153'
+down_revision = 'e1a4c7d2b985'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.add_column('Jobs', sa.Column(
+        'attempts', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_jobs_running', 'Jobs', ['heartbeat_at'], unique=False,
+                    postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade():
+    op.drop_index('ix_jobs_running', table_name='Jobs')
+    op.drop_column('Jobs', 'attempts')
+    op.drop_column('Jobs', 'heartbeat_at')
@@ -0,0 +1,170 @@
+import unittest
+import json
+import uuid
+from unittest import mock
+from werkzeug.test import TestResponse
+import auth.auth
+from api import create_app
+from config import DevConfig
+from test_utilities import generate_auth_token, GOOD_CLIENT_DATA
+
+CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
+CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
+
+
+class BatchTestSuite(unittest.TestCase):
+    """This class performs the test cases for the batch endpoint"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        token_response = generate_auth_token(CLIENT_ID_VAR, CLIENT_SECRET_VAR)
+        cls._auth_token = token_response.get('access_token', '')
+
+    def setUp(self):
+        self.app = create_app(DevConfig)
+        self.client = self.app.test_client
+        self.headers: dict = {
+            "Authorization": f"Bearer {self._auth_token}"}
+        # a client name no other test uses
+        self.client_name = f'Batch {uuid.uuid4().hex[:8]}'
+
+    def tearDown(self):
+        """Executed after reach test"""
+        pass
+
+    def run_batch(self, batch_data) -> TestResponse:
+        return self.client().post(
+            '/api/batch',
+            headers=self.headers,
+            json=batch_data)
+
+    def add_client_request(self, name=None) -> dict:
+        return {"method": "POST", "path": "/api/clients",
+                "body": {**GOOD_CLIENT_DATA, "name": name}}
+
+    def find_clients(self) -> list:
+        response = self.client().get(
+            f'/api/clients?search={self.client_name}', headers=self.headers)
+        return json.loads(response.data).get('data') or []
+
+    # =========================================================================
+    # Batch Tests
+    # =========================================================================
+    def test_run_batch_success(self):
+        response = self.run_batch({"requests": [
+            self.add_client_request(self.client_name),
+            {"method": "GET", "path": "/api/healthy"}]})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['success'], True,
+            msg="The response did not report as successful")
+        self.assertEqual(
+            [result['status'] for result in data['results']], [200, 200],
+            msg="The sub-requests were not all run")
+        self.assertEqual(
+            data['results'][0]['body']['data']['name'], self.client_name,
+            msg="The sub-request response was not returned")
+
+    def test_run_batch_partial_success(self):
+        # the failed sub-request does not undo the one before it
+        response = self.run_batch({"requests": [
+            self.add_client_request(self.client_name),
+            self.add_client_request()]})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            [result['status'] for result in data['results']], [200, 400],
+            msg="The sub-request statuses were not returned")
+        self.assertEqual(
+            len(self.find_clients()), 1,
+            msg="The successful sub-request was not committed")
+
+    def test_run_atomic_batch_success(self):
+        # the GET does not commit its savepoint, the POST is still committed
+        response = self.run_batch({"atomic": True, "requests": [
+            {"method": "GET", "path": "/api/healthy"},
+            self.add_client_request(self.client_name)]})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['success'], True,
+            msg="The response did not report as successful")
+        self.assertEqual(
+            len(self.find_clients()), 1,
+            msg="The atomic batch was not committed")
+
+    def test_run_atomic_batch_fail(self):
+        # fail - the second sub-request rolls back the first
+        response = self.run_batch({"atomic": True, "requests": [
+            self.add_client_request(self.client_name),
+            self.add_client_request()]})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+        self.assertEqual(
+            self.find_clients(), [],
+            msg="The atomic batch was not rolled back")
+
+    def test_run_batch_nested_fail(self):
+        # fail - a batch can not contain another batch
+        response = self.run_batch({"requests": [
+            {"method": "POST", "path": "/api/batch/",
+             "body": {"requests": []}}]})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_run_batch_max_requests_fail(self):
+        # fail - the batch has more than BATCH_MAX_REQUESTS sub-requests
+        self.app.config['BATCH_MAX_REQUESTS'] = 2
+        response = self.run_batch({"requests": [
+            {"method": "GET", "path": "/api/healthy"}] * 3})
+
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+
+    def test_run_batch_token_verified_once(self):
+        with mock.patch('auth.auth.verify_decode_jwt',
+                        wraps=auth.auth.verify_decode_jwt) as verify:
+            response = self.run_batch({"requests": [
+                {"method": "GET", "path": "/api/clients"},
+                {"method": "GET", "path": "/api/contacts"},
+                {"method": "GET", "path": "/api/reports"}]})
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            verify.call_count, 1,
+            msg="The token was verified for each sub-request")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,17 @@
 from datetime import date
 import os
+import time
 import unittest
 import json
 from werkzeug.test import TestResponse
+from sqlalchemy import insert
 from api import create_app
+from api.models import Client, db, purge_client_rows
 from config import DevConfig
-from test_utilities import generate_auth_token, GOOD_CLIENT_DATA
+from test_utilities import (generate_auth_token, count_statements,
+                            create_report, record_statements,
+                            GOOD_CLIENT_DATA, GOOD_CLIENT_CONTACT_DATA,
+                            GOOD_REPORT_ITEM_DATA)
 
 CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
 CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
@@ -57,6 +63,20 @@ class ClientTestSuite(unittest.TestCase):
             'data', data,
             msg="The reponse did not contain the contact data")
 
+    def test_add_client_statements(self):
+        with record_statements(self.app) as statements:
+            response = self.add_client(GOOD_CLIENT_DATA)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'INSERT'), 1,
+            msg="The client was not saved with a single INSERT")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0,
+            msg="The saved client was selected again")
+
     def test_add_client_fail(self):
         # fail - bad request data
         client_data = {
@@ -112,6 +132,76 @@ class ClientTestSuite(unittest.TestCase):
             data['success'], False,
             msg="The response did not report as failed")
 
+    def test_get_client_list_fields_success(self):
+        response = self.client().get(
+            '/api/clients?fields=id,name',
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Status Code was not 200")
+        for client in data['data']:
+            self.assertEqual(
+                sorted(client.keys()), ['id', 'name'],
+                msg="The response contained fields that were not requested")
+
+    def get_client_names(self) -> list:
+        response = self.client().get(
+            '/api/clients?page_size=1000', headers=self.headers)
+        return [client['name'] for client in json.loads(response.data)['data']]
+
+    def test_get_client_list_cache_invalidated(self):
+        self.add_client(GOOD_CLIENT_DATA)
+        self.get_client_names()
+
+        self.add_client({**GOOD_CLIENT_DATA, "name": "Cache Write Client"})
+
+        self.assertIn(
+            "Cache Write Client", self.get_client_names(),
+            msg="The cached client list did not include the new client")
+
+    def test_get_client_list_cache_external_write(self):
+        # a write that does not pass through this process, as from another
+        # server process, is seen through the write notifications
+        with self.app.app_context():
+            if db.engine.dialect.name != 'postgresql':
+                self.skipTest("Only Postgres notifies the table writes")
+
+        self.add_client(GOOD_CLIENT_DATA)
+        self.get_client_names()
+
+        with self.app.app_context():
+            db.session.execute(insert(Client.__table__).values(
+                name="External Write Client", bus_reg_nbr="1",
+                abbreviation="EWC"))
+            db.session.commit()
+
+        # the write notification arrives shortly after the commit
+        for _ in range(50):
+            if "External Write Client" in self.get_client_names():
+                break
+            time.sleep(0.1)
+
+        self.assertIn(
+            "External Write Client", self.get_client_names(),
+            msg="The cached client list missed a write by another process")
+
+    def test_get_client_list_fields_fail(self):
+        response = self.client().get(
+            '/api/clients?fields=id,not_a_field',
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="Status Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
     def test_get_client_success(self):
         # Create client to be retreived
         response = self.add_client(GOOD_CLIENT_DATA)
@@ -236,6 +326,100 @@ class ClientTestSuite(unittest.TestCase):
             data['success'], False,
             msg="The response did not report as failed")
 
+    def test_delete_client_statements(self):
+        # a client with a contact, a report and a report item
+        report = create_report(
+            self.client, self.headers, items=[GOOD_REPORT_ITEM_DATA])
+
+        with record_statements(self.app) as statements:
+            response = self.client().delete(
+                f"/api/clients/{report['client_id']}", headers=self.headers)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Status Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'DELETE'), 4,
+            msg="The client was not deleted with one statement per table")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0,
+            msg="The dependent rows were loaded before the delete")
+
+        response = self.client().get(
+            f"/api/reports/{report['id']}", headers=self.headers)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The report of the deleted client was found")
+
+    def test_purge_client_batches(self):
+        report = create_report(self.client, self.headers)
+        create_report(self.client, self.headers,
+                      {"client_id": report['client_id']})
+        batches = []
+
+        with self.app.app_context():
+            deleted = purge_client_rows(report['client_id'], 1,
+                                        batches.append)
+
+        self.assertEqual(
+            deleted, 1,
+            msg="The client was not purged")
+        self.assertEqual(
+            batches, [1, 1, 1],
+            msg="The reports and contact were not purged in batches")
+
+    def test_purge_client_fail(self):
+        with self.app.app_context():
+            deleted = purge_client_rows(99999)
+
+        self.assertEqual(
+            deleted, 0,
+            msg="A client that does not exist was purged")
+
+    def test_get_client_overview_success(self):
+        report = create_report(self.client, self.headers, items=[
+            {key: value for key, value in GOOD_REPORT_ITEM_DATA.items()
+             if key != 'issue_status'},
+            {**GOOD_REPORT_ITEM_DATA, "issue_status": "blocked"},
+            {**GOOD_REPORT_ITEM_DATA, "issue_status": "resolved"}])
+
+        with record_statements(self.app) as statements:
+            response = self.client().get(
+                f"/api/clients/{report['client_id']}/overview",
+                headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        overview = data['data']
+        self.assertEqual(
+            (overview['contact_count'], overview['report_count'],
+             overview['report_status_counts']['new'],
+             overview['open_issue_count']),
+            (1, 1, 1, 2),
+            msg="The client counts were not returned")
+        self.assertEqual(
+            overview['latest_report']['id'], report['id'],
+            msg="The latest report was not returned")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 1,
+            msg="The overview was not read in a single statement")
+
+    def test_get_client_overview_fail(self):
+        response = self.client().get(
+            '/api/clients/99999/overview', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
     # =========================================================================
     # Client Contact Tests
     # =========================================================================
@@ -304,6 +488,24 @@ class ClientTestSuite(unittest.TestCase):
             'data', data,
             msg="The reponse did not contain the contact data")
 
+    def test_add_client_contact_statements(self):
+        client_data = json.loads(self.add_client(GOOD_CLIENT_DATA).data)
+        contact_data = {**GOOD_CLIENT_CONTACT_DATA,
+                        "client_id": client_data['data']['id']}
+
+        with record_statements(self.app) as statements:
+            response = self.add_client_contact(contact_data)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'INSERT'), 1,
+            msg="The client contact was not saved with a single INSERT")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0,
+            msg="The client was selected before the INSERT")
+
     def test_add_client_contact_fail(self):
         # fails - invalid client id
         contact_data = {
@@ -326,6 +528,55 @@ class ClientTestSuite(unittest.TestCase):
             data['success'], False,
             msg="The response did not report as failed")
 
+    def import_client_contacts(self, client_id, csv_data) -> TestResponse:
+        return self.client().post(
+            f'/api/clients/{client_id}/contacts/import?chunk_size=2',
+            headers={**self.headers, "Content-Type": "text/csv"},
+            data=csv_data.encode())
+
+    def test_import_client_contacts_success(self):
+        client = json.loads(self.add_client(GOOD_CLIENT_DATA).data)['data']
+        csv_data = (
+            "name,email_address,phone\n"
+            "Will Power,wpower@company.com.au,0412987654\n"
+            ",noname@company.com.au,0412000000\n"
+            "Jane Doe,jdoe@company.com.au,0412123123\n")
+
+        with record_statements(self.app) as statements:
+            response = self.import_client_contacts(client['id'], csv_data)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            (data['imported'], data['failed']), (2, 1),
+            msg="The rows were not imported and reported")
+        self.assertEqual(
+            [chunk['imported'] for chunk in data['chunks']], [1, 1],
+            msg="The progress of each chunk was not reported")
+        self.assertEqual(
+            count_statements(statements, 'INSERT'), 2,
+            msg="The chunks were not saved with one INSERT each")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 1,
+            msg="The client was looked up for each row")
+
+    def test_import_client_contacts_fail(self):
+        # fail - the client does not exist
+        response = self.import_client_contacts(
+            99999, "name\nWill Power\n")
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
     def test_get_client_contact_list_success(self):
         # Get first client
         first_client = self.get_first_client()
@@ -0,0 +1,139 @@
+import gzip
+import unittest
+import json
+from api import create_app
+from api.compression import brotli, zstandard
+from config import DevConfig
+from test_utilities import generate_auth_token, GOOD_CONTACT_DATA
+
+CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
+CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
+
+
+class CompressionTestSuite(unittest.TestCase):
+    """This class performs the test cases for the response compression"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        token_response = generate_auth_token(CLIENT_ID_VAR, CLIENT_SECRET_VAR)
+        cls._auth_token = token_response.get('access_token', '')
+
+    def setUp(self):
+        self.app = create_app(DevConfig)
+        self.client = self.app.test_client
+        self.headers: dict = {
+            "Authorization": f"Bearer {self._auth_token}"}
+
+    def tearDown(self):
+        """Executed after reach test"""
+        pass
+
+    def add_contacts(self) -> None:
+        # enough contacts for the list to be over COMPRESSION_MIN_SIZE
+        for _ in range(10):
+            self.client().post(
+                '/api/contacts', headers=self.headers, json=GOOD_CONTACT_DATA)
+
+    def get_contacts(self, encoding: str):
+        return self.client().get(
+            '/api/contacts?page_size=100',
+            headers={**self.headers, "Accept-Encoding": encoding})
+
+    # =========================================================================
+    # Compression Tests
+    # =========================================================================
+    def test_compressed_response_success(self):
+        self.add_contacts()
+        response = self.get_contacts('gzip')
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            response.headers.get('Content-Encoding'), 'gzip',
+            msg="The response was not compressed")
+        data = json.loads(gzip.decompress(response.data))
+        self.assertEqual(
+            data['success'], True,
+            msg="The compressed response could not be read")
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_response_success(self):
+        self.add_contacts()
+        response = self.get_contacts('gzip, br')
+
+        self.assertEqual(
+            response.headers.get('Content-Encoding'), 'br',
+            msg="The response was not compressed with brotli")
+        data = json.loads(brotli.decompress(response.data))
+        self.assertEqual(
+            data['success'], True,
+            msg="The compressed response could not be read")
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd_response_success(self):
+        self.add_contacts()
+        response = self.get_contacts('gzip, br, zstd')
+
+        self.assertEqual(
+            response.headers.get('Content-Encoding'), 'zstd',
+            msg="The response was not compressed with zstd")
+        # the streaming compressor does not record the content size
+        data = json.loads(
+            zstandard.ZstdDecompressor().decompressobj().decompress(
+                response.data))
+        self.assertEqual(
+            data['success'], True,
+            msg="The compressed response could not be read")
+
+    def test_compressed_stream_success(self):
+        response = self.client().post(
+            '/api/contacts/import?chunk_size=1&progress=1',
+            headers={**self.headers, "Content-Type": "text/csv",
+                     "Accept-Encoding": "gzip"},
+            data=(b"name,email_address,mobile_phone,contact_type\n"
+                  b"Will Power,wpower@company.com.au,0412987654,other\n"
+                  b"Jane Doe,jdoe@company.com.au,0412123123,consultant\n"))
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            response.headers.get('Content-Encoding'), 'gzip',
+            msg="The streamed response was not compressed")
+        lines = [json.loads(line) for line in
+                 gzip.decompress(response.data).splitlines()]
+        self.assertEqual(
+            (len(lines), lines[-1]['success'], lines[-1]['imported']),
+            (3, True, 2),
+            msg="The compressed stream could not be read")
+
+    def test_get_metrics_success(self):
+        response = self.client().get('/api/metrics', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertIn(
+            'compression', data,
+            msg="The response does not contain the compression metrics")
+
+    def test_get_metrics_fail(self):
+        # fail - the metrics need the read:metrics permission
+        response = self.client().get('/api/metrics')
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 401,
+            msg="The Reponse Code was not 401")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
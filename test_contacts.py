@@ -1,10 +1,14 @@
+import io
 import os
 import unittest
 import json
+from unittest import mock
 from werkzeug.test import TestResponse
+import api.reference
 from api.api import create_app
 from config import DevConfig
-from test_utilities import generate_auth_token, GOOD_CONTACT_DATA
+from test_utilities import (generate_auth_token, count_statements,
+                            record_statements, GOOD_CONTACT_DATA)
 
 CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
 CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
@@ -56,6 +60,20 @@ class ContactTestSuite(unittest.TestCase):
         self.assertIn(
             'data', data, msg="The reponse did not contain the contact data")
 
+    def test_add_contact_statements(self):
+        with record_statements(self.app) as statements:
+            response = self.add_contact(GOOD_CONTACT_DATA)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'INSERT'), 1,
+            msg="The contact was not saved with a single INSERT")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0,
+            msg="The saved contact was selected again")
+
     def test_add_contact_fail(self):
         # fails - no contact type
         contact_data = {
@@ -128,6 +146,9 @@ class ContactTestSuite(unittest.TestCase):
         self.assertIn(
             'data', data,
             msg="The reponse did not contain the contact data")
+        self.assertIsNotNone(
+            response.last_modified,
+            msg="The response did not carry Last-Modified")
 
     def test_get_contact_fail(self):
         test_name = "Test: Get Contact fail"
@@ -142,6 +163,83 @@ class ContactTestSuite(unittest.TestCase):
             data['success'], False,
             msg=f"{test_name} - The response did not report as failed")
 
+    def test_get_contact_list_search_success(self):
+        # the search ignores case as the database ILIKE did
+        self.add_contact(GOOD_CONTACT_DATA)
+        search = GOOD_CONTACT_DATA['name'].upper()
+        response = self.client().get(
+            f'/api/contacts?search={search}', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Status Code was not 200")
+        self.assertTrue(
+            data['data'],
+            msg="The search did not find the contact")
+        self.assertTrue(
+            all(search.lower() in contact['name'].lower()
+                for contact in data['data']),
+            msg="The search returned a contact that does not match")
+
+    def test_get_contact_list_search_fail(self):
+        response = self.client().get(
+            '/api/contacts?search=no-such-contact-name', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="Status Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_contact_cache_snapshot(self):
+        contact_cache = self.app.extensions['contact_cache']
+
+        with self.app.test_request_context():
+            snapshot = contact_cache.refresh()
+            rows = list(snapshot.rows)
+
+        contact = json.loads(self.add_contact(GOOD_CONTACT_DATA).data)
+        contact_id = contact['data']['id']
+
+        with self.app.test_request_context():
+            self.assertIsNotNone(
+                contact_cache.refresh().get(contact_id),
+                msg="The cache was not reloaded after the write")
+
+        # a reader holding the old snapshot never sees the reload
+        self.assertIsNot(
+            contact_cache.snapshot, snapshot,
+            msg="The reload did not replace the snapshot")
+        self.assertEqual(
+            snapshot.rows, rows,
+            msg="The old snapshot was changed by the reload")
+        self.assertNotIn(
+            contact_id, snapshot.by_id,
+            msg="The old snapshot was changed by the reload")
+
+    def test_contact_cache_checked_once(self):
+        for _ in range(3):
+            self.add_contact(GOOD_CONTACT_DATA)
+        self.client().get('/api/contacts', headers=self.headers)
+
+        # the page is formatted from one snapshot
+        with mock.patch('api.reference.get_generations',
+                        wraps=api.reference.get_generations) as generations:
+            response = self.client().get(
+                '/api/contacts?page_size=100', headers=self.headers)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Status Code was not 200")
+        self.assertEqual(
+            generations.call_count, 1,
+            msg="The cache was checked for each contact")
+
     def test_update_contact_success(self):
 
         # Create the contact to be updated
@@ -245,6 +343,95 @@ class ContactTestSuite(unittest.TestCase):
             data['success'], False,
             msg="the response did not report as failed")
 
+    def test_import_contacts_success(self):
+        csv_data = (
+            "name,email_address,mobile_phone,contact_type\n"
+            "Will Power,wpower@company.com.au,0412987654,other\n"
+            "Jane Doe,jdoe@company.com.au,0412123123,consultant\n"
+            "No Type,ntype@company.com.au,0412000000,\n")
+
+        response = self.client().post(
+            '/api/contacts/import?chunk_size=2',
+            headers=self.headers,
+            data={'file': (io.BytesIO(csv_data.encode()), 'contacts.csv')})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Status Code was not 200")
+        self.assertEqual(
+            data['imported'], 2,
+            msg="The valid rows were not imported")
+        self.assertEqual(
+            data['failed'], 1,
+            msg="The invalid row was not reported")
+        self.assertEqual(
+            len(data['chunks']), 2,
+            msg="The rows were not processed in chunks")
+
+    def test_import_contacts_progress_success(self):
+        csv_data = (
+            "name,email_address,mobile_phone,contact_type\n"
+            "Will Power,wpower@company.com.au,0412987654,other\n"
+            "No Type,ntype@company.com.au,0412000000,\n"
+            "Jane Doe,jdoe@company.com.au,0412123123,consultant\n")
+
+        response = self.client().post(
+            '/api/contacts/import?chunk_size=2&progress=1',
+            headers={**self.headers, "Content-Type": "text/csv"},
+            data=csv_data.encode())
+
+        # a line for each chunk and then the totals
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Status Code was not 200")
+        self.assertEqual(
+            response.mimetype, 'application/x-ndjson',
+            msg="The progress was not streamed")
+        self.assertEqual(
+            [(line['chunk'], line['imported']) for line in lines[:-1]],
+            [(1, 1), (2, 1)],
+            msg="The progress of each chunk was not reported")
+        self.assertEqual(
+            [error['line'] for error in lines[0]['errors']], [3],
+            msg="The invalid row was not reported with its chunk")
+        self.assertEqual(
+            (lines[-1]['success'], lines[-1]['imported'], lines[-1]['failed']),
+            (True, 2, 1),
+            msg="The import totals were not reported")
+
+    def test_import_contacts_progress_fail(self):
+        response = self.client().post(
+            '/api/contacts/import?progress=2',
+            headers={**self.headers, "Content-Type": "text/csv"},
+            data=b"name\nWill Power\n")
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="Status Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="the response did not report as failed")
+
+    def test_import_contacts_fail(self):
+        response = self.client().post(
+            '/api/contacts/import',
+            headers=self.headers,
+            json=GOOD_CONTACT_DATA)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="Status Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="the response did not report as failed")
+
     
 # Make the tests conveniently executable
 if __name__ == "__main__":
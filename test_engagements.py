@@ -0,0 +1,132 @@
+import unittest
+import json
+import uuid
+from werkzeug.test import TestResponse
+from api import create_app
+from config import DevConfig
+from test_utilities import (generate_auth_token, create_report,
+                            GOOD_REPORT_ITEM_DATA)
+
+CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
+CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
+
+
+class EngagementTestSuite(unittest.TestCase):
+    """This class performs the test cases for the engagement rollups"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        token_response = generate_auth_token(CLIENT_ID_VAR, CLIENT_SECRET_VAR)
+        cls._auth_token = token_response.get('access_token', '')
+
+    def setUp(self):
+        self.app = create_app(DevConfig)
+        self.client = self.app.test_client
+        self.headers: dict = {
+            "Authorization": f"Bearer {self._auth_token}"}
+
+        # two clients sharing an engagement reference
+        self.reference = f'EN{uuid.uuid4().hex[:8]}'
+        self.reports = [
+            create_report(self.client, self.headers,
+                          {"engagement_reference": self.reference},
+                          [GOOD_REPORT_ITEM_DATA]),
+            create_report(self.client, self.headers,
+                          {"engagement_reference": self.reference,
+                           "report_date": "2021-08-09"})]
+
+    def tearDown(self):
+        """Executed after reach test"""
+        pass
+
+    def get_engagement(self, query_string='') -> TestResponse:
+        return self.client().get(
+            f'/api/engagements/{self.reference}{query_string}',
+            headers=self.headers)
+
+    # =========================================================================
+    # Engagement Tests
+    # =========================================================================
+    def test_get_engagement_list_success(self):
+        client_id = self.reports[0]['client_id']
+        response = self.client().get(
+            f'/api/engagements?client_id={client_id}', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        engagement = [engagement for engagement in data['data']
+                      if engagement['engagement_reference'] ==
+                      self.reference][0]
+        self.assertEqual(
+            engagement['report_count'], 1,
+            msg="The engagement of the client was not counted")
+        self.assertEqual(
+            engagement['item_counts']['issue_identified'], 1,
+            msg="The report items were not counted")
+
+    def test_get_engagement_list_fail(self):
+        response = self.client().get(
+            '/api/engagements?page=1000', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_engagement_success(self):
+        response = self.get_engagement()
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['data']['client_ids'],
+            sorted(report['client_id'] for report in self.reports),
+            msg="The clients of the engagement were not all returned")
+        self.assertEqual(
+            data['data']['report_count'], 2,
+            msg="The reports of the engagement were not all returned")
+        self.assertEqual(
+            data['data']['last_report_date'], "2021-08-09",
+            msg="The reports were not in date order")
+
+    def test_get_engagement_client_success(self):
+        client_id = self.reports[1]['client_id']
+        response = self.get_engagement(f'?client_id={client_id}')
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            data['data']['client_ids'], [client_id],
+            msg="The engagement was not limited to the client")
+        self.assertEqual(
+            [report['id'] for report in data['data']['reports']],
+            [self.reports[1]['id']],
+            msg="A report of another client was returned")
+
+    def test_get_engagement_fail(self):
+        response = self.client().get(
+            '/api/engagements/NO-SUCH-ENGAGEMENT', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
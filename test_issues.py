@@ -0,0 +1,171 @@
+import unittest
+import json
+from werkzeug.test import TestResponse
+from api import create_app
+from config import DevConfig
+from test_utilities import (generate_auth_token, create_report,
+                            GOOD_REPORT_ITEM_DATA)
+
+CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
+CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
+
+# an issue saved without a status
+NO_STATUS_ITEM_DATA = {key: value for key, value
+                       in GOOD_REPORT_ITEM_DATA.items()
+                       if key != 'issue_status'}
+
+
+class IssueTestSuite(unittest.TestCase):
+    """This class performs the test cases for the issue feed and rollup"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        token_response = generate_auth_token(CLIENT_ID_VAR, CLIENT_SECRET_VAR)
+        cls._auth_token = token_response.get('access_token', '')
+
+    def setUp(self):
+        self.app = create_app(DevConfig)
+        self.client = self.app.test_client
+        self.headers: dict = {
+            "Authorization": f"Bearer {self._auth_token}"}
+        self.report = create_report(
+            self.client, self.headers,
+            items=[NO_STATUS_ITEM_DATA,
+                   {**GOOD_REPORT_ITEM_DATA, "issue_status": "blocked"},
+                   {**GOOD_REPORT_ITEM_DATA, "issue_status": "resolved"}])
+
+    def tearDown(self):
+        """Executed after reach test"""
+        pass
+
+    def get_issues(self, query_string='') -> TestResponse:
+        return self.client().get(
+            f"/api/issues?client_id={self.report['client_id']}"
+            f"{query_string}",
+            headers=self.headers)
+
+    def get_issue_summary(self) -> TestResponse:
+        return self.client().get(
+            f"/api/issues/summary?client_id={self.report['client_id']}",
+            headers=self.headers)
+
+    # =========================================================================
+    # Issue Tests
+    # =========================================================================
+    def test_get_issues_success(self):
+        response = self.get_issues()
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            sorted(issue['issue_status'] for issue in data['data']),
+            ['blocked', 'open'],
+            msg="The open issues were not returned")
+
+    def test_get_issues_status_success(self):
+        response = self.get_issues('&issue_status=open')
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            [issue['issue_status'] for issue in data['data']], ['open'],
+            msg="The issue without a status was not returned as open")
+
+    def test_get_issues_fail(self):
+        # fail - resolved issues are not in the feed
+        response = self.get_issues('&issue_status=resolved')
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_issues_pages_success(self):
+        # the two open issues are read a page at a time
+        response = self.get_issues('&page_size=1')
+        first_page = json.loads(response.data)
+        self.assertIsNotNone(
+            first_page['next_cursor'],
+            msg="The first page has no cursor to the next page")
+
+        response = self.get_issues(
+            f"&page_size=1&cursor={first_page['next_cursor']}")
+        second_page = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertIsNone(
+            second_page['next_cursor'],
+            msg="The last page has a cursor to another page")
+        self.assertEqual(
+            sorted(issue['report_item_nbr'] for issue in
+                   first_page['data'] + second_page['data']),
+            [1, 2],
+            msg="The pages did not hold each open issue once")
+
+    def test_get_issues_pages_fail(self):
+        for query_string in ['&cursor=not-a-cursor', '&page_size=0']:
+            response = self.get_issues(query_string)
+
+            # get the response body
+            data = json.loads(response.data)
+            self.assertEqual(
+                response.status_code, 400,
+                msg=f"The Reponse Code was not 400 for {query_string}")
+            self.assertEqual(
+                data['success'], False,
+                msg="The response did not report as failed")
+
+    def test_get_issue_summary_success(self):
+        response = self.get_issue_summary()
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            {count['issue_status']: count['issue_count']
+             for count in data['data']},
+            {'open': 1, 'blocked': 1, 'resolved': 1},
+            msg="The issue without a status was not counted as open")
+
+    def test_get_issue_summary_after_write(self):
+        self.get_issue_summary()
+        self.client().post(
+            f"/api/reports/{self.report['id']}/items",
+            headers=self.headers,
+            json={**GOOD_REPORT_ITEM_DATA, "issue_status": "blocked"})
+
+        # get the response body
+        data = json.loads(self.get_issue_summary().data)
+        self.assertEqual(
+            {count['issue_status']: count['issue_count']
+             for count in data['data']},
+            {'open': 1, 'blocked': 2, 'resolved': 1},
+            msg="The summary did not count the new issue")
+
+    def test_get_issue_summary_fail(self):
+        response = self.client().get(
+            '/api/issues/summary?issue_status=closed', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
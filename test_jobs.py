@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+import unittest
+import json
+from werkzeug.test import TestResponse
+from api import create_app
+from api.jobs import claim_job, recover_stale_jobs, restart_workers, work
+from api.models import Job, db
+from config import DevConfig
+from test_utilities import generate_auth_token, GOOD_CLIENT_DATA
+
+CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
+CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
+
+
+class FakeWorker:
+    def __init__(self, alive: bool) -> None:
+        self.alive = alive
+        self.pid = 1
+        self.exitcode = None if alive else 1
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+class JobTestSuite(unittest.TestCase):
+    """This class performs the test cases for the background jobs"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        token_response = generate_auth_token(CLIENT_ID_VAR, CLIENT_SECRET_VAR)
+        cls._auth_token = token_response.get('access_token', '')
+
+    def setUp(self):
+        self.app = create_app(DevConfig)
+        self.client = self.app.test_client
+        self.headers: dict = {
+            "Authorization": f"Bearer {self._auth_token}"}
+
+    def tearDown(self):
+        """Executed after reach test"""
+        pass
+
+    def get_job(self, job_id) -> TestResponse:
+        return self.client().get(
+            f'/api/jobs/{job_id}', headers=self.headers)
+
+    def add_stale_job(self, attempts: int) -> int:
+        # a running job whose worker stopped an hour ago
+        stopped = datetime.utcnow() - timedelta(hours=1)
+        with self.app.app_context():
+            job = Job(job_type='purge_client', permission='delete:clients',
+                      params={'client_id': 99999}, status='running',
+                      started_at=stopped, heartbeat_at=stopped,
+                      attempts=attempts)
+            db.session.add(job)
+            db.session.commit()
+            return job.id
+
+    # =========================================================================
+    # Job Tests
+    # =========================================================================
+    def test_purge_client_job_success(self):
+        response = self.client().post(
+            '/api/clients', headers=self.headers, json=GOOD_CLIENT_DATA)
+        client_id = json.loads(response.data)['data']['id']
+
+        response = self.client().delete(
+            f'/api/clients/{client_id}?async=1', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 202,
+            msg="The Reponse Code was not 202")
+        job_id = data['job_id']
+
+        # older queued jobs are run first
+        for _ in range(100):
+            if not work(self.app, max_jobs=1):
+                break
+            job = json.loads(self.get_job(job_id).data)['data']
+            if job['status'] not in ['queued', 'running']:
+                break
+
+        response = self.client().get(
+            f'/api/jobs/{job_id}/result', headers=self.headers)
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['result'], {'client_id': client_id, 'deleted': True},
+            msg="The job did not purge the client")
+
+        response = self.client().get(
+            f'/api/clients/{client_id}', headers=self.headers)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The purged client was found")
+
+    def test_get_job_fail(self):
+        response = self.get_job(99999)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_recover_stale_job_requeued(self):
+        job_id = self.add_stale_job(attempts=1)
+
+        with self.app.app_context():
+            recovered = recover_stale_jobs(stale_after=60, max_attempts=3)
+            job = Job.query.get(job_id)
+            self.assertGreaterEqual(
+                recovered, 1,
+                msg="The stale job was not recovered")
+            self.assertEqual(
+                job.status, 'queued',
+                msg="The stale job was not queued again")
+
+    def test_recover_stale_job_failed(self):
+        job_id = self.add_stale_job(attempts=3)
+
+        with self.app.app_context():
+            recover_stale_jobs(stale_after=60, max_attempts=3)
+            job = Job.query.get(job_id)
+            self.assertEqual(
+                job.status, 'failed',
+                msg="The job was not failed after the last attempt")
+            self.assertIsNotNone(
+                job.error,
+                msg="The failed job has no error")
+
+    def test_recover_running_job_kept(self):
+        job_id = self.add_stale_job(attempts=1)
+
+        with self.app.app_context():
+            # the heartbeat is recent, the job is left to its worker
+            job = Job.query.get(job_id)
+            job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+
+            recover_stale_jobs(stale_after=60, max_attempts=3)
+            job = Job.query.get(job_id)
+            self.assertEqual(
+                job.status, 'running',
+                msg="A job with a recent heartbeat was recovered")
+
+            # stop the job being recovered by a later test
+            job.status = 'failed'
+            db.session.commit()
+
+    def test_claim_job_attempts(self):
+        job_id = self.add_stale_job(attempts=1)
+
+        with self.app.app_context():
+            recover_stale_jobs(stale_after=60, max_attempts=3)
+
+            # claim the queued jobs until the recovered job is reached
+            job = claim_job()
+            while job is not None and job.id != job_id:
+                job = claim_job()
+
+            self.assertIsNotNone(
+                job,
+                msg="The recovered job was not claimed")
+            self.assertEqual(
+                job.attempts, 2,
+                msg="The claim was not counted as an attempt")
+
+            job.status = 'failed'
+            db.session.commit()
+
+    def test_restart_workers(self):
+        workers = [FakeWorker(True), FakeWorker(False)]
+
+        restarted = restart_workers(workers, lambda: FakeWorker(True))
+
+        self.assertEqual(
+            restarted, 1,
+            msg="The dead worker was not restarted")
+        self.assertTrue(
+            all(worker.is_alive() for worker in workers),
+            msg="A dead worker was kept")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
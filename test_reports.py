@@ -0,0 +1,937 @@
+from datetime import datetime, timedelta
+import os
+import tempfile
+import unittest
+import json
+from werkzeug.test import TestResponse
+from api import create_app
+from api.models import db
+from api.render import ReportRenderer
+from config import DevConfig
+from test_utilities import (generate_auth_token, count_statements,
+                            create_report, record_statements,
+                            GOOD_CONTACT_DATA, GOOD_REPORT_DATA,
+                            GOOD_REPORT_ITEM_DATA)
+
+CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
+CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
+
+
+class ReportTestSuite(unittest.TestCase):
+    """This class performs the test cases for the reports and report items"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        token_response = generate_auth_token(CLIENT_ID_VAR, CLIENT_SECRET_VAR)
+        cls._auth_token = token_response.get('access_token', '')
+
+    def setUp(self):
+        self.app = create_app(DevConfig)
+        self.client = self.app.test_client
+        self.headers: dict = {
+            "Authorization": f"Bearer {self._auth_token}"}
+        self.report = create_report(self.client, self.headers)
+
+    def tearDown(self):
+        """Executed after reach test"""
+        pass
+
+    def add_report(self, report_data) -> TestResponse:
+        return self.client().post(
+            '/api/reports',
+            headers=self.headers,
+            json=report_data)
+
+    def add_report_item(self, report_id, item_data) -> TestResponse:
+        return self.client().post(
+            f'/api/reports/{report_id}/items',
+            headers=self.headers,
+            json=item_data)
+
+    # =========================================================================
+    # Report Tests
+    # =========================================================================
+    def test_add_report_success(self):
+        report_data = {
+            key: self.report[key] for key in GOOD_REPORT_DATA.keys()}
+
+        response = self.add_report(report_data)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['success'], True,
+            msg="The response did not report as successful")
+        self.assertEqual(
+            data['data']['report_status'], 'new',
+            msg="The saved report is not new")
+
+    def test_add_report_statements(self):
+        report_data = {
+            key: self.report[key] for key in GOOD_REPORT_DATA.keys()}
+
+        with record_statements(self.app) as statements:
+            response = self.add_report(report_data)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'INSERT'), 1,
+            msg="The report was not saved with a single INSERT")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0,
+            msg="The saved report was selected again")
+
+    def test_add_report_fail(self):
+        # fail - the report date is not a date
+        report_data = {
+            key: self.report[key] for key in GOOD_REPORT_DATA.keys()}
+        report_data['report_date'] = "2021-08-32"
+
+        response = self.add_report(report_data)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_add_report_period_fail(self):
+        # fail - the period ends before it starts
+        report_data = {
+            key: self.report[key] for key in GOOD_REPORT_DATA.keys()}
+        report_data['report_to_date'] = "2021-07-01"
+
+        response = self.add_report(report_data)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_update_report_statements(self):
+        with record_statements(self.app) as statements:
+            response = self.client().patch(
+                f"/api/reports/{self.report['id']}",
+                headers=self.headers,
+                json={"report_status": "complete"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['data']['report_status'], 'complete',
+            msg="The updated report was not returned")
+        self.assertEqual(
+            count_statements(statements, 'UPDATE'), 1,
+            msg="The report was not saved with a single UPDATE")
+        # databases without RETURNING read the row back once
+        with self.app.app_context():
+            returning = db.engine.dialect.full_returning
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0 if returning else 1,
+            msg="The report was selected before the update")
+
+    def test_update_report_fail(self):
+        response = self.client().patch(
+            '/api/reports/99999',
+            headers=self.headers,
+            json={"report_status": "complete"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_update_report_item_success(self):
+        item = {**GOOD_REPORT_ITEM_DATA, "issue_status": "open"}
+        self.add_report_item(self.report['id'], item)
+
+        response = self.client().patch(
+            f"/api/reports/{self.report['id']}/items/1",
+            headers=self.headers,
+            json={"issue_status": "resolved"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['data']['issue_status'], 'resolved',
+            msg="The updated report item was not returned")
+
+    def test_update_report_item_fail(self):
+        self.add_report_item(self.report['id'], GOOD_REPORT_ITEM_DATA)
+
+        # fail - the issue status is not valid
+        response = self.client().patch(
+            f"/api/reports/{self.report['id']}/items/1",
+            headers=self.headers,
+            json={"issue_status": "closed"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_update_report_period_fail(self):
+        # fail - the new end date is before the stored start date
+        response = self.client().patch(
+            f"/api/reports/{self.report['id']}",
+            headers=self.headers,
+            json={"report_to_date": "2021-07-01"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_report_list_period_success(self):
+        response = self.client().get(
+            f"/api/reports?client_id={self.report['client_id']}"
+            "&period_from=2021-07-30&period_to=2021-08-05",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertIn(
+            self.report['id'], [report['id'] for report in data['data']],
+            msg="The report covering the period was not returned")
+
+    def test_get_report_list_period_fail(self):
+        # fail - the period ends before it starts
+        response = self.client().get(
+            '/api/reports?period_from=2021-08-05&period_to=2021-07-30',
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_report_list_fields_success(self):
+        # the client include needs client_id but only id is returned
+        response = self.client().get(
+            f"/api/reports?client_id={self.report['client_id']}"
+            "&fields=id&include=client",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertTrue(
+            all(list(report.keys()) == ['id'] for report in data['data']),
+            msg="A field that was not requested was returned")
+        self.assertIn(
+            self.report['client_id'],
+            [client['id'] for client in data['included']['clients']],
+            msg="The client of the report was not included")
+
+    def test_get_report_list_fields_fail(self):
+        # fail - the field is not a report column
+        response = self.client().get(
+            '/api/reports?fields=id,client_name&include=client',
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_report_fields_success(self):
+        response = self.client().get(
+            f"/api/reports/{self.report['id']}?fields=id,report_date"
+            "&include=client,consultant",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            sorted(data['data'].keys()), ['id', 'report_date'],
+            msg="A field that was not requested was returned")
+        self.assertEqual(
+            [client['id'] for client in data['included']['clients']],
+            [self.report['client_id']],
+            msg="The client of the report was not included")
+
+    def test_get_report_includes_success(self):
+        self.add_report_item(self.report['id'], GOOD_REPORT_ITEM_DATA)
+
+        with record_statements(self.app) as statements:
+            response = self.client().get(
+                f"/api/reports?client_id={self.report['client_id']}"
+                "&include=client,client_contact,consultant,client_manager,"
+                "items",
+                headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        included = data['included']
+        self.assertEqual(
+            [client['id'] for client in included['clients']],
+            [self.report['client_id']],
+            msg="The client was not included")
+        self.assertEqual(
+            [contact['id'] for contact in included['client_contacts']],
+            [self.report['client_contact_id']],
+            msg="The client contact was not included")
+        self.assertEqual(
+            sorted(contact['id'] for contact in included['contacts']),
+            sorted([self.report['consulant_id'],
+                    self.report['client_manager_id']]),
+            msg="The consultant and client manager were not included")
+        self.assertEqual(
+            [item['report_id'] for item in included['report_items']],
+            [self.report['id']],
+            msg="The report items were not included")
+        # the contacts come from the reference data cache
+        self.assertLessEqual(
+            count_statements(statements, 'SELECT'), 6,
+            msg="The includes were not loaded with one query each")
+
+    def test_get_report_includes_fail(self):
+        # fail - the include is not a related resource of a report
+        response = self.client().get(
+            f"/api/reports/{self.report['id']}?include=client,invoices",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_report_overlaps_success(self):
+        # a second report of the same consultant overlapping the first
+        report_data = {
+            key: self.report[key] for key in GOOD_REPORT_DATA.keys()}
+        report_data['report_from_date'] = "2021-07-31"
+        report_data['report_to_date'] = "2021-08-06"
+        overlap = json.loads(self.add_report(report_data).data)['data']
+
+        response = self.client().get(
+            f"/api/reports/{self.report['id']}/overlaps",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            [report['id'] for report in data['data']], [overlap['id']],
+            msg="The overlapping report was not returned")
+
+    def test_get_report_overlaps_fail(self):
+        response = self.client().get(
+            '/api/reports/99999/overlaps',
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def get_report(self, headers=None) -> TestResponse:
+        return self.client().get(
+            f"/api/reports/{self.report['id']}",
+            headers={**self.headers, **(headers or {})})
+
+    def test_get_report_statements(self):
+        # without If-None-Match the version query is skipped
+        with record_statements(self.app) as statements:
+            response = self.get_report()
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 1,
+            msg="The report was read with more than one query")
+        self.assertIsNotNone(
+            response.get_etag()[0],
+            msg="The response did not carry an ETag")
+
+    def test_get_report_not_modified(self):
+        # a request with If-None-Match is answered with the version tag
+        response = self.get_report({'If-None-Match': '"stale"'})
+        etag = response.headers['ETag']
+
+        with record_statements(self.app) as statements:
+            response = self.get_report({'If-None-Match': etag})
+
+        self.assertEqual(
+            response.status_code, 304,
+            msg="The Reponse Code was not 304")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 1,
+            msg="The 304 was not answered from the version query")
+
+    def test_get_report_modified(self):
+        response = self.get_report({'If-None-Match': '"stale"'})
+        etag = response.headers['ETag']
+
+        self.client().patch(
+            f"/api/reports/{self.report['id']}",
+            headers=self.headers,
+            json={"report_status": "complete"})
+        response = self.get_report({'If-None-Match': etag})
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertNotEqual(
+            response.headers['ETag'], etag,
+            msg="The ETag did not change with the report")
+
+    def test_get_report_last_modified(self):
+        # updated_at is in UTC whichever clock wrote it
+        response = self.get_report({'If-None-Match': '"stale"'})
+        last_modified = response.last_modified.replace(tzinfo=None)
+
+        self.assertLess(
+            abs(datetime.utcnow() - last_modified), timedelta(minutes=5),
+            msg="Last-Modified is not the time of the write in UTC")
+
+    def test_get_report_last_modified_without_etag(self):
+        # a plain GET takes Last-Modified from the report it loaded
+        response = self.get_report()
+        last_modified = response.last_modified
+
+        self.assertIsNotNone(
+            last_modified,
+            msg="The response did not carry Last-Modified")
+        self.assertLess(
+            abs(datetime.utcnow() - last_modified.replace(tzinfo=None)),
+            timedelta(minutes=5),
+            msg="Last-Modified is not the time of the write in UTC")
+
+    # =========================================================================
+    # Report Item Tests
+    # =========================================================================
+    def test_add_report_item_statements(self):
+        with record_statements(self.app) as statements:
+            response = self.add_report_item(
+                self.report['id'], GOOD_REPORT_ITEM_DATA)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'INSERT'), 1,
+            msg="The report item was not saved with a single INSERT")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0,
+            msg="The item number was selected before the INSERT")
+
+    def test_add_report_item_numbers(self):
+        self.add_report_item(self.report['id'], GOOD_REPORT_ITEM_DATA)
+        self.add_report_item(self.report['id'], GOOD_REPORT_ITEM_DATA)
+
+        response = self.client().get(
+            f"/api/reports/{self.report['id']}/items",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            sorted(item['report_item_nbr'] for item in data['data']), [1, 2],
+            msg="The report items were not numbered in order")
+
+    def test_add_report_item_fail(self):
+        # fail - the report does not exist
+        response = self.add_report_item(99999, GOOD_REPORT_ITEM_DATA)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    # =========================================================================
+    # Report Item Search Tests
+    # =========================================================================
+    def carry_forward(self, report_id, report_data) -> TestResponse:
+        return self.client().post(
+            f'/api/reports/{report_id}/carry-forward',
+            headers=self.headers,
+            json=report_data)
+
+    def test_carry_forward_report_success(self):
+        items = [
+            {**GOOD_REPORT_ITEM_DATA, "item_type": "follow_up_task",
+             "item_description": "Open task"},
+            {**GOOD_REPORT_ITEM_DATA, "item_type": "follow_up_task",
+             "item_description": "Complete task", "item_complete": True},
+            {key: value for key, value in GOOD_REPORT_ITEM_DATA.items()
+             if key != 'issue_status'},
+            {**GOOD_REPORT_ITEM_DATA, "issue_status": "resolved"}]
+        for item in items:
+            self.add_report_item(self.report['id'], item)
+
+        response = self.carry_forward(self.report['id'], {
+            "report_date": "2021-08-09", "report_from_date": "2021-08-02",
+            "report_to_date": "2021-08-08"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['data']['engagement_reference'],
+            self.report['engagement_reference'],
+            msg="The engagement was not carried forward")
+
+        response = self.client().get(
+            f"/api/reports/{data['data']['id']}/items", headers=self.headers)
+        carried = json.loads(response.data)['data']
+        self.assertEqual(
+            [(item['report_item_nbr'], item['item_description'],
+              item['issue_status'], item['item_complete'])
+             for item in carried],
+            [(1, "Open task", "open", False),
+             (2, GOOD_REPORT_ITEM_DATA['item_description'], None, False)],
+            msg="The open task and the issue without a status were not "
+                "the items carried forward")
+
+    def test_carry_forward_report_client_ignored(self):
+        # the body can not move the open items to another client's report
+        other_report = create_report(self.client, self.headers)
+        response = self.carry_forward(self.report['id'], {
+            "report_date": "2021-08-09", "report_from_date": "2021-08-02",
+            "client_id": other_report['client_id'],
+            "consulant_id": other_report['consulant_id'],
+            "engagement_reference": "OTHER"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            (data['data']['client_id'], data['data']['consulant_id'],
+             data['data']['engagement_reference']),
+            (self.report['client_id'], self.report['consulant_id'],
+             self.report['engagement_reference']),
+            msg="The report was not kept with the previous report's client")
+
+    def test_carry_forward_report_fail(self):
+        # fail - the report date is missing
+        response = self.carry_forward(self.report['id'], {
+            "report_from_date": "2021-08-02"})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+        response = self.carry_forward(99999, {
+            "report_date": "2021-08-09", "report_from_date": "2021-08-02"})
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+
+    def test_delete_report_statements(self):
+        self.add_report_item(self.report['id'], GOOD_REPORT_ITEM_DATA)
+
+        with record_statements(self.app) as statements:
+            response = self.client().delete(
+                f"/api/reports/{self.report['id']}", headers=self.headers)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            count_statements(statements, 'DELETE'), 2,
+            msg="The report and its items were not deleted with a "
+                "statement each")
+        self.assertEqual(
+            count_statements(statements, 'SELECT'), 0,
+            msg="The report was selected before the delete")
+
+        response = self.client().get(
+            f"/api/reports/{self.report['id']}", headers=self.headers)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The deleted report was found")
+
+    def test_delete_report_fail(self):
+        response = self.client().delete(
+            '/api/reports/99999', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_delete_report_item_success(self):
+        self.add_report_item(self.report['id'], GOOD_REPORT_ITEM_DATA)
+
+        response = self.client().delete(
+            f"/api/reports/{self.report['id']}/items/1",
+            headers=self.headers)
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+
+        response = self.client().get(
+            f"/api/reports/{self.report['id']}/items/1",
+            headers=self.headers)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The deleted report item was found")
+
+    def test_delete_report_item_fail(self):
+        response = self.client().delete(
+            f"/api/reports/{self.report['id']}/items/99",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_report_summary_success(self):
+        response = self.client().get(
+            f"/api/reports/summary?client_id={self.report['client_id']}"
+            "&group_by=client&period=month",
+            headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['data'], [{
+                'client_id': self.report['client_id'],
+                'period': '2021-08-01',
+                'report_status': 'new',
+                'report_count': 1}],
+            msg="The report was not counted in its client and month")
+        self.assertEqual(
+            data['total'], 1,
+            msg="The total does not match the counts")
+
+    def test_get_report_summary_fail(self):
+        for query_string in ['group_by=engagement', 'period=year',
+                             'from_date=not-a-date', 'to_date=2021-13-01']:
+            response = self.client().get(
+                f'/api/reports/summary?{query_string}', headers=self.headers)
+
+            # get the response body
+            data = json.loads(response.data)
+            self.assertEqual(
+                response.status_code, 400,
+                msg=f"The Reponse Code was not 400 for {query_string}")
+            self.assertEqual(
+                data['success'], False,
+                msg="The response did not report as failed")
+
+    def get_workload(self, query_string='') -> TestResponse:
+        return self.client().get(
+            f"/api/reports/workload?consultant_id="
+            f"{self.report['consulant_id']}&from_date=2021-01-01"
+            f"{query_string}",
+            headers=self.headers)
+
+    def test_get_workload_success(self):
+        for item in [
+                {**GOOD_REPORT_ITEM_DATA, "item_type": "requested_task"},
+                {**GOOD_REPORT_ITEM_DATA, "item_type": "follow_up_task",
+                 "item_complete": True},
+                GOOD_REPORT_ITEM_DATA]:
+            self.add_report_item(self.report['id'], item)
+
+        response = self.get_workload()
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            [(workload['consultant_id'], workload['open_tasks'],
+              workload['reports']) for workload in data['data']],
+            [(self.report['consulant_id'], 1, 1)],
+            msg="Only the incomplete task was not counted")
+        self.assertEqual(
+            data['data'][0]['name'], GOOD_CONTACT_DATA['name'],
+            msg="The consultant name was not returned")
+
+    def test_get_workload_fail(self):
+        # a consultant without open tasks has no workload
+        self.add_report_item(self.report['id'], {
+            **GOOD_REPORT_ITEM_DATA, "item_type": "requested_task",
+            "item_complete": True})
+
+        response = self.get_workload()
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            data['data'], [],
+            msg="A consultant without open tasks was returned")
+
+        # fail - the period ends before it starts
+        response = self.get_workload(
+            '&period_from=2021-08-05&period_to=2021-07-30')
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+
+    def test_get_latest_reports_success(self):
+        # a later report of the same client and engagement
+        report_data = {
+            key: self.report[key] for key in GOOD_REPORT_DATA.keys()}
+        report_data.update({"report_date": "2021-08-09",
+                            "report_from_date": "2021-08-02",
+                            "report_to_date": "2021-08-08"})
+        latest = json.loads(self.add_report(report_data).data)['data']
+
+        for group in ['client', 'engagement']:
+            response = self.client().get(
+                f"/api/reports/latest?group_by={group}"
+                f"&client_id={self.report['client_id']}",
+                headers=self.headers)
+
+            # get the response body
+            data = json.loads(response.data)
+            self.assertEqual(
+                response.status_code, 200,
+                msg="The Reponse Code was not 200")
+            self.assertEqual(
+                [report['id'] for report in data['data']], [latest['id']],
+                msg=f"The latest report of the {group} was not returned")
+
+    def test_get_latest_reports_fail(self):
+        # fail - reports can not be grouped by consultant
+        response = self.client().get(
+            '/api/reports/latest?group_by=consultant', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+        response = self.client().get(
+            '/api/reports/latest?client_id=99999', headers=self.headers)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+
+    def search_items(self, query_string) -> TestResponse:
+        return self.client().get(
+            f'/api/reports/items/search?{query_string}',
+            headers=self.headers)
+
+    def test_search_items_success(self):
+        self.add_report_item(self.report['id'], {
+            **GOOD_REPORT_ITEM_DATA,
+            "item_description": "Offsite <b>backups</b> & restores"})
+
+        response = self.search_items(
+            f"q=offsite&client_id={self.report['client_id']}")
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            len(data['data']), 1,
+            msg="The matching item was not returned")
+        snippet = data['data'][0]['snippet']
+        self.assertIn(
+            '<mark>Offsite</mark>', snippet,
+            msg="The matched word was not marked")
+        self.assertNotIn(
+            '<b>', snippet,
+            msg="The item text was not escaped in the snippet")
+        self.assertIn(
+            '&lt;b&gt;', snippet,
+            msg="The item text was not escaped in the snippet")
+
+    def test_search_items_pages(self):
+        for sequence_nbr in range(3):
+            self.add_report_item(self.report['id'], {
+                **GOOD_REPORT_ITEM_DATA,
+                "item_description": f"Paged search item {sequence_nbr}"})
+
+        query_string = f"q=paged&client_id={self.report['client_id']}" \
+            "&page_size=2"
+        first_page = json.loads(self.search_items(query_string).data)
+        last_page = json.loads(
+            self.search_items(f'{query_string}&page=2').data)
+
+        self.assertEqual(
+            first_page['next_page'], 2,
+            msg="The first page did not point to the next page")
+        self.assertIsNone(
+            last_page['next_page'],
+            msg="The last page pointed to a next page")
+        self.assertEqual(
+            len(first_page['data']) + len(last_page['data']), 3,
+            msg="The pages did not return every matching item")
+
+    def test_search_items_fail(self):
+        # fail - the page number is not valid
+        response = self.search_items('q=backups&page=0')
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    # =========================================================================
+    # Report Render Tests
+    # =========================================================================
+    def render_report(self, query_string, headers=None) -> TestResponse:
+        return self.client().get(
+            f"/api/reports/{self.report['id']}/render?{query_string}",
+            headers={**self.headers, **(headers or {})})
+
+    def test_render_report_success(self):
+        response = self.render_report('format=pdf')
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            response.mimetype, 'application/pdf',
+            msg="The report was not rendered as a PDF")
+        self.assertTrue(
+            response.data.startswith(b'%PDF'),
+            msg="The response is not a PDF document")
+        self.assertIsNotNone(
+            response.get_etag()[0],
+            msg="The response did not carry an ETag")
+
+    def test_render_report_not_modified(self):
+        # the tag of a compressed response has the encoding appended
+        response = self.render_report(
+            'format=html', {'Accept-Encoding': 'gzip'})
+        etag = response.headers['ETag']
+
+        response = self.render_report(
+            'format=html',
+            {'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+        self.assertEqual(
+            response.status_code, 304,
+            msg="The Reponse Code was not 304")
+        self.assertEqual(
+            response.headers['ETag'], etag,
+            msg="The 304 did not repeat the tag of the client's copy")
+
+    def test_render_report_fail(self):
+        # fail - the format is not supported
+        response = self.render_report('format=docx')
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_render_cache_prune(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            renderer = ReportRenderer(cache_dir, max_bytes=10)
+            old_path = renderer.cache_path('old', 'pdf')
+            new_path = renderer.cache_path('new', 'pdf')
+
+            renderer.write_cache(old_path, b'123456')
+            os.utime(old_path, (0, 0))
+            renderer.write_cache(new_path, b'123456')
+
+            self.assertFalse(
+                os.path.exists(old_path),
+                msg="The least recently used document was not removed")
+            self.assertTrue(
+                os.path.exists(new_path),
+                msg="The newest document was removed")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
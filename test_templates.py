@@ -0,0 +1,191 @@
+import unittest
+import json
+from werkzeug.test import TestResponse
+from api import create_app
+from api.report_templates import TemplateCache
+from config import DevConfig
+from test_utilities import (generate_auth_token, create_report,
+                            GOOD_REPORT_DATA)
+
+CLIENT_ID_VAR = "AUTH0_CLIENT_ADMIN"
+CLIENT_SECRET_VAR = "AUTH0_SECRET_ADMIN"
+
+GOOD_TEMPLATE_DATA = {
+            "name": "Monthly Health Check",
+            "description": "The standard monthly checks",
+            "items": [
+                {
+                    "item_type": "requested_task",
+                    "item_description": "Check the backups"
+                },
+                {
+                    "item_type": "requested_task",
+                    "item_description": "Apply the security updates",
+                    "request_expected_outcome": "All servers patched"
+                }
+            ]
+        }
+
+
+class TemplateTestSuite(unittest.TestCase):
+    """This class performs the test cases for the report templates"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        token_response = generate_auth_token(CLIENT_ID_VAR, CLIENT_SECRET_VAR)
+        cls._auth_token = token_response.get('access_token', '')
+
+    def setUp(self):
+        self.app = create_app(DevConfig)
+        self.client = self.app.test_client
+        self.headers: dict = {
+            "Authorization": f"Bearer {self._auth_token}"}
+
+    def tearDown(self):
+        """Executed after reach test"""
+        pass
+
+    def add_template(self, template_data) -> TestResponse:
+        return self.client().post(
+            '/api/templates',
+            headers=self.headers,
+            json=template_data)
+
+    def add_template_report(self, template_id, report_data) -> TestResponse:
+        return self.client().post(
+            f'/api/templates/{template_id}/reports',
+            headers=self.headers,
+            json=report_data)
+
+    def get_report_data(self) -> dict:
+        report = create_report(self.client, self.headers)
+        return {key: report[key] for key in GOOD_REPORT_DATA.keys()}
+
+    # =========================================================================
+    # Template Tests
+    # =========================================================================
+    def test_add_template_success(self):
+        response = self.add_template(GOOD_TEMPLATE_DATA)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['success'], True,
+            msg="The response did not report as successful")
+
+        response = self.client().get(
+            f"/api/templates/{data['data']['id']}", headers=self.headers)
+        template = json.loads(response.data)['data']
+        self.assertEqual(
+            [item['item_nbr'] for item in template['items']], [1, 2],
+            msg="The template items were not numbered in order")
+
+    def test_add_template_fail(self):
+        # fail - a template needs at least one item
+        response = self.add_template({**GOOD_TEMPLATE_DATA, "items": []})
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_get_template_fail(self):
+        response = self.client().get(
+            '/api/templates/99999', headers=self.headers)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The Reponse Code was not 404")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_add_template_report_success(self):
+        template = json.loads(self.add_template(GOOD_TEMPLATE_DATA).data)
+
+        response = self.add_template_report(
+            template['data']['id'], self.get_report_data())
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+        self.assertEqual(
+            data['item_count'], len(GOOD_TEMPLATE_DATA['items']),
+            msg="The template items were not copied to the report")
+
+        response = self.client().get(
+            f"/api/reports/{data['data']['id']}/items", headers=self.headers)
+        items = json.loads(response.data)['data']
+        self.assertEqual(
+            len(items), len(GOOD_TEMPLATE_DATA['items']),
+            msg="The report does not hold the template items")
+
+    def test_add_template_report_fail(self):
+        # fail - the report date is missing
+        template = json.loads(self.add_template(GOOD_TEMPLATE_DATA).data)
+        report_data = self.get_report_data()
+        del report_data['report_date']
+
+        response = self.add_template_report(
+            template['data']['id'], report_data)
+
+        # get the response body
+        data = json.loads(response.data)
+        self.assertEqual(
+            response.status_code, 400,
+            msg="The Reponse Code was not 400")
+        self.assertEqual(
+            data['success'], False,
+            msg="The response did not report as failed")
+
+    def test_delete_template_cache_invalidated(self):
+        # a deleted template that was cached can not start a report
+        template = json.loads(self.add_template(GOOD_TEMPLATE_DATA).data)
+        template_id = template['data']['id']
+        self.client().get(
+            f'/api/templates/{template_id}', headers=self.headers)
+
+        response = self.client().delete(
+            f'/api/templates/{template_id}', headers=self.headers)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="The Reponse Code was not 200")
+
+        response = self.add_template_report(
+            template_id, self.get_report_data())
+        self.assertEqual(
+            response.status_code, 404,
+            msg="The deleted template was served from the cache")
+
+    def test_template_cache_expires(self):
+        template = json.loads(self.add_template(GOOD_TEMPLATE_DATA).data)
+        template_id = template['data']['id']
+        template_cache = TemplateCache()
+
+        with self.app.test_request_context():
+            cached = template_cache.get(template_id)
+            self.assertIs(
+                template_cache.get(template_id), cached,
+                msg="The template was not served from the cache")
+
+            # as if the TTL has passed
+            template_cache.expires = 0
+            self.assertIsNot(
+                template_cache.get(template_id), cached,
+                msg="The template was served after the cache expired")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
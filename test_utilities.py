@@ -1,7 +1,10 @@
 import os
 import json
 import http
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from sqlalchemy import event
+from api.models import db
 
 GOOD_CONTACT_DATA = {
             "name": "Will Power",
@@ -27,6 +30,25 @@ GOOD_CLIENT_CONTACT_DATA = {
             "position_title": "Test Contact"
         }
 
+GOOD_REPORT_DATA = {
+            "client_id": 0,
+            "client_contact_id": 0,
+            "consulant_id": 0,
+            "client_manager_id": 0,
+            "report_date": "2021-08-02",
+            "report_from_date": "2021-07-26",
+            "report_to_date": "2021-08-01",
+            "engagement_reference": "LC1234"
+        }
+
+GOOD_REPORT_ITEM_DATA = {
+            "item_type": "issue_identified",
+            "item_sequence_nbr": 1,
+            "item_description": "Backups are not being tested",
+            "item_complete": False,
+            "issue_status": "open"
+        }
+
 def generate_auth_token(client_id, client_secret) -> dict:
     load_dotenv()
     AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN")
@@ -46,4 +68,59 @@ def generate_auth_token(client_id, client_secret) -> dict:
     conn.request("POST", "/oauth/token", json.dumps(payload), headers)
     res = conn.getresponse()
     data = res.read()
-    return json.loads(data)
\ No newline at end of file
+    return json.loads(data)
+
+
+@contextmanager
+def record_statements(app):
+    # collect the SQL statements the app runs while the block executes
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def count_statements(statements, verb: str) -> int:
+    return len([statement for statement in statements
+                if statement.lstrip().upper().startswith(verb)])
+
+
+def create_report(client, headers: dict, report_data: dict = None,
+                  items: list = None) -> dict:
+    # create the contacts, client and client contact a report refers to,
+    # then the report and its items, and return the saved report
+    def post(url: str, body: dict) -> dict:
+        response = client().post(url, headers=headers, json=body)
+        return json.loads(response.data).get('data')
+
+    consultant = post('/api/contacts', {
+        **GOOD_CONTACT_DATA, "contact_type": "consultant"})
+    client_manager = post('/api/contacts', {
+        **GOOD_CONTACT_DATA, "contact_type": "clientmanager"})
+    report_client = post('/api/clients', GOOD_CLIENT_DATA)
+    client_contact = post(
+        f"/api/clients/{report_client['id']}/contacts",
+        {**GOOD_CLIENT_CONTACT_DATA, "client_id": report_client['id']})
+
+    report = post('/api/reports', {
+        **GOOD_REPORT_DATA,
+        "client_id": report_client['id'],
+        "client_contact_id": client_contact['id'],
+        "consulant_id": consultant['id'],
+        "client_manager_id": client_manager['id'],
+        **(report_data or {})})
+
+    for item in items or []:
+        client().post(f"/api/reports/{report['id']}/items",
+                      headers=headers, json=item)
+
+    return report
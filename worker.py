@@ -0,0 +1,5 @@
+from app import app
+from api.jobs import run_workers
+
+if __name__ == "__main__":
+    run_workers(app)